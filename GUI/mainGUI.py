@@ -50,6 +50,21 @@ class AutoToolGUI(tk.Tk):
         self.download_type_var = tk.StringVar(value="mp4")
         self.mode_var = tk.StringVar(value="both")  # both | video | image
         self.regen_links_var = tk.BooleanVar(value=False)
+        self.use_extract_cache_var = tk.BooleanVar(value=True)
+        self.incremental_links_var = tk.BooleanVar(value=False)
+        self.extract_workers_var = tk.StringVar(value="0")  # 0 = tự động theo số CPU
+        self.dedupe_batch_keywords_var = tk.BooleanVar(value=True)
+        self.browser_workers_var = tk.StringVar(value="1")
+        self.video_backend_var = tk.StringVar(value="browser")  # browser | devtools | http
+        self.image_backend_var = tk.StringVar(value="dom")  # dom | keyboard
+        self.use_link_cache_var = tk.BooleanVar(value=True)
+        self.link_cache_ttl_var = tk.StringVar(value="168")  # giờ (7 ngày)
+        self.resume_links_var = tk.BooleanVar(value=True)
+        self.lean_chrome_var = tk.BooleanVar(value=False)
+        self.recycle_keywords_var = tk.StringVar(value="200")  # tái tạo Chrome sau N keyword
+        self.recycle_rss_var = tk.StringVar(value="1500")   # hoặc khi RSS tăng quá N MB
+        self.link_registry_var = tk.StringVar(value="flag")  # off | flag | skip (link đã dùng ở project khác)
+        self._browser_service = None  # BrowserService dùng chung trong 1 lần chạy batch
         self.videos_per_keyword_var = tk.StringVar(value="10")
         self.images_per_keyword_var = tk.StringVar(value="10")
         self.max_duration_var = tk.StringVar(value="20")  # mặc định tối đa 20 phút
@@ -161,8 +176,11 @@ class AutoToolGUI(tk.Tk):
         row += 1
         # Regen links checkbox
         ttk.Checkbutton(frm, text='Ép tạo lại link lần chạy sau', variable=self.regen_links_var).grid(row=row, column=0, sticky='w', padx=pad, pady=(2,0))
+        ttk.Checkbutton(frm, text='Dùng cache trích tên', variable=self.use_extract_cache_var).grid(row=row, column=1, sticky='w', padx=pad, pady=(2,0))
+        row += 1
+        ttk.Checkbutton(frm, text='Chỉ lấy link cho từ khoá mới/đổi tên', variable=self.incremental_links_var).grid(row=row, column=0, sticky='w', padx=pad, pady=(2,0))
+        ttk.Checkbutton(frm, text='Gộp từ khoá trùng giữa các project', variable=self.dedupe_batch_keywords_var).grid(row=row, column=1, sticky='w', padx=pad, pady=(2,0))
         row += 1
-
         # Buttons
         btn_frame = ttk.Frame(frm)
         btn_frame.grid(row=row, column=0, columnspan=3, sticky="w", padx=pad, pady=(12, 4))
@@ -224,6 +242,42 @@ class AutoToolGUI(tk.Tk):
         frm2.columnconfigure(1, weight=1)
         frm2.rowconfigure(row2, weight=1)
 
+        # Tab 3: Tuỳ chọn nâng cao (nguồn lấy link, song song, cache, Chrome)
+        tab3 = ttk.Frame(notebook, padding=10)
+        notebook.add(tab3, text="Tuỳ chọn nâng cao")
+
+        frm3 = ttk.Frame(tab3, padding=10, relief="groove")
+        frm3.pack(fill="both", expand=True)
+        row3 = 0
+        ttk.Label(frm3, text="Nguồn lấy link video:").grid(row=row3, column=0, sticky="w", padx=pad, pady=2)
+        ttk.Combobox(frm3, textvariable=self.video_backend_var, values=["browser", "devtools", "http"], width=12, state="readonly").grid(row=row3, column=1, sticky="w", padx=pad, pady=2)
+        row3 += 1
+        ttk.Label(frm3, text="Nguồn lấy link ảnh:").grid(row=row3, column=0, sticky="w", padx=pad, pady=2)
+        ttk.Combobox(frm3, textvariable=self.image_backend_var, values=["dom", "keyboard"], width=12, state="readonly").grid(row=row3, column=1, sticky="w", padx=pad, pady=2)
+        row3 += 1
+        ttk.Label(frm3, text="Số Chrome song song (link video/ảnh):").grid(row=row3, column=0, sticky="w", padx=pad, pady=2)
+        ttk.Entry(frm3, textvariable=self.browser_workers_var, width=12).grid(row=row3, column=1, sticky="w", padx=pad, pady=2)
+        row3 += 1
+        ttk.Label(frm3, text="Số process trích tên (0 = tự động):").grid(row=row3, column=0, sticky="w", padx=pad, pady=2)
+        ttk.Entry(frm3, textvariable=self.extract_workers_var, width=12).grid(row=row3, column=1, sticky="w", padx=pad, pady=2)
+        row3 += 1
+        ttk.Checkbutton(frm3, text='Dùng cache link (giờ):', variable=self.use_link_cache_var).grid(row=row3, column=0, sticky='w', padx=pad, pady=2)
+        ttk.Entry(frm3, textvariable=self.link_cache_ttl_var, width=12).grid(row=row3, column=1, sticky="w", padx=pad, pady=2)
+        row3 += 1
+        ttk.Checkbutton(frm3, text='Tiếp tục lần lấy link bị dừng', variable=self.resume_links_var).grid(row=row3, column=0, sticky='w', padx=pad, pady=(2,0))
+        ttk.Checkbutton(frm3, text='Chrome gọn nhẹ (chặn ảnh/quảng cáo khi lấy link video)', variable=self.lean_chrome_var).grid(row=row3, column=1, sticky='w', padx=pad, pady=(2,0))
+        row3 += 1
+        ttk.Label(frm3, text="Tái tạo Chrome sau (số keyword):").grid(row=row3, column=0, sticky="w", padx=pad, pady=2)
+        ttk.Entry(frm3, textvariable=self.recycle_keywords_var, width=12).grid(row=row3, column=1, sticky="w", padx=pad, pady=2)
+        row3 += 1
+        ttk.Label(frm3, text="Tái tạo Chrome khi RAM tăng (MB):").grid(row=row3, column=0, sticky="w", padx=pad, pady=2)
+        ttk.Entry(frm3, textvariable=self.recycle_rss_var, width=12).grid(row=row3, column=1, sticky="w", padx=pad, pady=2)
+        row3 += 1
+        ttk.Label(frm3, text="Link đã dùng ở project khác:").grid(row=row3, column=0, sticky="w", padx=pad, pady=2)
+        ttk.Combobox(frm3, textvariable=self.link_registry_var, values=["off", "flag", "skip"], width=12, state="readonly").grid(row=row3, column=1, sticky="w", padx=pad, pady=2)
+        row3 += 1
+
+
     # ------------------------------------------------------------------
     # Utility methods
     # ------------------------------------------------------------------
@@ -277,7 +331,9 @@ class AutoToolGUI(tk.Tk):
     # ------------------------------------------------------------------
     # Automation placeholder
     # ------------------------------------------------------------------
-    def run_automation_for_project(self, proj_path: str):
+    def run_automation_for_project(self, proj_path: str, extracted=None, links_ready: bool = False):
+        # extracted: kết quả batch_extract.extract_projects cho project này (đã ghi list_name.txt)
+        # links_ready: link đã được lấy chung cho cả batch (xem _batch_fetch_links)
         # Set up resource folder for this project
         proj_dir = os.path.dirname(os.path.abspath(proj_path))
         parent = os.path.join(proj_dir, 'resource')
@@ -341,6 +397,18 @@ class AutoToolGUI(tk.Tk):
         links_img_txt = os.path.join(links_dir, "dl_links_image.txt")  # list of grouped image links
 
         # 1. Extract names
+        incremental = bool(self.incremental_links_var.get())
+        keyword_diff = None
+        prev_records = None
+        records = None
+        if incremental:
+            try:
+                import importlib
+                keyword_diff = importlib.import_module("core.downloadTool.keyword_diff")  # type: ignore
+                prev_records = keyword_diff.load_snapshot(data_project_dir)
+            except Exception as e:
+                self.log(f"CẢNH BÁO: Không dùng được chế độ incremental ({e}) -> chạy đầy đủ.")
+                incremental = False
         try:
             # Ghi marker cho ExtendScript (getTimeline / cutAndPush) biết subfolder đang dùng
             try:
@@ -349,7 +417,21 @@ class AutoToolGUI(tk.Tk):
                 self.log(f"Đánh dấu project hiện tại: {safe_project}")
             except Exception as _pmErr:
                 self.log(f"CẢNH BÁO: Không ghi được marker project ({_pmErr})")
-            get_name_list.extract_instance_names(proj_path, save_txt=names_txt, project_name=safe_project)
+            if extracted is not None:
+                if extracted.get('error'):
+                    raise RuntimeError(extracted['error'])
+                import importlib
+                batch_extract = importlib.import_module("core.downloadTool.batch_extract")  # type: ignore
+                records = batch_extract.result_table(extracted).to_dicts()
+                names_txt = extracted.get('names_txt') or names_txt
+            else:
+                records = get_name_list.extract_text_instances_with_timing(
+                    proj_path,
+                    save_txt=None,
+                    project_name=safe_project,
+                    use_cache=bool(self.use_extract_cache_var.get()),
+                )
+                get_name_list.write_name_list([r["name"] for r in records], names_txt)
             self.log(f"Đã trích tên instance -> {names_txt}")
         except Exception as e:
             self.log(f"LỖI khi trích tên: {e}")
@@ -360,28 +442,68 @@ class AutoToolGUI(tk.Tk):
         # Tạo link theo chế độ đã chọn
         try:
             # Read parameters
-            try:
-                mpk = int(self.videos_per_keyword_var.get().strip() or '10')
-            except Exception:
-                mpk = 10
-            try:
-                mx_max = int(self.max_duration_var.get().strip() or '20')
-            except Exception:
-                mx_max = 20
-            try:
-                mn_min = int(self.min_duration_var.get().strip() or '4')
-            except Exception:
-                mn_min = 4
-            max_minutes = mx_max if mx_max > 0 else None
-            min_minutes = mn_min if mn_min > 0 else None
-            try:
-                ipk = int(self.images_per_keyword_var.get().strip() or '10')
-            except Exception:
-                ipk = 10
+            mpk, max_minutes, min_minutes, ipk = self._link_params()
+            video_workers = self._browser_workers()
+            video_backend = self._video_backend()
+            image_backend = self._image_backend()
+            link_cache = self._link_cache()
+            resume = bool(self.resume_links_var.get())
+            lean = bool(self.lean_chrome_var.get())
+            service = self._browser_service
+            registry = self._link_registry()
+            registry_mode = self._registry_mode()
 
             force_flag = self.regen_links_var.get()
             mode_l = mode.lower()
-            if mode_l == 'both':
+            only_keywords = None
+            if links_ready:
+                self.log("Link đã được lấy chung cho cả batch -> bỏ qua bước tạo link.")
+            elif incremental:
+                diff = keyword_diff.diff_instances(prev_records or [], records)
+                only_keywords = diff['to_scrape']
+                if prev_records is None:
+                    self.log("Incremental: chưa có snapshot trước -> lấy link cho keyword còn thiếu.")
+                self.log(f"Incremental diff: {keyword_diff.format_diff(diff)}")
+            links_done = False
+            if links_ready:
+                pass
+            elif incremental and mode_l in ('both', 'video', 'image'):
+                self.log(f"Đang cập nhật link incremental ({len(only_keywords)} keyword mới)...")
+                if mode_l in ('both', 'video'):
+                    get_link.get_links_main_video(
+                        names_txt,
+                        links_txt,
+                        project_name=safe_project,
+                        max_per_keyword=mpk,
+                        max_minutes=max_minutes,
+                        min_minutes=min_minutes,
+                        only_keywords=only_keywords,
+                        workers=video_workers,
+                        backend=video_backend,
+                        registry=registry,
+                        registry_mode=registry_mode,
+                        cache=link_cache,
+                        resume=resume,
+                        service=service,
+                        lean=lean,
+                    )
+                if mode_l in ('both', 'image'):
+                    get_link.get_links_main_image(
+                        names_txt,
+                        links_img_txt,
+                        project_name=safe_project,
+                        images_per_keyword=ipk,
+                        only_keywords=only_keywords,
+                        cache=link_cache,
+                        resume=resume,
+                        service=service,
+                        workers=video_workers,
+                        backend=image_backend,
+                        registry=registry,
+                        registry_mode=registry_mode,
+                    )
+                links_done = True
+            elif mode_l == 'both':
                 self.log("Đang tạo link (cả VIDEO và ẢNH)...")
                 get_link.get_links_main(
                     names_txt,
@@ -391,7 +513,17 @@ class AutoToolGUI(tk.Tk):
                     max_minutes=max_minutes,
                     min_minutes=min_minutes,
                     images_per_keyword=ipk,
+                    workers=video_workers,
+                    backend=video_backend,
+                    registry=registry,
+                    registry_mode=registry_mode,
+                    cache=link_cache,
+                    image_backend=image_backend,
+                    resume=resume,
+                    lean=lean,
+                    service=service,
                 )
+                links_done = True
                 self.log(f"Đã tạo link VIDEO -> {links_txt}")
                 self.log(f"Đã tạo link ẢNH -> {links_img_txt}")
             elif mode_l == 'video':
@@ -408,7 +540,16 @@ class AutoToolGUI(tk.Tk):
                         max_per_keyword=mpk,
                         max_minutes=max_minutes,
                         min_minutes=min_minutes,
+                        workers=video_workers,
+                        backend=video_backend,
+                        registry=registry,
+                        registry_mode=registry_mode,
+                        cache=link_cache,
+                        resume=resume,
+                        service=service,
+                        lean=lean,
                     )
+                    links_done = True
             elif mode_l == 'image':
                 do_regen = True
                 if os.path.isfile(links_img_txt) and force_flag is False:
@@ -421,7 +562,22 @@ class AutoToolGUI(tk.Tk):
                         links_img_txt,
                         project_name=safe_project,
                         images_per_keyword=ipk,
+                        cache=link_cache,
+                        resume=resume,
+                        service=service,
+                        workers=video_workers,
+                        backend=image_backend,
+                        registry=registry,
+                        registry_mode=registry_mode,
                     )
+                    links_done = True
+            # Lưu snapshot làm mốc cho lần chạy incremental sau
+            if links_done and records is not None:
+                try:
+                    import importlib
+                    importlib.import_module("core.downloadTool.keyword_diff").save_snapshot(data_project_dir, records)
+                except Exception as e:
+                    self.log(f"CẢNH BÁO: Không lưu được snapshot keyword ({e})")
         except Exception as e:
             self.log(f"CẢNH BÁO: Không tạo được link ({e}).")
 
@@ -497,20 +653,307 @@ class AutoToolGUI(tk.Tk):
             messagebox.showwarning("Batch", "Chưa có file .prproj nào trong danh sách.")
             return
         self.log(f"=== BẮT ĐẦU CHẠY HÀNG LOẠT ({len(self.batch_projects)} project) ===")
-        for i, proj_path in enumerate(self.batch_projects, start=1):
-            try:
-                self.log(f"-- ({i}/{len(self.batch_projects)}) {proj_path}")
-                # Run automation for each project with its own resource folder
-                self.run_automation_for_project(proj_path)
-                self.update()
-            except Exception as e:
-                self.log(f"LỖI batch item: {e}")
+        extracted = self._batch_extract_names(self.batch_projects)
+        self._browser_service = self._new_browser_service()
+        try:
+            links_ready = set()
+            if self.dedupe_batch_keywords_var.get() and len(extracted) > 1:
+                links_ready = self._batch_fetch_links(extracted)
+            for i, proj_path in enumerate(self.batch_projects, start=1):
+                try:
+                    self.log(f"-- ({i}/{len(self.batch_projects)}) {proj_path}")
+                    # Run automation for each project with its own resource folder
+                    self.run_automation_for_project(proj_path, extracted.get(proj_path), proj_path in links_ready)
+                    self.update()
+                except Exception as e:
+                    self.log(f"LỖI batch item: {e}")
+        finally:
+            self._close_browser_service()
+        self._log_extract_cache_stats()
+        self._log_link_cache_stats()
+        self._log_link_registry_stats()
+        self._log_rate_limit_stats()
         self.log("=== KẾT THÚC CHẠY HÀNG LOẠT ===")
         try:
             self._save_config()
         except Exception:
             pass
 
+    def _batch_extract_names(self, projects) -> dict:
+        """Trích tên cho mọi project song song (mỗi project 1 process) trước khi lấy link."""
+        try:
+            workers = int(self.extract_workers_var.get().strip() or '0')
+        except Exception:
+            workers = 0
+        try:
+            import importlib
+            batch_extract = importlib.import_module("core.downloadTool.batch_extract")  # type: ignore
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không trích tên song song được ({e}) -> trích tuần tự từng project.")
+            return {}
+        existing = [p for p in projects if os.path.isfile(p)]
+        if not existing:
+            return {}
+        n = workers if workers > 0 else batch_extract.default_workers(len(existing))
+        self.log(f"Trích tên {len(existing)} project song song ({min(n, len(existing))} process)...")
+        t0 = time.time()
+
+        def _on_result(res):
+            if res.get('error'):
+                self.log(f"LỖI khi trích tên {res['path']}: {res['error']}")
+            else:
+                self.log(f"Đã trích {res['count']} instance ({res['seconds']}s): {res['path']}")
+            try:
+                self.update()
+            except Exception:
+                pass
+
+        try:
+            results = batch_extract.extract_projects(
+                existing,
+                workers=workers,
+                use_cache=bool(self.use_extract_cache_var.get()),
+                on_result=_on_result,
+            )
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Trích tên song song thất bại ({e}) -> trích tuần tự từng project.")
+            return {}
+        self.log(f"Trích tên xong trong {time.time() - t0:.1f}s")
+        return results
+
+    def _link_params(self):
+        """(videos/keyword, max phút, min phút, ảnh/keyword) từ các ô nhập."""
+        try:
+            mpk = int(self.videos_per_keyword_var.get().strip() or '10')
+        except Exception:
+            mpk = 10
+        try:
+            mx_max = int(self.max_duration_var.get().strip() or '20')
+        except Exception:
+            mx_max = 20
+        try:
+            mn_min = int(self.min_duration_var.get().strip() or '4')
+        except Exception:
+            mn_min = 4
+        try:
+            ipk = int(self.images_per_keyword_var.get().strip() or '10')
+        except Exception:
+            ipk = 10
+        return mpk, (mx_max if mx_max > 0 else None), (mn_min if mn_min > 0 else None), ipk
+
+    def _browser_workers(self) -> int:
+        """Số Chrome chạy song song khi lấy link video / ảnh (ảnh 'keyboard' luôn 1 do điều khiển bằng phím)."""
+        try:
+            return max(1, int(self.browser_workers_var.get().strip() or '1'))
+        except Exception:
+            return 1
+
+    def _video_backend(self) -> str:
+        """'browser' (Chrome, đọc DOM), 'devtools' (Chrome, đọc JSON kết quả) hoặc 'http' (không mở trình duyệt) cho link video."""
+        backend = self.video_backend_var.get().strip().lower()
+        return backend if backend in ('browser', 'devtools', 'http') else 'browser'
+
+    def _image_backend(self) -> str:
+        """'dom' (đọc dữ liệu trang, headless / song song được) hoặc 'keyboard' (pywinauto) cho link ảnh."""
+        backend = self.image_backend_var.get().strip().lower()
+        return backend if backend in ('dom', 'keyboard') else 'dom'
+
+    def _new_browser_service(self):
+        """BrowserService giữ Chrome mở suốt batch (tái tạo theo số keyword / RSS từ ô nhập)."""
+        try:
+            max_keywords = max(0, int(self.recycle_keywords_var.get().strip() or '200'))
+        except Exception:
+            max_keywords = 200
+        try:
+            max_rss = max(0.0, float(self.recycle_rss_var.get().strip() or '1500'))
+        except Exception:
+            max_rss = 1500.0
+        try:
+            import importlib
+            browser_service = importlib.import_module("core.downloadTool.browser_service")  # type: ignore
+            return browser_service.BrowserService(max_keywords=max_keywords, max_rss_growth_mb=max_rss)
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không dùng lại Chrome giữa các project được ({e}).")
+            return None
+
+    def _close_browser_service(self):
+        service, self._browser_service = self._browser_service, None
+        if service is None:
+            return
+        try:
+            service.close()
+            st = service.stats
+            self.log(
+                f"Chrome: khởi động {st['started']} lần, dùng lại {st['reused']} lần, "
+                f"tái tạo {st['recycled']}, bỏ {st['discarded']} (driver chết)."
+            )
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Lỗi khi đóng Chrome ({e})")
+
+    def _link_cache(self):
+        """LinkCache dùng chung (data/link_cache.sqlite) với TTL từ ô nhập, hoặc None nếu tắt."""
+        if not self.use_link_cache_var.get():
+            return None
+        try:
+            ttl_hours = float(self.link_cache_ttl_var.get().strip() or '168')
+        except Exception:
+            ttl_hours = 168.0
+        try:
+            import importlib
+            link_cache = importlib.import_module("core.downloadTool.link_cache")  # type: ignore
+            return link_cache.default_cache(ttl_seconds=max(0.0, ttl_hours) * 3600)
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không mở được cache link ({e}) -> lấy link không dùng cache.")
+            return None
+
+    def _registry_mode(self) -> str:
+        """'off' | 'flag' (chỉ ghi log link đã dùng ở project khác) | 'skip' (bỏ và lấy link khác)."""
+        mode = self.link_registry_var.get().strip().lower()
+        return mode if mode in ('off', 'flag', 'skip') else 'flag'
+
+    def _link_registry(self):
+        """LinkRegistry dùng chung (data/link_registry.sqlite), hoặc None nếu tắt."""
+        if self._registry_mode() == 'off':
+            return None
+        try:
+            import importlib
+            return importlib.import_module("core.downloadTool.link_registry").default_registry()  # type: ignore
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không mở được sổ đăng ký link ({e}) -> bỏ qua kiểm tra trùng giữa project.")
+            return None
+
+    def _batch_fetch_links(self, extracted: dict) -> set:
+        """Lấy link chung cho cả batch: keyword trùng giữa các project chỉ scrape 1 lần.
+
+        Áp dụng cùng quy tắc như run_automation_for_project (chế độ, ép tạo lại, incremental).
+        Trả về tập project đã có link (bước tạo link của từng project sẽ được bỏ qua).
+        """
+        try:
+            import importlib
+            batch_links = importlib.import_module("core.downloadTool.batch_links")  # type: ignore
+            keyword_diff = importlib.import_module("core.downloadTool.keyword_diff")  # type: ignore
+            batch_extract = importlib.import_module("core.downloadTool.batch_extract")  # type: ignore
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không gộp keyword theo batch được ({e}) -> lấy link từng project.")
+            return set()
+        mode_l = self.mode_var.get().strip().lower()
+        if mode_l not in ('both', 'video', 'image'):
+            return set()
+        incremental = bool(self.incremental_links_var.get())
+        force_flag = self.regen_links_var.get()
+        mpk, max_minutes, min_minutes, ipk = self._link_params()
+        link_cache = self._link_cache()
+        link_registry = self._link_registry()
+        video_jobs, image_jobs = [], []
+        prepared = {}
+        for proj_path, res in extracted.items():
+            if res.get('error') or not res.get('names_txt'):
+                continue
+            project_dir = os.path.dirname(res['names_txt'])
+            records = batch_extract.result_table(res).to_dicts()
+            links_txt = os.path.join(project_dir, "dl_links.txt")
+            links_img_txt = os.path.join(project_dir, "dl_links_image.txt")
+            only_keywords = None
+            if incremental:
+                diff = keyword_diff.diff_instances(keyword_diff.load_snapshot(project_dir) or [], records)
+                only_keywords = diff['to_scrape']
+                self.log(f"Incremental diff ({res['slug']}): {keyword_diff.format_diff(diff)}")
+            want_video = mode_l in ('both', 'video')
+            want_image = mode_l in ('both', 'image')
+            # Giữ link hiện có ở chế độ video/image đơn (giống run_automation_for_project)
+            if not incremental and mode_l == 'video' and os.path.isfile(links_txt) and force_flag is False:
+                want_video = False
+            if not incremental and mode_l == 'image' and os.path.isfile(links_img_txt) and force_flag is False:
+                want_image = False
+            if not (want_video or want_image):
+                continue
+            if want_video:
+                video_jobs.append(batch_links.make_job(res['names_txt'], links_txt, only_keywords, res['slug']))
+            if want_image:
+                image_jobs.append(batch_links.make_job(res['names_txt'], links_img_txt, only_keywords, res['slug']))
+            prepared[proj_path] = (project_dir, records)
+        if not prepared:
+            return set()
+        try:
+            if video_jobs:
+                st = batch_links.get_links_batch_video(
+                    video_jobs, max_per_keyword=mpk, max_minutes=max_minutes, min_minutes=min_minutes,
+                    workers=self._browser_workers(), backend=self._video_backend(), cache=link_cache,
+                    resume=bool(self.resume_links_var.get()), lean=bool(self.lean_chrome_var.get()),
+                    service=self._browser_service, registry=link_registry, registry_mode=self._registry_mode(),
+                )
+                self.log(f"Link VIDEO batch: scrape {st['unique']} keyword thay vì {st['requested']}.")
+            if image_jobs:
+                st = batch_links.get_links_batch_image(
+                    image_jobs, images_per_keyword=ipk, cache=link_cache,
+                    workers=self._browser_workers(), backend=self._image_backend(),
+                    resume=bool(self.resume_links_var.get()), service=self._browser_service,
+                    registry=link_registry, registry_mode=self._registry_mode(),
+                )
+                self.log(f"Link ẢNH batch: scrape {st['unique']} keyword thay vì {st['requested']}.")
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Lấy link batch thất bại ({e}) -> lấy link từng project.")
+            return set()
+        for project_dir, records in prepared.values():
+            try:
+                keyword_diff.save_snapshot(project_dir, records)
+            except Exception as e:
+                self.log(f"CẢNH BÁO: Không lưu được snapshot keyword ({e})")
+        return set(prepared)
+
+    def _log_extract_cache_stats(self):
+        try:
+            import importlib
+            extract_cache = importlib.import_module("core.downloadTool.extract_cache")
+            st = extract_cache.cache_stats()
+            self.log(
+                f"Cache trích tên: hit={st['hits']} miss={st['misses']} "
+                f"(số file={st['entries']}, {st['bytes'] // 1024} KB)"
+            )
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không đọc được thống kê cache trích tên ({e})")
+
+    def _log_link_cache_stats(self):
+        if not self.use_link_cache_var.get():
+            return
+        try:
+            import importlib
+            st = importlib.import_module("core.downloadTool.link_cache").default_cache().stats()
+            self.log(
+                f"Cache link: hit={st['hits']} miss={st['misses']} lưu={st['stores']} xoá LRU={st['evictions']} "
+                f"(số mục={st['entries']}, {st['bytes'] // 1024} KB)"
+            )
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không đọc được thống kê cache link ({e})")
+
+    def _log_link_registry_stats(self):
+        if self._registry_mode() == 'off':
+            return
+        try:
+            import importlib
+            registry = importlib.import_module("core.downloadTool.link_registry").default_registry()
+            registry.save()  # Bloom lưu 1 lần cuối batch
+            st = registry.stats()
+            self.log(
+                f"Sổ đăng ký link: {st['entries']} link, bỏ qua {st['skipped']} link trùng project khác, "
+                f"tra đĩa {st['db_lookups']} lần (Bloom loại {st['bloom_negative']}, {st['bloom_bytes'] // 1024} KB)"
+            )
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không đọc được thống kê sổ đăng ký link ({e})")
+
+    def _log_rate_limit_stats(self):
+        try:
+            import importlib
+            stats = importlib.import_module("core.downloadTool.rate_limit").default_limiter().stats()
+        except Exception as e:
+            self.log(f"CẢNH BÁO: Không đọc được thống kê tốc độ ({e})")
+            return
+        for host, st in stats.items():
+            self.log(
+                f"Tốc độ {host}: {st['rate']}/s, {st['requests']} request, chờ {st['waited_seconds']}s, "
+                f"chậm {st['slow']}, lỗi {st['errors']}, bị chặn {st['blocked']}"
+            )
+
     # ------------------------------------------------------------------
     # Premier helpers
     # ------------------------------------------------------------------
@@ -555,11 +998,13 @@ class AutoToolGUI(tk.Tk):
     def run_premier_automation(self):
         try:
             import importlib
-            from core.premierCore.control import run_premier_script  # type: ignore
+            from core.premierCore.control import run_premier_script, export_timeline_native  # type: ignore
         except Exception:
             try:
                 import importlib
-                run_premier_script = importlib.import_module("core.premierCore.control").run_premier_script  # type: ignore
+                control = importlib.import_module("core.premierCore.control")  # type: ignore
+                run_premier_script = control.run_premier_script
+                export_timeline_native = control.export_timeline_native
             except Exception as e:
                 self.log2(f"LỖI: Không thể import run_premier_script: {e}")
                 run_premier_script = None
@@ -580,6 +1025,12 @@ class AutoToolGUI(tk.Tk):
                 project_path_unix = proj_path.replace('\\', '/')
                 resource_dir = os.path.join(os.path.dirname(proj_path), 'resource').replace('\\', '/')
                 path_txt_content = f"project_slug={project_slug}\ndata_folder={data_folder}\nproject_path={project_path_unix}\nresource_dir={resource_dir}\n"
+                # Xuất timeline từ .prproj bằng Python; lỗi -> runAll.jsx dùng getTimeline.jsx như cũ
+                if export_timeline_native(proj_path, data_folder):
+                    path_txt_content += "timeline_source=python\n"
+                    self.log2(f"Đã xuất timeline từ .prproj (bỏ qua getTimeline.jsx) cho {project_slug}")
+                else:
+                    self.log2(f"Không xuất được timeline bằng Python -> dùng getTimeline.jsx cho {project_slug}")
                 path_txt_path = os.path.join(DATA_DIR, 'path.txt')
                 try:
                     with open(path_txt_path, 'w', encoding='utf-8') as f:
@@ -769,6 +1220,20 @@ class AutoToolGUI(tk.Tk):
                 'max_duration': self.max_duration_var.get().strip(),
                 'min_duration': self.min_duration_var.get().strip(),
                 'regen_links': bool(self.regen_links_var.get()),
+                'use_extract_cache': bool(self.use_extract_cache_var.get()),
+                'incremental_links': bool(self.incremental_links_var.get()),
+                'extract_workers': self.extract_workers_var.get().strip(),
+                'browser_workers': self.browser_workers_var.get().strip(),
+                'video_backend': self.video_backend_var.get().strip(),
+                'image_backend': self.image_backend_var.get().strip(),
+                'use_link_cache': bool(self.use_link_cache_var.get()),
+                'link_cache_ttl_hours': self.link_cache_ttl_var.get().strip(),
+                'resume_links': bool(self.resume_links_var.get()),
+                'lean_chrome': bool(self.lean_chrome_var.get()),
+                'recycle_keywords': self.recycle_keywords_var.get().strip(),
+                'recycle_rss_mb': self.recycle_rss_var.get().strip(),
+                'link_registry_mode': self.link_registry_var.get().strip(),
+                'dedupe_batch_keywords': bool(self.dedupe_batch_keywords_var.get()),
                 'batch_projects': list(self.batch_projects) if isinstance(self.batch_projects, list) else [],
                 'premier_projects': list(self.premier_projects) if isinstance(self.premier_projects, list) else [],
             }
@@ -813,6 +1278,52 @@ class AutoToolGUI(tk.Tk):
                     self.regen_links_var.set(bool(cfg['regen_links']))
                 except Exception:
                     pass
+            if 'use_extract_cache' in cfg:
+                try:
+                    self.use_extract_cache_var.set(bool(cfg['use_extract_cache']))
+                except Exception:
+                    pass
+            if 'incremental_links' in cfg:
+                try:
+                    self.incremental_links_var.set(bool(cfg['incremental_links']))
+                except Exception:
+                    pass
+            if 'dedupe_batch_keywords' in cfg:
+                try:
+                    self.dedupe_batch_keywords_var.set(bool(cfg['dedupe_batch_keywords']))
+                except Exception:
+                    pass
+            if 'video_backend' in cfg:
+                self.video_backend_var.set(str(cfg['video_backend']))
+            if 'image_backend' in cfg:
+                self.image_backend_var.set(str(cfg['image_backend']))
+            if 'use_link_cache' in cfg:
+                try:
+                    self.use_link_cache_var.set(bool(cfg['use_link_cache']))
+                except Exception:
+                    pass
+            if 'link_cache_ttl_hours' in cfg:
+                self.link_cache_ttl_var.set(str(cfg['link_cache_ttl_hours']))
+            if 'resume_links' in cfg:
+                try:
+                    self.resume_links_var.set(bool(cfg['resume_links']))
+                except Exception:
+                    pass
+            if 'recycle_keywords' in cfg:
+                self.recycle_keywords_var.set(str(cfg['recycle_keywords']))
+            if 'recycle_rss_mb' in cfg:
+                self.recycle_rss_var.set(str(cfg['recycle_rss_mb']))
+            if 'link_registry_mode' in cfg:
+                self.link_registry_var.set(str(cfg['link_registry_mode']))
+            if 'lean_chrome' in cfg:
+                try:
+                    self.lean_chrome_var.set(bool(cfg['lean_chrome']))
+                except Exception:
+                    pass
+            if 'browser_workers' in cfg:
+                self.browser_workers_var.set(str(cfg['browser_workers']))
+            if 'extract_workers' in cfg:
+                self.extract_workers_var.set(str(cfg['extract_workers']))
             if 'batch_projects' in cfg and isinstance(cfg['batch_projects'], list):
                 self.batch_projects = [str(x) for x in cfg['batch_projects']]
             if 'premier_projects' in cfg and isinstance(cfg['premier_projects'], list):
@@ -859,6 +1370,20 @@ class AutoToolGUI(tk.Tk):
             self.max_duration_var,
             self.min_duration_var,
             self.regen_links_var,
+            self.use_extract_cache_var,
+            self.incremental_links_var,
+            self.extract_workers_var,
+            self.dedupe_batch_keywords_var,
+            self.browser_workers_var,
+            self.video_backend_var,
+            self.image_backend_var,
+            self.use_link_cache_var,
+            self.link_cache_ttl_var,
+            self.resume_links_var,
+            self.lean_chrome_var,
+            self.recycle_keywords_var,
+            self.recycle_rss_var,
+            self.link_registry_var,
         ]
         for v in vars_to_bind:
             try:
@@ -878,4 +1403,7 @@ def main():  # pragma: no cover - manual GUI run
     app.mainloop()
 
 if __name__ == "__main__":  # pragma: no cover
+    # Cần cho ProcessPoolExecutor (batch_extract) khi đóng gói bằng PyInstaller trên Windows
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,147 @@
+"""batch_extract.py
+Trích tên instance cho nhiều project .prproj song song bằng ProcessPoolExecutor.
+
+Parse XML là việc nặng CPU trên 1 core (GIL) nên mỗi project được parse trong một process
+riêng. Mỗi project ghi `data/<slug>/list_name.txt` (slug theo tên file .prproj, xem
+core.project_data.project_slug_from_path) và cache trích xuất như khi chạy từng project.
+
+Lỗi của từng project được trả về trong kết quả (khoá 'error') thay vì dừng cả batch.
+
+CLI:
+    python -m core.downloadTool.batch_extract [--workers N] [--no-cache] [--streaming] a.prproj b.prproj ...
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from ..project_data import project_subdir, project_slug_from_path  # type: ignore
+    from . import get_name_list  # type: ignore
+    from .instance_table import InstanceTable  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.project_data import project_subdir, project_slug_from_path  # type: ignore
+    from core.downloadTool import get_name_list  # type: ignore
+    from core.downloadTool.instance_table import InstanceTable  # type: ignore
+
+LIST_NAME_FILENAME = 'list_name.txt'
+
+
+def default_workers(n_projects: int) -> int:
+    return max(1, min(n_projects, os.cpu_count() or 1))
+
+
+def _extract_one(project_path: str, use_cache: bool, streaming: bool) -> Dict:
+    """Worker (top-level để pickle được khi spawn trên Windows)."""
+    t0 = time.perf_counter()
+    slug = project_slug_from_path(project_path)
+    result = {'path': project_path, 'slug': slug, 'names_txt': None, 'rows': None,
+              'count': 0, 'error': None, 'seconds': 0.0}
+    try:
+        if not os.path.isfile(project_path):
+            raise FileNotFoundError(f"project not found: {project_path}")
+        table = get_name_list.extract_text_instances_with_timing(
+            project_path,
+            save_txt=None,
+            streaming=streaming,
+            use_cache=use_cache,
+            project_name=slug,
+            as_table=True,
+        )
+        names_txt = os.path.join(project_subdir(slug), LIST_NAME_FILENAME)
+        get_name_list.write_name_list(table.name_list(), names_txt)
+        result['names_txt'] = names_txt
+        # Hàng gọn (name, start, end, timebase) để process cha dựng lại InstanceTable
+        result['rows'] = list(table.rows())
+        result['count'] = len(table)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+    result['seconds'] = round(time.perf_counter() - t0, 3)
+    return result
+
+
+def extract_projects(
+    project_paths: Iterable[str],
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    streaming: bool = False,
+    on_result=None,
+) -> Dict[str, Dict]:
+    """Trích tên cho nhiều project song song.
+
+    workers: số process (None/0 -> min(số project, số CPU)); 1 -> chạy tuần tự trong process hiện tại.
+    on_result: callback(result) gọi ở process cha mỗi khi một project xong (để log tiến độ).
+    Trả về {project_path: result} theo thứ tự đầu vào; result gồm slug, names_txt, rows,
+    count, seconds và error (None nếu thành công).
+    """
+    paths: List[str] = []
+    for p in project_paths:
+        if p not in paths:
+            paths.append(p)
+    if not paths:
+        return {}
+    n_workers = workers if workers and workers > 0 else default_workers(len(paths))
+    n_workers = min(n_workers, len(paths))
+    results: Dict[str, Dict] = {}
+
+    if n_workers == 1:
+        for p in paths:
+            results[p] = _extract_one(p, use_cache, streaming)
+            if on_result:
+                on_result(results[p])
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {pool.submit(_extract_one, p, use_cache, streaming): p for p in paths}
+            for fut in as_completed(futures):
+                p = futures[fut]
+                try:
+                    res = fut.result()
+                except Exception as e:  # process con chết (BrokenProcessPool, ...)
+                    res = {'path': p, 'slug': project_slug_from_path(p), 'names_txt': None, 'rows': None,
+                           'count': 0, 'error': f"{type(e).__name__}: {e}", 'seconds': 0.0}
+                results[p] = res
+                if on_result:
+                    on_result(res)
+    return {p: results[p] for p in paths}
+
+
+def result_table(result: Dict) -> Optional[InstanceTable]:
+    """InstanceTable từ kết quả của extract_projects (None nếu project lỗi)."""
+    if result.get('error') or result.get('rows') is None:
+        return None
+    return InstanceTable.from_rows(result['rows'])
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    n = None
+    if '--workers' in args:
+        i = args.index('--workers')
+        n = int(args[i + 1]) if i + 1 < len(args) else None
+        del args[i:i + 2]
+    cache = '--no-cache' not in args
+    stream = '--streaming' in args
+    args = [a for a in args if a not in ('--no-cache', '--streaming')]
+    if not args:
+        print('Usage: python -m core.downloadTool.batch_extract [--workers N] [--no-cache] [--streaming] a.prproj ...')
+        sys.exit(1)
+
+    def _log(res):
+        if res['error']:
+            print(f"[batch_extract] FAIL {res['path']}: {res['error']}")
+        else:
+            print(f"[batch_extract] {res['count']} instances in {res['seconds']}s -> {res['names_txt']}")
+
+    t_start = time.perf_counter()
+    out = extract_projects(args, workers=n, use_cache=cache, streaming=stream, on_result=_log)
+    failed = sum(1 for r in out.values() if r['error'])
+    print(f"[batch_extract] Done {len(out)} projects ({failed} failed) in {time.perf_counter() - t_start:.2f}s")
+    sys.exit(1 if failed else 0)
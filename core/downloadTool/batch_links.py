@@ -0,0 +1,265 @@
+"""batch_links.py
+Lấy link cho nhiều project trong cùng batch, mỗi keyword chung chỉ scrape 1 lần.
+
+Các project trong một batch thường trùng nhiều keyword (người nổi tiếng, show, địa danh).
+Thay vì mỗi project tự gọi get_link.get_links_main_video, bước lập kế hoạch:
+  1. Đọc keyword của từng project từ list_name.txt (cùng quy tắc read_keywords_from_file;
+     tên đã qua _sanitize_keyword lúc trích).
+  2. Gộp keyword theo khoá chuẩn hoá (_sanitize_keyword + không phân biệt hoa thường, vì
+     YouTube / Google tìm kiếm không phân biệt) -> danh sách keyword duy nhất.
+  3. Scrape mỗi keyword duy nhất 1 lần (get_link.scrape_video_links / scrape_image_links).
+  4. Fan-out: ghi dl_links.txt (hoặc dl_links_image.txt) của từng project theo đúng thứ tự
+     keyword gốc của project đó (get_link.write_link_groups).
+
+Job ở chế độ incremental (only_keywords) giữ lại nhóm link cũ như get_links_main_video.
+Mỗi job có journal riêng (link_journal) cạnh file output: keyword xong được ghi vào journal
+của mọi job cần nó, resume=True bỏ qua keyword đã có trong journal của bất kỳ job nào.
+
+registry (link_registry.LinkRegistry): link của mỗi job được đăng ký theo tên job sau khi ghi;
+registry_mode='skip' bỏ link đã thuộc project ngoài batch (keyword chung giữa các job trong
+batch vẫn dùng chung link như trên).
+
+metrics: bản ghi số đo của mỗi keyword (scrape_metrics) được ghi vào thư mục metrics của mọi
+job cần keyword đó.
+"""
+from __future__ import annotations
+
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .get_name_list import _sanitize_keyword  # type: ignore
+    from . import get_link  # type: ignore
+    from .link_journal import LinkJournal  # type: ignore
+    from .scrape_metrics import MetricsSink, metrics_dir_for  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.downloadTool.get_name_list import _sanitize_keyword  # type: ignore
+    from core.downloadTool import get_link  # type: ignore
+    from core.downloadTool.link_journal import LinkJournal  # type: ignore
+    from core.downloadTool.scrape_metrics import MetricsSink, metrics_dir_for  # type: ignore
+
+
+def keyword_key(keyword: str) -> str:
+    """Khoá gộp keyword giữa các project."""
+    return _sanitize_keyword(keyword).casefold()
+
+
+def make_job(keywords_file: str, output_txt: str, only_keywords: Optional[Iterable[str]] = None, name: Optional[str] = None) -> Dict:
+    """Một project trong batch: đọc keywords_file, ghi output_txt.
+
+    only_keywords=None -> lấy lại link cho mọi keyword; ngược lại chỉ các keyword này
+    (cùng keyword chưa có nhóm trong output_txt), như get_links_main_video(only_keywords=...).
+    """
+    return {
+        'name': name or os.path.basename(os.path.dirname(os.path.abspath(output_txt))),
+        'keywords_file': keywords_file,
+        'output_txt': output_txt,
+        'only_keywords': None if only_keywords is None else list(only_keywords),
+    }
+
+
+def plan_batch(jobs: List[Dict]) -> Dict:
+    """Lập kế hoạch: keyword từng job, nhóm cũ (incremental) và danh sách keyword duy nhất cần scrape.
+
+    Trả về dict:
+      keywords:  [list keyword] theo từng job (thứ tự gốc)
+      existing:  [{keyword: [links]}] nhóm cũ giữ lại theo từng job
+      targets:   [list keyword] cần scrape theo từng job
+      unique:    keyword đại diện (lần xuất hiện đầu tiên) cho mỗi khoá cần scrape
+      requested: tổng số keyword cần scrape nếu mỗi project tự chạy
+    """
+    plan = {'keywords': [], 'existing': [], 'targets': [], 'unique': [], 'requested': 0}
+    seen = set()
+    for job in jobs:
+        keywords = get_link.read_keywords_from_file(job['keywords_file'])
+        if job.get('only_keywords') is not None:
+            existing = get_link.read_link_groups(job['output_txt'])
+            targets = get_link._incremental_targets(keywords, existing, job['only_keywords'])
+        else:
+            existing = {}
+            targets = list(keywords)
+        plan['keywords'].append(keywords)
+        plan['existing'].append(existing)
+        plan['targets'].append(targets)
+        plan['requested'] += len(targets)
+        for k in targets:
+            key = keyword_key(k)
+            if key not in seen:
+                seen.add(key)
+                plan['unique'].append(k)
+    return plan
+
+
+def _fan_out(jobs: List[Dict], plan: Dict, scraped: Dict[str, List[str]], kind: str, registry=None) -> Dict[str, int]:
+    by_key = {keyword_key(k): links for k, links in scraped.items()}
+    written = {}
+    for job, keywords, existing, targets in zip(jobs, plan['keywords'], plan['existing'], plan['targets']):
+        if not keywords:
+            print(f"[batch_links] No keywords for {job['name']} -> skip.")
+            continue
+        target_set = set(targets)
+        groups = {
+            k: by_key.get(keyword_key(k), []) if k in target_set else existing.get(k, [])
+            for k in keywords
+        }
+        try:
+            written[job['output_txt']] = get_link.write_link_groups(job['output_txt'], keywords, groups)
+            print(f"[batch_links] {job['name']}: {written[job['output_txt']]} {kind} links -> {job['output_txt']}")
+        except Exception as e:
+            print(f"[batch_links] ERROR writing {kind} links for {job['name']}: {e}")
+            continue
+        if registry is not None:
+            registry.register_groups(groups, kind, job['name'])
+    if registry is not None:
+        registry.save()
+    return written
+
+
+def _scrape_journaled(jobs: List[Dict], plan: Dict, params: Dict, resume: bool, scrape, kind: str, registry=None, metrics: bool = True) -> Dict:
+    """Scrape plan['unique'] (trừ keyword đã có trong journal), fan-out, xoá journal của job đã ghi xong.
+
+    scrape(keywords, on_complete, on_metrics) -> {keyword: [links]}.
+    """
+    journals = [LinkJournal(job['output_txt'], params, resume=resume) for job in jobs]
+    # Các job cùng thư mục project (video + ảnh, hoặc trùng output) dùng chung 1 sink
+    sinks: Dict[str, MetricsSink] = {}
+    if metrics:
+        for job in jobs:
+            directory = metrics_dir_for(job['output_txt'])
+            if directory not in sinks:
+                sinks[directory] = MetricsSink(directory)
+    known: Dict[str, List[str]] = {}
+    owners: Dict[str, List] = {}
+    metric_owners: Dict[str, List[MetricsSink]] = {}
+    for job, journal, targets in zip(jobs, journals, plan['targets']):
+        sink = sinks.get(metrics_dir_for(job['output_txt'])) if metrics else None
+        for k in targets:
+            key = keyword_key(k)
+            owners.setdefault(key, []).append((journal, k))
+            if sink is not None and sink not in metric_owners.setdefault(key, []):
+                metric_owners[key].append(sink)
+            if k in journal.done and key not in known:
+                known[key] = journal.done[k]
+    todo = [k for k in plan['unique'] if keyword_key(k) not in known]
+    if known:
+        print(f"[batch_links] Resume: {len(known)} keywords already in journals, scrape {len(todo)}.")
+
+    def on_complete(keyword: str, links: List[str]):
+        for journal, k in owners.get(keyword_key(keyword), []):
+            journal.record(k, links)
+
+    def on_metrics(record: Dict):
+        for sink in metric_owners.get(keyword_key(record['keyword']), []):
+            sink.record(record)
+
+    try:
+        scraped = scrape(todo, on_complete, on_metrics if sinks else None)
+    finally:
+        for journal in journals:
+            journal.close()
+        for sink in sinks.values():
+            sink.close()
+    for k in plan['unique']:
+        key = keyword_key(k)
+        if key in known and k not in scraped:
+            scraped[k] = known[key]
+    written = _fan_out(jobs, plan, scraped, kind, registry)
+    for job, journal in zip(jobs, journals):
+        if job['output_txt'] in written:
+            journal.finish()
+    return {'unique': len(plan['unique']), 'requested': plan['requested'], 'resumed': len(known), 'written': written}
+
+
+def get_links_batch_video(
+    jobs: List[Dict],
+    headless: bool = False,
+    max_per_keyword: int = 2,
+    max_minutes: Optional[int] = None,
+    min_minutes: Optional[int] = None,
+    workers: int = 1,
+    backend: str = 'browser',
+    cache=None,
+    resume: bool = True,
+    lean: bool = False,
+    service=None,
+    registry=None,
+    registry_mode: str = 'flag',
+    metrics: bool = True,
+) -> Dict:
+    """Link video cho mọi job, mỗi keyword chung scrape 1 lần (`workers` driver song song). Trả về thống kê.
+
+    registry / registry_mode / metrics: như get_link.get_links_main_video (project = tên job).
+    """
+    plan = plan_batch(jobs)
+    print(f"[batch_links] Video: {len(plan['unique'])} unique keywords for {plan['requested']} requested "
+          f"across {len(jobs)} projects.")
+    params = {'kind': 'video', 'max_results': max_per_keyword, 'min_minutes': min_minutes, 'max_minutes': max_minutes}
+    return _scrape_journaled(
+        jobs,
+        plan,
+        params,
+        resume,
+        lambda keywords, on_complete, on_metrics: get_link.scrape_video_links(
+            keywords,
+            headless=headless,
+            max_per_keyword=max_per_keyword,
+            max_minutes=max_minutes,
+            min_minutes=min_minutes,
+            workers=workers,
+            backend=backend,
+            cache=cache,
+            on_complete=on_complete,
+            lean=lean,
+            service=service,
+            skip=get_link._registry_skip(registry, registry_mode, [job['name'] for job in jobs]),
+            on_metrics=on_metrics,
+        ),
+        'video',
+        registry,
+        metrics,
+    )
+
+
+def get_links_batch_image(
+    jobs: List[Dict],
+    headless: bool = False,
+    images_per_keyword: int = 10,
+    cache=None,
+    workers: int = 1,
+    backend: str = 'dom',
+    resume: bool = True,
+    service=None,
+    registry=None,
+    registry_mode: str = 'flag',
+    metrics: bool = True,
+) -> Dict:
+    """Link ảnh cho mọi job, mỗi keyword chung scrape 1 lần (backend 'dom': `workers` driver). Trả về thống kê."""
+    plan = plan_batch(jobs)
+    print(f"[batch_links] Image: {len(plan['unique'])} unique keywords for {plan['requested']} requested "
+          f"across {len(jobs)} projects.")
+    img_count = images_per_keyword if images_per_keyword and images_per_keyword > 0 else 10
+    return _scrape_journaled(
+        jobs,
+        plan,
+        {'kind': 'image', 'max_results': img_count},
+        resume,
+        lambda keywords, on_complete, on_metrics: get_link.scrape_image_links(
+            keywords,
+            headless=headless,
+            images_per_keyword=img_count,
+            cache=cache,
+            workers=workers,
+            backend=backend,
+            on_complete=on_complete,
+            service=service,
+            skip=get_link._registry_skip(registry, registry_mode, [job['name'] for job in jobs]),
+            on_metrics=on_metrics,
+        ),
+        'image',
+        registry,
+        metrics,
+    )
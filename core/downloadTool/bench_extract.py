@@ -0,0 +1,226 @@
+"""bench_extract.py
+Benchmark get_name_list trên các file .prproj giả lập (xem prproj_synth) từ 1k tới 1M instance.
+
+Với mỗi kích thước, mỗi hàm (extract_text_instances_with_timing, extract_instance_names) và
+mỗi chế độ parse (tree / streaming), một subprocess riêng được chạy để:
+  - đo wall time và peak RSS (resource.ru_maxrss trên Linux/macOS, psutil peak_wset trên Windows)
+  - chạy lại lần nữa với tracemalloc để lấy peak bộ nhớ Python (tách riêng vì tracemalloc làm chậm)
+Cache trích xuất luôn tắt (use_cache=False) để đo parse thật.
+
+Kết quả lưu JSON (mặc định data/bench/extract_<timestamp>.json) để so sánh giữa các lần chạy:
+    python -m core.downloadTool.bench_extract [--sizes 1000,10000,100000,1000000] [--layout nested|refs]
+        [--modes tree,streaming] [--repeat N] [--out file.json] [--workdir DIR]
+    python -m core.downloadTool.bench_extract --compare old.json new.json
+"""
+from __future__ import annotations
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+try:
+    from ..project_data import DATA_DIR  # type: ignore
+    from .prproj_synth import generate_prproj  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.project_data import DATA_DIR  # type: ignore
+    from core.downloadTool.prproj_synth import generate_prproj  # type: ignore
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_MODES = ('tree', 'streaming')
+FUNCTIONS = ('extract_text_instances_with_timing', 'extract_instance_names')
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource  # type: ignore
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux trả KB, macOS trả byte
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil  # type: ignore
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', None) or info.rss
+    except Exception:
+        return None
+
+
+def _run_worker(func_name: str, path: str, mode: str, trace: bool) -> Dict:
+    """Chạy 1 lần đo trong process hiện tại (được gọi qua --worker)."""
+    from core.downloadTool import get_name_list
+    func = getattr(get_name_list, func_name)
+    kwargs = {'streaming': mode == 'streaming', 'use_cache': False}
+    if func_name == 'extract_text_instances_with_timing':
+        kwargs['save_txt'] = None
+    if trace:
+        import tracemalloc
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func(path, **kwargs)
+    wall = time.perf_counter() - t0
+    out = {'wall_s': round(wall, 4), 'rows': len(result)}
+    if trace:
+        import tracemalloc
+        out['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        out['peak_rss_bytes'] = _peak_rss_bytes()
+    return out
+
+
+def _spawn(func_name: str, path: str, mode: str, trace: bool) -> Dict:
+    cmd = [sys.executable, '-m', 'core.downloadTool.bench_extract', '--worker', func_name, path, mode]
+    if trace:
+        cmd.append('--trace')
+    proc = subprocess.run(cmd, cwd=ROOT_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"worker failed ({func_name}, {mode}): {proc.stderr.strip()[-500:]}")
+    # Dòng cuối stdout là JSON kết quả (các dòng trước là log print của get_name_list)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(
+    sizes=DEFAULT_SIZES,
+    modes=DEFAULT_MODES,
+    layout: str = 'nested',
+    repeat: int = 1,
+    workdir: Optional[str] = None,
+    keep_files: bool = False,
+) -> Dict:
+    """Sinh file cho từng kích thước rồi đo mọi (hàm, chế độ). Trả về dict kết quả (xem save_results)."""
+    own_dir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix='prproj_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    results: List[Dict] = []
+    try:
+        for size in sizes:
+            path = os.path.join(workdir, f'synthetic_{layout}_{size}.prproj')
+            if not os.path.isfile(path):
+                t0 = time.perf_counter()
+                generate_prproj(path, size, n_sequences=max(1, min(8, size // 50000 + 1)), layout=layout)
+                print(f"[bench_extract] Generated {size} instances in {time.perf_counter() - t0:.1f}s -> {path}")
+            file_bytes = os.path.getsize(path)
+            for func_name in FUNCTIONS:
+                for mode in modes:
+                    walls = []
+                    rss = []
+                    rows = None
+                    for _ in range(max(1, repeat)):
+                        r = _spawn(func_name, path, mode, trace=False)
+                        walls.append(r['wall_s'])
+                        if r.get('peak_rss_bytes') is not None:
+                            rss.append(r['peak_rss_bytes'])
+                        rows = r['rows']
+                    traced = _spawn(func_name, path, mode, trace=True)
+                    entry = {
+                        'size': size,
+                        'function': func_name,
+                        'mode': mode,
+                        'file_bytes': file_bytes,
+                        'rows': rows,
+                        'wall_s': min(walls),
+                        'wall_s_all': walls,
+                        'peak_rss_bytes': max(rss) if rss else None,
+                        'tracemalloc_peak_bytes': traced.get('tracemalloc_peak_bytes'),
+                    }
+                    results.append(entry)
+                    print(f"[bench_extract] {size:>8} {func_name} [{mode}]: {entry['wall_s']:.3f}s, "
+                          f"RSS {_mb(entry['peak_rss_bytes'])}, traced {_mb(entry['tracemalloc_peak_bytes'])}")
+    finally:
+        if own_dir and not keep_files:
+            for name in os.listdir(workdir):
+                try:
+                    os.remove(os.path.join(workdir, name))
+                except OSError:
+                    pass
+            try:
+                os.rmdir(workdir)
+            except OSError:
+                pass
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'layout': layout,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def _mb(v) -> str:
+    return 'n/a' if v is None else f"{v / (1 << 20):.1f}MB"
+
+
+def save_results(data: Dict, out_path: Optional[str] = None) -> str:
+    if out_path is None:
+        bench_dir = os.path.join(DATA_DIR, 'bench')
+        os.makedirs(bench_dir, exist_ok=True)
+        out_path = os.path.join(bench_dir, f"extract_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"[bench_extract] Saved results -> {out_path}")
+    return out_path
+
+
+def compare_results(old_path: str, new_path: str) -> List[Dict]:
+    """So sánh 2 file kết quả theo (size, function, mode). ratio < 1 nghĩa là lần mới tốt hơn."""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = {(r['size'], r['function'], r['mode']): r for r in json.load(f)['results']}
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = json.load(f)['results']
+    rows = []
+    for r in new:
+        o = old.get((r['size'], r['function'], r['mode']))
+        if o is None:
+            continue
+        row = {'size': r['size'], 'function': r['function'], 'mode': r['mode']}
+        for key in ('wall_s', 'peak_rss_bytes', 'tracemalloc_peak_bytes'):
+            if o.get(key) and r.get(key) is not None:
+                row[key + '_ratio'] = round(r[key] / o[key], 3)
+        rows.append(row)
+        print(f"[bench_extract] {row['size']:>8} {row['function']} [{row['mode']}]: "
+              + ', '.join(f"{k}={v}" for k, v in row.items() if k.endswith('_ratio')))
+    return rows
+
+
+def _pop_opt(args: List[str], key: str, default=None):
+    if key in args:
+        i = args.index(key)
+        value = args[i + 1] if i + 1 < len(args) else default
+        del args[i:i + 2]
+        return value
+    return default
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args[:1] == ['--worker']:
+        trace = '--trace' in args
+        print(json.dumps(_run_worker(args[1], args[2], args[3], trace)))
+        sys.exit(0)
+    if args[:1] == ['--compare']:
+        if len(args) < 3:
+            print('Usage: python -m core.downloadTool.bench_extract --compare old.json new.json')
+            sys.exit(1)
+        compare_results(args[1], args[2])
+        sys.exit(0)
+    sizes = _pop_opt(args, '--sizes')
+    modes = _pop_opt(args, '--modes')
+    data = run_benchmark(
+        sizes=[int(s) for s in sizes.split(',')] if sizes else DEFAULT_SIZES,
+        modes=modes.split(',') if modes else DEFAULT_MODES,
+        layout=_pop_opt(args, '--layout', 'nested'),
+        repeat=int(_pop_opt(args, '--repeat', 1)),
+        workdir=_pop_opt(args, '--workdir'),
+    )
+    save_results(data, _pop_opt(args, '--out'))
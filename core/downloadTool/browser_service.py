@@ -0,0 +1,183 @@
+"""browser_service.py
+Giữ Chrome "ấm" để dùng lại giữa các pha (video / ảnh) và giữa các project trong batch.
+
+Không có service, mỗi lần get_links_main_video / get_links_main_image tự mở rồi đóng Chrome
+(+ chromedriver): batch 40 project ~ 80 lần khởi động nguội. BrowserService:
+  - acquire(...) trả về driver rảnh cùng cấu hình (headless / lean / track_bytes), hoặc tạo mới.
+    Yêu cầu không cần performance log (track_bytes=False) cũng nhận driver có bật log: pha ảnh
+    dùng lại Chrome của pha video backend devtools (không lean).
+  - release(driver) trả driver về hàng chờ (driver chết thì đóng hẳn; xả performance log).
+  - renew(driver) gọi sau mỗi keyword: khi driver đã chạy max_keywords keyword hoặc RSS của Chrome
+    tăng quá max_rss_growth_mb so với lúc đầu thì đóng và thay bằng driver mới (chặn rò bộ nhớ).
+    Đếm theo keyword (1 keyword = 1 trang kết quả + các lần scroll / HEAD), không theo driver.get.
+  - close() đóng mọi driver (cuối batch).
+
+Đo RSS cần psutil (tuỳ chọn); thiếu psutil thì chỉ tái tạo theo số keyword.
+Dùng qua tham số service= của get_link (driver_pool gọi acquire / release / renew).
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import psutil  # type: ignore
+except ImportError:  # chỉ cần cho tái tạo theo RSS
+    psutil = None
+
+try:
+    from .driver_pool import driver_alive  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.downloadTool.driver_pool import driver_alive  # type: ignore
+
+DEFAULT_MAX_KEYWORDS = 200
+DEFAULT_MAX_RSS_GROWTH_MB = 1500
+# Đo RSS mỗi chừng này keyword (liệt kê process con của chromedriver không miễn phí)
+RSS_CHECK_EVERY = 10
+
+
+def chrome_rss_mb(driver) -> Optional[float]:
+    """Tổng RSS (MB) của chromedriver + mọi process Chrome con, None nếu không đo được."""
+    if psutil is None:
+        return None
+    try:
+        proc = psutil.Process(driver.service.process.pid)
+        procs = [proc] + proc.children(recursive=True)
+    except Exception:
+        return None
+    total = 0
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except Exception:
+            continue
+    return total / (1024 * 1024)
+
+
+class BrowserService:
+    """Pool driver dùng lại giữa các lần gọi (xem docstring module)."""
+
+    def __init__(
+        self,
+        make_driver: Optional[Callable] = None,
+        close_driver: Optional[Callable] = None,
+        max_keywords: int = DEFAULT_MAX_KEYWORDS,
+        max_rss_growth_mb: float = DEFAULT_MAX_RSS_GROWTH_MB,
+    ):
+        if make_driver is None or close_driver is None:
+            try:
+                from . import get_link  # type: ignore
+            except ImportError:
+                from core.downloadTool import get_link  # type: ignore
+            make_driver = make_driver or get_link.init_driver
+            close_driver = close_driver or get_link.close_driver
+        self._make = make_driver
+        self._close = close_driver
+        self.max_keywords = max_keywords
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple, List] = {}
+        # id(driver) -> {'profile', 'keywords', 'rss0'}
+        self._info: Dict[int, Dict] = {}
+        self.stats = {'started': 0, 'reused': 0, 'recycled': 0, 'discarded': 0}
+
+    def _start(self, profile: Tuple):
+        headless, lean, track_bytes = profile
+        driver = self._make(headless=headless, lean=lean, track_bytes=track_bytes)
+        # RSS gốc đo ngay khi tạo để phần tăng trong RSS_CHECK_EVERY keyword đầu cũng được tính
+        rss0 = chrome_rss_mb(driver) if self.max_rss_growth_mb else None
+        with self._lock:
+            self._info[id(driver)] = {'profile': profile, 'keywords': 0, 'rss0': rss0}
+            self.stats['started'] += 1
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._info.pop(id(driver), None)
+        self._close(driver)
+
+    def acquire(self, headless: bool = False, lean: bool = False, track_bytes: bool = False):
+        """Driver rảnh cùng cấu hình, hoặc Chrome mới."""
+        profile = (bool(headless), bool(lean), bool(track_bytes))
+        # Bật performance log thừa không hại người không đọc log -> dùng được cho track_bytes=False
+        candidates = [profile] if track_bytes else [profile, (profile[0], profile[1], True)]
+        while True:
+            with self._lock:
+                driver = None
+                for key in candidates:
+                    idle = self._idle.get(key) or []
+                    if idle:
+                        driver = idle.pop()
+                        break
+            if driver is None:
+                return self._start(profile)
+            if driver_alive(driver):
+                with self._lock:
+                    self.stats['reused'] += 1
+                return driver
+            print("[browser_service] Idle driver is dead -> discard.")
+            with self._lock:
+                self.stats['discarded'] += 1
+            self._discard(driver)
+
+    def release(self, driver):
+        """Trả driver về hàng chờ; driver không còn phản hồi thì đóng hẳn."""
+        with self._lock:
+            info = self._info.get(id(driver))
+        if info is None:
+            self._close(driver)
+            return
+        if not driver_alive(driver):
+            with self._lock:
+                self.stats['discarded'] += 1
+            self._discard(driver)
+            return
+        try:
+            driver.get('about:blank')  # dừng script / media của trang cũ khi chờ
+            if info['profile'][2]:
+                driver.get_log('performance')  # xả log để lần mượn sau chỉ thấy trang của nó
+        except Exception:
+            pass
+        with self._lock:
+            self._idle.setdefault(info['profile'], []).append(driver)
+
+    def _needs_recycle(self, driver, info: Dict) -> Optional[str]:
+        if self.max_keywords and info['keywords'] >= self.max_keywords:
+            return f"{info['keywords']} keywords"
+        if self.max_rss_growth_mb and info['keywords'] % RSS_CHECK_EVERY == 0:
+            rss = chrome_rss_mb(driver)
+            if rss is not None:
+                if info['rss0'] is None:
+                    info['rss0'] = rss
+                elif rss - info['rss0'] > self.max_rss_growth_mb:
+                    return f"RSS +{rss - info['rss0']:.0f} MB"
+        return None
+
+    def renew(self, driver):
+        """Gọi sau mỗi keyword: trả về driver dùng tiếp (chính nó, hoặc Chrome mới nếu vượt giới hạn)."""
+        with self._lock:
+            info = self._info.get(id(driver))
+            if info is None:
+                return driver
+            info['keywords'] += 1
+        reason = self._needs_recycle(driver, info)
+        if reason is None:
+            return driver
+        print(f"[browser_service] Recycle driver after {reason}.")
+        with self._lock:
+            self.stats['recycled'] += 1
+        self._discard(driver)
+        return self._start(info['profile'])
+
+    def close(self):
+        """Đóng mọi driver đang rảnh (gọi cuối batch)."""
+        with self._lock:
+            drivers = [d for idle in self._idle.values() for d in idle]
+            self._idle.clear()
+        for driver in drivers:
+            self._discard(driver)
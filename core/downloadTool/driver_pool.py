@@ -0,0 +1,187 @@
+"""driver_pool.py
+Chạy scrape keyword trên N WebDriver song song, kết quả trả về đúng thứ tự keyword.
+
+- Mỗi worker (thread) sở hữu 1 driver và lấy keyword từ một hàng đợi chung.
+- Lỗi của 1 keyword không ảnh hưởng worker khác (keyword đó -> []).
+- Driver bị crash (không còn phản hồi sau khi lỗi) được đóng và tạo lại tự động; keyword
+  đang chạy được thử lại 1 lần trên driver mới.
+- on_result(index, keyword, links) được gọi theo đúng thứ tự keyword đầu vào dù keyword
+  hoàn thành lệch thứ tự (kết quả đến sớm được giữ lại chờ các keyword trước), nên file
+  "<stt> <keyword>" ghi ra giống hệt khi chạy tuần tự.
+- renew(driver) -> driver tuỳ chọn (vd. browser_service): gọi sau mỗi keyword, có thể thay driver
+  đã dùng quá lâu bằng driver mới.
+- lookup(keyword) / store(keyword, links) tuỳ chọn (vd. link_cache): keyword có sẵn kết quả
+  được trả ngay, không vào hàng đợi; nếu mọi keyword đều có sẵn thì không tạo driver nào.
+
+Module không import selenium: driver được tạo / đóng qua callback (get_link.init_driver,
+get_link.close_driver) để dùng được cho cả video lẫn các nguồn khác.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from time import sleep
+from typing import Callable, Dict, List, Optional
+
+_MAX_ATTEMPTS = 2  # lần đầu + 1 lần thử lại sau khi driver crash
+
+
+def driver_alive(driver) -> bool:
+    """Driver còn phản hồi hay không (dùng sau khi một thao tác bị lỗi)."""
+    try:
+        driver.execute_script('return 1')
+        return True
+    except Exception:
+        return False
+
+
+class _OrderedEmitter:
+    """Gom kết quả về theo thứ tự index, gọi callback cho phần tiền tố đã đủ."""
+
+    def __init__(self, keywords: List[str], on_result: Optional[Callable]):
+        self._keywords = keywords
+        self._on_result = on_result
+        self._pending: Dict[int, List[str]] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+        self.results: Dict[int, List[str]] = {}
+
+    def done(self, index: int, links: List[str]):
+        with self._lock:
+            if index in self.results:
+                return
+            self.results[index] = links
+            self._pending[index] = links
+            while self._next in self._pending:
+                out = self._pending.pop(self._next)
+                if self._on_result is not None:
+                    try:
+                        self._on_result(self._next, self._keywords[self._next], out)
+                    except Exception as e:
+                        print(f"[driver_pool] ERROR in result callback for '{self._keywords[self._next]}': {e}")
+                self._next += 1
+
+
+def scrape_parallel(
+    keywords: List[str],
+    collect: Callable,
+    make_driver: Callable,
+    close_driver: Callable,
+    workers: int = 1,
+    on_result: Optional[Callable] = None,
+    delay: float = 1.0,
+    kind: str = 'video',
+    is_alive: Callable = driver_alive,
+    lookup: Optional[Callable] = None,
+    store: Optional[Callable] = None,
+    renew: Optional[Callable] = None,
+) -> List[List[str]]:
+    """Scrape keywords bằng `workers` driver song song.
+
+    collect(driver, keyword) -> [links]; make_driver() -> driver; close_driver(driver).
+    delay: nghỉ giữa 2 keyword trên cùng một driver (như sleep(1.0) của luồng tuần tự).
+    is_alive(driver): kiểm tra driver còn dùng được sau khi lỗi (mặc định driver_alive).
+    lookup(keyword) -> links | None: kết quả có sẵn (bỏ qua scrape); store(keyword, links):
+    gọi sau mỗi keyword scrape thành công. renew(driver) -> driver: gọi sau mỗi keyword.
+    Trả về list links theo đúng thứ tự keywords. Raise RuntimeError nếu không driver nào
+    khởi động được (giống init_driver lỗi ở luồng tuần tự cũ).
+    """
+    n = len(keywords)
+    emitter = _OrderedEmitter(keywords, on_result)
+    if n == 0:
+        return []
+    tasks: "queue.Queue" = queue.Queue()
+    for i in range(n):
+        cached = None
+        if lookup is not None:
+            try:
+                cached = lookup(keywords[i])
+            except Exception as e:
+                print(f"[driver_pool] WARN: lookup failed for '{keywords[i]}': {e}")
+        if cached is not None:
+            print(f"[get_link] --- ({i + 1}/{n}) '{keywords[i]}' [cache] ---")
+            emitter.done(i, cached)
+        else:
+            tasks.put((i, 0))
+    pending = tasks.qsize()
+    if pending == 0:
+        return [emitter.results[i] for i in range(n)]
+    workers = max(1, min(workers or 1, pending))
+    started = []
+    last_error: List[Exception] = []
+
+    def _new_driver(slot: int):
+        try:
+            driver = make_driver()
+        except Exception as e:
+            print(f"[driver_pool] ERROR starting driver #{slot}: {e}")
+            last_error.append(e)
+            return None
+        started.append(slot)
+        return driver
+
+    def _worker(slot: int):
+        driver = _new_driver(slot)
+        if driver is None:
+            return
+        try:
+            while True:
+                try:
+                    index, attempt = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                keyword = keywords[index]
+                print(f"[get_link] --- ({index + 1}/{n}) '{keyword}' [driver #{slot}] ---")
+                try:
+                    links = collect(driver, keyword)
+                except Exception as e:
+                    print(f"[get_link] ERROR collecting {kind} links for '{keyword}': {e}")
+                    if not is_alive(driver):
+                        print(f"[driver_pool] Driver #{slot} crashed -> restarting.")
+                        close_driver(driver)
+                        driver = _new_driver(slot)
+                        if attempt + 1 < _MAX_ATTEMPTS:
+                            tasks.put((index, attempt + 1))
+                        else:
+                            emitter.done(index, [])
+                        if driver is None:
+                            return
+                        continue
+                    links = []
+                else:
+                    if store is not None:
+                        try:
+                            store(keyword, links)
+                        except Exception as e:
+                            print(f"[driver_pool] WARN: store failed for '{keyword}': {e}")
+                emitter.done(index, links)
+                if renew is not None:
+                    try:
+                        driver = renew(driver)
+                    except Exception as e:
+                        print(f"[driver_pool] ERROR renewing driver #{slot}: {e}")
+                        driver = None
+                        return
+                if delay:
+                    sleep(delay)
+        finally:
+            if driver is not None:
+                close_driver(driver)
+
+    if workers == 1:
+        _worker(0)
+    else:
+        threads = [threading.Thread(target=_worker, args=(slot,), daemon=True) for slot in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    if not started:
+        raise RuntimeError(f"no WebDriver could be started: {last_error[-1] if last_error else 'unknown error'}")
+    # Keyword còn sót (mọi driver đều không khởi động được / chết hẳn) -> rỗng, vẫn giữ thứ tự
+    missing = [i for i in range(n) if i not in emitter.results]
+    if missing:
+        print(f"[driver_pool] WARN: {len(missing)} keywords not scraped (no working driver).")
+        for i in missing:
+            emitter.done(i, [])
+    return [emitter.results[i] for i in range(n)]
@@ -0,0 +1,195 @@
+"""extract_cache.py
+On-disk cache for instance records extracted from .prproj files.
+
+Mỗi project có một file `data/<project_slug>/extract_cache.json` chứa:
+  - fingerprint của file .prproj: path, size, mtime_ns, sha1 (của file gzip, không cần giải nén)
+  - rows: các hàng InstanceTable (name, start_frame, end_frame, timebase)
+
+Tra cứu:
+  1. path + size + mtime khớp -> hit ngay (không đọc file project).
+  2. size/mtime khác -> tính sha1; nếu sha1 khớp (file chỉ bị touch/copy) -> hit và cập nhật stat.
+  3. còn lại -> miss.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from ..project_data import DATA_DIR, project_subdir, project_slug_from_path  # type: ignore
+    from .instance_table import InstanceTable  # type: ignore
+except Exception:
+    THIS_FILE = os.path.abspath(__file__)
+    ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(THIS_FILE)))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.project_data import DATA_DIR, project_subdir, project_slug_from_path  # type: ignore
+    from core.downloadTool.instance_table import InstanceTable  # type: ignore
+
+CACHE_FILENAME = 'extract_cache.json'
+# Tăng khi định dạng record / logic parse thay đổi để vô hiệu hoá cache cũ
+CACHE_VERSION = 3
+_HASH_CHUNK = 1 << 20
+
+__all__ = [
+    'fingerprint',
+    'lookup',
+    'store',
+    'invalidate',
+    'cache_stats',
+]
+
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0, 'stores': 0, 'hash_checks': 0}
+
+
+def _count(key: str):
+    with _lock:
+        _counters[key] += 1
+
+
+def _cache_path(project_path: str, project_name: Optional[str] = None) -> str:
+    slug = project_name or project_slug_from_path(project_path)
+    return os.path.join(project_subdir(slug), CACHE_FILENAME)
+
+
+def _sha1_file(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(project_path: str, with_hash: bool = True) -> Dict:
+    """Fingerprint của file .prproj: path tuyệt đối, size, mtime_ns và (tuỳ chọn) sha1."""
+    st = os.stat(project_path)
+    fp = {
+        'path': os.path.abspath(project_path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+    }
+    if with_hash:
+        fp['sha1'] = _sha1_file(project_path)
+    return fp
+
+
+def _read_cache_file(cache_file: str) -> Optional[Dict]:
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+        return None
+    return data
+
+
+def lookup(project_path: str, project_name: Optional[str] = None) -> Tuple[Optional[InstanceTable], Optional[Dict]]:
+    """Tra cache cho project_path.
+
+    Trả về (table, fingerprint). table=None nếu miss; fingerprint (nếu đã phải tính
+    sha1) được trả về để store() dùng lại, tránh hash file hai lần.
+    """
+    cache_file = _cache_path(project_path, project_name)
+    data = _read_cache_file(cache_file)
+    if data is None:
+        _count('misses')
+        return None, None
+    cached_fp = data.get('fingerprint') or {}
+    fp = fingerprint(project_path, with_hash=False)
+    if fp['path'] != cached_fp.get('path'):
+        _count('misses')
+        return None, None
+    if fp['size'] == cached_fp.get('size') and fp['mtime_ns'] == cached_fp.get('mtime_ns'):
+        _count('hits')
+        return InstanceTable.from_rows(data.get('rows') or []), cached_fp
+    # stat khác -> so sánh nội dung
+    _count('hash_checks')
+    fp['sha1'] = _sha1_file(project_path)
+    if fp['sha1'] != cached_fp.get('sha1'):
+        _count('misses')
+        return None, fp
+    _count('hits')
+    table = InstanceTable.from_rows(data.get('rows') or [])
+    # cập nhật stat để lần sau hit nhanh
+    try:
+        _write_cache_file(cache_file, fp, data.get('rows') or [])
+    except Exception:
+        pass
+    return table, fp
+
+
+def _write_cache_file(cache_file: str, fp: Dict, rows) -> None:
+    tmp = cache_file + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'fingerprint': fp, 'rows': rows}, f, ensure_ascii=False)
+    os.replace(tmp, cache_file)
+
+
+def store(project_path: str, table: InstanceTable, project_name: Optional[str] = None, fp: Optional[Dict] = None) -> str:
+    """Ghi bảng instance vào cache của project. Trả về đường dẫn file cache."""
+    if fp is None or 'sha1' not in fp:
+        fp = fingerprint(project_path, with_hash=True)
+    rows = [list(row) for row in table.rows()]
+    cache_file = _cache_path(project_path, project_name)
+    _write_cache_file(cache_file, fp, rows)
+    _count('stores')
+    return cache_file
+
+
+def _all_cache_files() -> List[str]:
+    out = []
+    if not os.path.isdir(DATA_DIR):
+        return out
+    for entry in os.listdir(DATA_DIR):
+        cf = os.path.join(DATA_DIR, entry, CACHE_FILENAME)
+        if os.path.isfile(cf):
+            out.append(cf)
+    return out
+
+
+def invalidate(project_path: Optional[str] = None, project_name: Optional[str] = None) -> int:
+    """Xoá cache của một project (theo project_name hoặc project_path), hoặc toàn bộ nếu không truyền gì.
+
+    Trả về số file cache đã xoá.
+    """
+    if project_path or project_name:
+        slug = project_name or project_slug_from_path(project_path)
+        files = [os.path.join(DATA_DIR, slug, CACHE_FILENAME)]
+    else:
+        files = _all_cache_files()
+    removed = 0
+    for cf in files:
+        try:
+            if os.path.isfile(cf):
+                os.remove(cf)
+                removed += 1
+        except Exception as e:
+            print(f"[extract_cache] WARN: cannot remove {cf}: {e}")
+    return removed
+
+
+def cache_stats() -> Dict:
+    """Bộ đếm hit/miss trong process hiện tại + số file cache và tổng dung lượng trên đĩa."""
+    with _lock:
+        stats = dict(_counters)
+    files = _all_cache_files()
+    stats['entries'] = len(files)
+    total = 0
+    for cf in files:
+        try:
+            total += os.path.getsize(cf)
+        except OSError:
+            pass
+    stats['bytes'] = total
+    return stats
@@ -15,19 +15,95 @@ Luồng chính tách riêng:
  - get_links_main: Giữ tương thích cũ, gọi lần lượt 2 luồng trên.
 """
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from time import sleep
-from typing import List, Optional
-import re
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+except ImportError:  # backend 'http' chạy được không cần selenium
+    webdriver = None
+from functools import partial
+from time import monotonic, sleep
+from typing import Dict, Iterable, List, Optional
+import json
 import os
-from pywinauto.keyboard import send_keys
+try:
+    from pywinauto.keyboard import send_keys
+except ImportError:  # chỉ cần cho get_dl_link_image (Windows)
+    send_keys = None
 
+try:
+    from .driver_pool import scrape_parallel  # type: ignore
+    from .yt_results import FALLBACK_VIDEO_LINK, filter_results, search_url, duration_filter_param  # type: ignore
+    from .image_results import MIN_DIMENSION, image_search_url, is_protected, default_validator, parse_image_entries, filter_images  # type: ignore
+    from . import yt_http  # type: ignore
+    from . import yt_devtools  # type: ignore
+    from .link_journal import LinkJournal  # type: ignore
+    from .rate_limit import default_limiter, detect_block, host_of  # type: ignore
+    from .scrape_metrics import MetricsSink, add_phase, make_record, metrics_dir_for  # type: ignore
+except ImportError:
+    import sys as _sys
+    _ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if _ROOT_DIR not in _sys.path:
+        _sys.path.insert(0, _ROOT_DIR)
+    from core.downloadTool.driver_pool import scrape_parallel  # type: ignore
+    from core.downloadTool.yt_results import FALLBACK_VIDEO_LINK, filter_results, search_url, duration_filter_param  # type: ignore
+    from core.downloadTool.image_results import MIN_DIMENSION, image_search_url, is_protected, default_validator, parse_image_entries, filter_images  # type: ignore
+    from core.downloadTool import yt_http  # type: ignore
+    from core.downloadTool import yt_devtools  # type: ignore
+    from core.downloadTool.link_journal import LinkJournal  # type: ignore
+    from core.downloadTool.rate_limit import default_limiter, detect_block, host_of  # type: ignore
+    from core.downloadTool.scrape_metrics import MetricsSink, add_phase, make_record, metrics_dir_for  # type: ignore
 
-def init_driver(headless: bool = False):
+# 'browser': đọc kết quả đã render (DOM); 'devtools': Chrome nhưng đọc JSON kết quả từ performance log
+# (yt_devtools); 'http': không mở trình duyệt (yt_http)
+VIDEO_BACKENDS = ('browser', 'devtools', 'http')
+# 'dom': đọc URL ảnh gốc + kích thước từ dữ liệu trang (chạy headless / song song được);
+# 'keyboard': luồng cũ bấm phím RIGHT qua pywinauto (cần Chrome hiển thị, đang focus, Windows)
+IMAGE_BACKENDS = ('dom', 'keyboard')
+# Chờ sau mỗi lần scroll: trả về ngay khi số kết quả tăng (và ổn định 1 nhịp poll), tối đa SCROLL_WAIT_MAX giây
+SCROLL_WAIT_MAX = 2.2
+SCROLL_POLL = 0.15
+# Dừng scroll sớm sau chừng này lần scroll liên tiếp không có kết quả mới
+STAGNANT_SCROLLS = 2
+
+# Chế độ lean (chỉ dùng khi lấy link video): không tải ảnh / media / font / quảng cáo - analytics.
+# get_dl_link_video chỉ cần href + badge thời lượng (text) nên không mất dữ liệu.
+LEAN_CHROME_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.managed_default_content_settings.media_stream': 2,
+    'profile.managed_default_content_settings.sound': 2,
+}
+LEAN_BLOCKED_URLS = [
+    # ảnh / thumbnail / avatar
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.ico',
+    '*i.ytimg.com/*', '*yt3.ggpht.com/*', '*yt3.googleusercontent.com/*',
+    # media / preview tự phát
+    '*.mp4', '*.webm', '*.m4a', '*googlevideo.com/videoplayback*',
+    # font
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.gstatic.com/*',
+    # quảng cáo / analytics
+    '*doubleclick.net*', '*googlesyndication.com*', '*googleadservices.com*',
+    '*google-analytics.com*', '*googletagmanager.com*',
+    '*youtube.com/api/stats/*', '*youtube.com/pagead/*', '*youtube.com/ptracking*',
+    '*youtube.com/generate_204*',
+]
+# Fallback khi không có performance log: Resource Timing (resource khác origin thường báo 0)
+_PAGE_BYTES_JS = """
+let total = 0;
+for (const e of performance.getEntriesByType('navigation')) total += e.transferSize || 0;
+for (const e of performance.getEntriesByType('resource')) total += e.transferSize || 0;
+return total;
+"""
+
+
+def init_driver(headless: bool = False, lean: bool = False, track_bytes: bool = False):
+    """Chrome cho scrape. lean=True: chặn ảnh / media / font / quảng cáo (prefs + CDP
+    Network.setBlockedURLs) - chỉ dùng cho link video, collector ảnh cần ảnh.
+    track_bytes=True: bật performance log (Network) cho page_bytes; phải đọc log đều đặn."""
+    if webdriver is None:
+        raise RuntimeError("selenium is not installed (use backend='http' for video links)")
     opts = Options()
     if headless:
         opts.add_argument('--headless=new')
@@ -36,11 +112,49 @@ def init_driver(headless: bool = False):
     opts.add_argument('--disable-dev-shm-usage')
     opts.add_argument('--lang=en-US')
     opts.add_argument('--disable-notifications')
+    if track_bytes:
+        # Performance log (chỉ sự kiện Network) để page_bytes đo byte thực tải cho mỗi keyword
+        opts.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        opts.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+    if lean:
+        opts.add_experimental_option('prefs', LEAN_CHROME_PREFS)
+        opts.add_argument('--blink-settings=imagesEnabled=false')
+        opts.add_argument('--autoplay-policy=user-gesture-required')
+        opts.add_argument('--mute-audio')
     driver = webdriver.Chrome(options=opts)
     driver.set_page_load_timeout(60)
+    if lean:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+        except Exception as e:
+            print(f"[get_link] WARN: CDP request blocking unavailable ({e}) -> prefs only.")
     return driver
 
 
+def page_bytes(driver) -> Optional[int]:
+    """Số byte đã tải qua mạng từ lần gọi trước (tổng encodedDataLength của Network.loadingFinished
+    trong performance log; log được đọc hết nên gọi 1 lần / keyword). None nếu không đọc được."""
+    try:
+        entries = driver.get_log('performance')
+    except Exception:
+        entries = None
+    if entries is not None:
+        total = 0
+        for entry in entries:
+            try:
+                msg = json.loads(entry['message'])['message']
+            except Exception:
+                continue
+            if msg.get('method') == 'Network.loadingFinished':
+                total += int((msg.get('params') or {}).get('encodedDataLength') or 0)
+        return total
+    try:
+        return int(driver.execute_script(_PAGE_BYTES_JS) or 0)
+    except Exception:
+        return None
+
+
 def close_driver(driver):
     try:
         driver.quit()
@@ -52,77 +166,429 @@ def read_keywords_from_file(file_path) -> List[str]:
     if not os.path.isfile(file_path):
         print(f"[get_link] Keywords file not found: {file_path}")
         return []
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        ordered = keywords_from_lines(f)
+    print(f"[get_link] Loaded {len(ordered)} unique keywords (order preserved).")
+    return ordered
+
+
+def _parse_keyword_line(raw: str) -> str:
+    line = raw.strip()
+    if not line:
+        return ''
+    # list_name.txt format expected: "<index> <keyword>" -> tách lấy phần sau index nếu phù hợp
+    parts = line.split(maxsplit=1)
+    if len(parts) == 2 and parts[0].isdigit():
+        return parts[1].strip()
+    return line
+
+
+def keywords_from_lines(lines: Iterable[str]) -> List[str]:
+    """Chuẩn hoá các dòng kiểu list_name.txt thành danh sách keyword duy nhất, giữ thứ tự."""
     ordered = []
     seen = set()
+    for raw in lines:
+        keyword = _parse_keyword_line(raw)
+        if keyword and keyword not in seen:
+            seen.add(keyword)
+            ordered.append(keyword)
+    return ordered
+
+
+def read_link_groups(file_path) -> Dict[str, List[str]]:
+    """Đọc file link dạng nhóm (dl_links.txt / dl_links_image.txt) -> {keyword: [links]}.
+
+    Khác downImage.parse_links_from_txt: giữ nguyên keyword (không thay space bằng '_')
+    để so khớp lại với list_name.txt.
+    """
+    groups: Dict[str, List[str]] = {}
+    if not os.path.isfile(file_path):
+        return groups
+    current = None
     with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
         for raw in f:
             line = raw.strip()
             if not line:
                 continue
-            # list_name.txt format expected: "<index> <keyword>" -> tách lấy phần sau index nếu phù hợp
-            parts = line.split(maxsplit=1)
-            if len(parts) == 2 and parts[0].isdigit():
-                keyword = parts[1].strip()
-            else:
-                keyword = line
-            if keyword and keyword not in seen:
-                seen.add(keyword)
-                ordered.append(keyword)
-    print(f"[get_link] Loaded {len(ordered)} unique keywords (order preserved).")
-    return ordered
+            if line.startswith('http://') or line.startswith('https://'):
+                if current is not None:
+                    groups[current].append(line)
+                continue
+            current = _parse_keyword_line(line)
+            groups.setdefault(current, [])
+    return groups
 
 
-def _clean_href(href: str) -> str:
-    if not href:
-        return ''
-    if href.startswith('/watch'):  # relative path case
-        href = 'https://www.youtube.com' + href
-    # remove typical noise params
-    cut_tokens = ['&pp=ygU', '&start_radio=1', '&list=']
-    for token in cut_tokens:
-        if token in href:
-            href = href.split(token)[0]
-    return href
-
-
-def _parse_duration_to_seconds(txt: str) -> Optional[int]:
-    if not txt:
-        return None
-    t = txt.strip().upper()
-    if any(b in t for b in ['LIVE', 'TRỰC TIẾP', 'PREMIERE', 'UPCOMING']):
-        return None
-    parts = t.split(':')
-    if not all(p.isdigit() for p in parts):
-        return None
-    if len(parts) == 2:
-        m, s = parts
-        return int(m)*60 + int(s)
-    if len(parts) == 3:
-        h, m, s = parts
-        return int(h)*3600 + int(m)*60 + int(s)
-    return None
-
-
-def _parse_aria_duration(label: str) -> Optional[int]:
-    """Parse aria-label like '1 hour, 56 minutes, 30 seconds' -> seconds."""
-    if not label:
-        return None
-    text = label.lower()
-    # quick reject for live-like labels
-    if any(k in text for k in ['live', 'premiere', 'upcoming']):
-        return None
-    h = m = s = 0
-    mh = re.search(r'(\d+)\s*hour', text)
-    mm = re.search(r'(\d+)\s*minute', text)
-    ms = re.search(r'(\d+)\s*second', text)
-    if mh:
-        h = int(mh.group(1))
-    if mm:
-        m = int(mm.group(1))
-    if ms:
-        s = int(ms.group(1))
-    total = h*3600 + m*60 + s
-    return total if total > 0 else None
+def write_link_groups(file_path, keywords: List[str], groups: Dict[str, List[str]]) -> int:
+    """Ghi lại toàn bộ file link theo thứ tự keywords (đánh số lại stt), thay thế nguyên tử.
+
+    Trả về tổng số link đã ghi.
+    """
+    total = 0
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for stt, keyword in enumerate(keywords, start=1):
+            f.write(f"{stt} {keyword}\n")
+            for link in groups.get(keyword, []):
+                total += 1
+                f.write(f"{link}\n")
+    os.replace(tmp_path, file_path)
+    return total
+
+
+def _incremental_targets(keywords: List[str], existing: Dict[str, List[str]], only_keywords: Iterable[str]) -> List[str]:
+    """Keyword cần scrape ở chế độ incremental: các keyword được chỉ định + keyword chưa có nhóm."""
+    wanted = set(only_keywords)
+    return [k for k in keywords if k in wanted or k not in existing]
+
+
+def _scrape_keywords(
+    keywords: List[str],
+    headless: bool,
+    collect,
+    kind: str,
+    workers: int = 1,
+    on_result=None,
+    backend: str = 'browser',
+    cache=None,
+    cache_params: Optional[Dict] = None,
+    on_complete=None,
+    lean: bool = False,
+    service=None,
+    on_metrics=None,
+) -> Dict[str, List[str]]:
+    """Gọi collect(driver, keyword, stats) cho từng keyword trên `workers` driver (xem driver_pool).
+
+    backend='http': "driver" là requests.Session của yt_http thay cho Chrome.
+    cache: link_cache.LinkCache (tuỳ chọn); cache_params = max_results/min_minutes/max_minutes
+    của khoá cache. Keyword trúng cache không cần driver (không mở trang).
+    Lỗi từng keyword -> []. on_result(index, keyword, links) được gọi theo đúng thứ tự keywords;
+    on_complete(keyword, links) được gọi ngay khi mỗi keyword xong (kể cả trúng cache, không
+    gọi cho keyword lỗi), không theo thứ tự - dùng cho journal.
+    lean: Chrome chặn ảnh / media / quảng cáo (init_driver(lean=True)).
+    service: browser_service.BrowserService (tuỳ chọn) - mượn Chrome đang mở thay vì mở / đóng mới.
+    Không nghỉ cố định giữa 2 keyword: collector chờ lượt qua rate_limit (chung mọi driver / thread).
+    on_metrics(record): bản ghi scrape_metrics.make_record cho mỗi keyword đã scrape (kể cả lỗi,
+    không gồm keyword trúng cache); stats của collector được truyền qua tham số thứ 3.
+    """
+    if not keywords:
+        return {}
+    if on_metrics is None:
+        scrape = lambda driver, keyword: collect(driver, keyword, None)
+    else:
+        def scrape(driver, keyword):
+            stats: Dict = {}
+            links = error = None
+            t0 = monotonic()
+            try:
+                links = collect(driver, keyword, stats)
+                return links
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                on_metrics(make_record(keyword, kind, backend, monotonic() - t0, stats, links, error))
+    lookup = store = None
+    if cache is not None:
+        params = dict(cache_params or {})
+
+        def lookup(keyword):
+            links = cache.get(keyword, kind, **params)
+            if links is not None and on_complete is not None:
+                on_complete(keyword, links)
+            return links
+
+        def store(keyword, links):
+            cache.put(keyword, kind, links=links, **params)
+            if on_complete is not None:
+                on_complete(keyword, links)
+    elif on_complete is not None:
+        store = on_complete
+    if backend == 'http':
+        pool_kwargs = dict(
+            make_driver=yt_http.new_session,
+            close_driver=lambda session: session.close(),
+            delay=0,  # nhịp request do rate_limit quyết định
+            is_alive=lambda session: True,
+        )
+    else:
+        # Performance log chỉ khi có người đọc: đo byte ở chế độ lean, hoặc backend devtools
+        profile = dict(headless=headless, lean=lean, track_bytes=(kind == 'video' and (lean or backend == 'devtools')))
+        if service is not None:
+            pool_kwargs = dict(
+                make_driver=lambda: service.acquire(**profile),
+                close_driver=service.release,
+                renew=service.renew,
+                delay=0,
+            )
+        else:
+            pool_kwargs = dict(make_driver=lambda: init_driver(**profile), close_driver=close_driver, delay=0)
+    results = scrape_parallel(
+        keywords,
+        scrape,
+        workers=workers,
+        on_result=on_result,
+        kind=kind,
+        lookup=lookup,
+        store=store,
+        **pool_kwargs,
+    )
+    return dict(zip(keywords, results))
+
+
+def scrape_video_links(
+    keywords: List[str],
+    headless: bool = False,
+    max_per_keyword: int = 2,
+    max_minutes: Optional[int] = None,
+    min_minutes: Optional[int] = None,
+    workers: int = 1,
+    on_result=None,
+    backend: str = 'browser',
+    cache=None,
+    on_complete=None,
+    lean: bool = False,
+    service=None,
+    skip=None,
+    on_metrics=None,
+) -> Dict[str, List[str]]:
+    """Scrape link video cho danh sách keyword (`workers` driver song song) -> {keyword: [links]}.
+
+    backend: 'browser' (Chrome qua Selenium, đọc DOM), 'devtools' (Chrome, đọc JSON kết quả qua
+    performance log - get_dl_link_video_devtools) hoặc 'http' (yt_http, không cần trình duyệt).
+    lean: backend browser / devtools chạy Chrome không tải ảnh / media / font / quảng cáo.
+    cache: link_cache.LinkCache dùng chung giữa các project (None = không cache).
+    on_complete(keyword, links): gọi ngay khi mỗi keyword xong (vd. LinkJournal.record).
+    service: browser_service.BrowserService dùng lại Chrome giữa các lần gọi (backend browser).
+    skip: link_registry.LinkRegistry.skipper(...) - bỏ video đã dùng ở project khác; khi có skip
+    thì không dùng cache (kết quả cache được lấy không có lọc này).
+    on_metrics(record): số đo từng keyword (scrape_metrics), xem _scrape_keywords.
+    """
+    if backend not in VIDEO_BACKENDS:
+        raise ValueError(f"unknown video backend: {backend}")
+    if backend == 'http':
+        def collect(session, keyword, stats=None):
+            return yt_http.get_dl_link_video_http(
+                keyword,
+                max_results=max_per_keyword,
+                max_minutes=max_minutes,
+                min_minutes=min_minutes,
+                session=session,
+                skip=skip,
+                stats=stats,
+            )
+    else:
+        if backend == 'devtools':
+            collector = get_dl_link_video_devtools
+        else:
+            # page_bytes chỉ đọc được performance log khi lean (xem _scrape_keywords)
+            collector = partial(get_dl_link_video, measure_bytes=lean)
+
+        def collect(driver, keyword, stats=None):
+            return collector(
+                driver,
+                keyword,
+                max_results=max_per_keyword,
+                max_minutes=max_minutes,
+                min_minutes=min_minutes,
+                skip=skip,
+                stats=stats,
+            )
+    return _scrape_keywords(
+        keywords,
+        headless,
+        collect,
+        'video',
+        workers=workers,
+        on_result=on_result,
+        backend=backend,
+        cache=cache if skip is None else None,
+        cache_params={'max_results': max_per_keyword, 'min_minutes': min_minutes, 'max_minutes': max_minutes},
+        on_complete=on_complete,
+        lean=lean,
+        service=service,
+        on_metrics=on_metrics,
+    )
+
+
+def scrape_image_links(
+    keywords: List[str],
+    headless: bool = False,
+    images_per_keyword: int = 10,
+    on_result=None,
+    cache=None,
+    workers: int = 1,
+    backend: str = 'dom',
+    on_complete=None,
+    service=None,
+    skip=None,
+    on_metrics=None,
+) -> Dict[str, List[str]]:
+    """Scrape link ảnh cho danh sách keyword -> {keyword: [links]}.
+
+    backend: 'dom' (get_dl_link_image_dom, headless được, `workers` driver song song) hoặc
+    'keyboard' (get_dl_link_image, luôn 1 driver vì điều khiển bằng phím lên cửa sổ đang focus).
+    cache, on_complete, service, skip, on_metrics: như scrape_video_links.
+    """
+    if backend not in IMAGE_BACKENDS:
+        raise ValueError(f"unknown image backend: {backend}")
+    img_count = images_per_keyword if images_per_keyword and images_per_keyword > 0 else 10
+    if backend == 'keyboard':
+        collect = lambda driver, keyword, stats=None: get_dl_link_image(driver, keyword, num_of_image=img_count, skip=skip, stats=stats)
+        workers = 1
+    else:
+        collect = lambda driver, keyword, stats=None: get_dl_link_image_dom(driver, keyword, num_of_image=img_count, skip=skip, stats=stats)
+    return _scrape_keywords(
+        keywords,
+        headless,
+        collect,
+        'image',
+        workers=workers,
+        on_result=on_result,
+        backend=backend,
+        cache=cache if skip is None else None,
+        cache_params={'max_results': img_count},
+        on_complete=on_complete,
+        service=service,
+        on_metrics=on_metrics,
+    )
+
+
+# Một lần execute_script lấy href / video id / thời lượng của mọi kết quả từ index arguments[0]
+_RESULTS_JS = r"""
+const start = arguments[0] || 0;
+const els = document.querySelectorAll('#video-title');
+const out = [];
+for (let i = start; i < els.length; i++) {
+  const el = els[i];
+  const href = el.getAttribute('href') || el.href || '';
+  let vid = '';
+  const m = href.match(/[?&]v=([^&]+)/);
+  if (m) vid = m[1];
+  let durationText = '';
+  let aria = '';
+  const box = el.closest('ytd-video-renderer, ytd-rich-item-renderer');
+  if (box) {
+    const nodes = box.querySelectorAll(
+      'ytd-thumbnail-overlay-time-status-renderer .badge-shape__text, ' +
+      'ytd-thumbnail-overlay-time-status-renderer .yt-badge-shape__text');
+    for (const n of nodes) {
+      const t = (n.textContent || '').trim();
+      if (t.indexOf(':') >= 0) { durationText = t; break; }
+    }
+    const badge = box.querySelector('ytd-thumbnail-overlay-time-status-renderer badge-shape[aria-label]');
+    if (badge) aria = badge.getAttribute('aria-label') || '';
+  }
+  out.push({href: href, video_id: vid, duration_text: durationText, aria_duration: aria});
+}
+return {total: els.length, items: out};
+"""
+
+
+def _extract_results_webdriver(driver, start: int):
+    """Đường cũ (nhiều round trip WebDriver / phần tử) - chỉ dùng khi execute_script lỗi."""
+    try:
+        elements = driver.find_elements(By.ID, 'video-title')
+    except Exception:
+        return [], start
+    items = []
+    for el in elements[start:]:
+        item = {'href': '', 'video_id': '', 'duration_text': '', 'aria_duration': ''}
+        try:
+            item['href'] = el.get_attribute('href') or ''
+            container = el.find_element(By.XPATH, '(./ancestor::ytd-video-renderer | ./ancestor::ytd-rich-item-renderer)[1]')
+            time_nodes = container.find_elements(
+                By.XPATH,
+                ".//ytd-thumbnail-overlay-time-status-renderer//*[contains(@class,'badge-shape__text') or contains(@class,'yt-badge-shape__text')]"
+            )
+            for tn in time_nodes:
+                raw = (tn.text or '').strip()
+                if ':' in raw:
+                    item['duration_text'] = raw
+                    break
+            if not item['duration_text']:
+                badge = container.find_element(By.XPATH, ".//ytd-thumbnail-overlay-time-status-renderer//badge-shape[@aria-label]")
+                item['aria_duration'] = badge.get_attribute('aria-label') or ''
+        except Exception:
+            pass
+        items.append(item)
+    return items, max(start, len(elements))
+
+
+def _extract_results(driver, start: int = 0):
+    """Kết quả tìm kiếm đã render từ index `start`: ([{href, video_id, duration_text, aria_duration}], next_index).
+
+    Dùng 1 lần execute_script cho cả trang; fallback về đường WebDriver từng phần tử nếu lỗi.
+    """
+    try:
+        data = driver.execute_script(_RESULTS_JS, start)
+        if isinstance(data, dict) and isinstance(data.get('items'), list):
+            return data['items'], max(start, int(data.get('total') or 0))
+    except Exception as e:
+        print(f"[get_link] Result extraction script failed (fallback to WebDriver): {e}")
+    return _extract_results_webdriver(driver, start)
+
+
+_VIDEO_COUNT_JS = "return document.querySelectorAll('#video-title').length;"
+
+
+def _result_count(driver, count_js: str = _VIDEO_COUNT_JS) -> int:
+    try:
+        return int(driver.execute_script(count_js) or 0)
+    except Exception:
+        return -1
+
+
+def _wait_for_more_results(driver, prev_total: int, timeout: float = SCROLL_WAIT_MAX, count_js: str = _VIDEO_COUNT_JS) -> bool:
+    """Chờ tới khi số kết quả (mặc định #video-title) vượt prev_total và không tăng thêm trong
+    1 nhịp poll (trang render xong lô mới).
+
+    Trả về False nếu hết timeout mà không có kết quả mới.
+    """
+    deadline = monotonic() + timeout
+    last = None
+    while True:
+        count = _result_count(driver, count_js)
+        if count > prev_total and count == last:
+            return True
+        if monotonic() >= deadline:
+            return count > prev_total
+        last = count
+        sleep(SCROLL_POLL)
+
+
+def _acquire(limiter, host: str, stats: Optional[Dict]):
+    """limiter.acquire(host), cộng thời gian chờ lượt vào pha 'rate_wait' của stats."""
+    waited = limiter.acquire(host)
+    if stats is not None and waited:
+        phases = stats.setdefault('phases', {})
+        phases['rate_wait'] = phases.get('rate_wait', 0.0) + waited
+
+
+def _navigate(limiter, host: str, driver, url: str) -> float:
+    """driver.get(url); lỗi điều hướng (timeout, mất kết nối) báo lỗi cho rate limiter rồi ném lại.
+    Trả về monotonic() lúc bắt đầu mở trang."""
+    t_nav = monotonic()
+    try:
+        driver.get(url)
+    except Exception:
+        limiter.report(host, ok=False)
+        raise
+    return t_nav
+
+
+def _report_page(limiter, host: str, driver, t_nav: float, t_loaded: float, found: bool, keyword: str):
+    """Báo kết quả mở trang cho rate limiter.
+
+    Có kết quả -> latency = mở trang tới kết quả đầu tiên. Không có kết quả -> kiểm tra trang chặn
+    (captcha / consent); không bị chặn thì là trang hợp lệ 0 kết quả (vẫn ok, latency chỉ tính tới
+    lúc driver.get xong để thời gian chờ kết quả không làm chậm host).
+    """
+    blocked = None if found else detect_block(driver)
+    if blocked:
+        print(f"[get_link] WARNING: {blocked} page for '{keyword}' -> slow down {host}.")
+    latency = (monotonic() if found else t_loaded) - t_nav
+    limiter.report(host, latency=latency, blocked=bool(blocked))
 
 
 def get_dl_link_video(
@@ -132,121 +598,283 @@ def get_dl_link_video(
     max_minutes: Optional[int] = None,
     min_minutes: Optional[int] = None,
     max_scrolls: int = 8,
+    cache=None,
+    stats: Optional[Dict] = None,
+    skip=None,
+    limiter=None,
+    measure_bytes: bool = True,
 ) -> List[str]:
-    search_url = f"https://www.youtube.com/results?search_query={keyword}".replace(' ', '+')
-    print(f"[get_link] Navigate: {search_url}")
-    driver.get(search_url)
+    """Link video YouTube cho 1 keyword. cache (link_cache.LinkCache): trúng -> trả ngay, không mở trang.
+
+    Sau mỗi lần scroll chờ theo sự kiện (_wait_for_more_results) thay vì sleep cố định; dừng sớm
+    sau STAGNANT_SCROLLS lần scroll liên tiếp không có kết quả mới.
+    min/max phút được đưa vào bộ lọc thời lượng của YouTube (yt_results.search_url) khi khớp 1 nhóm;
+    filter_results vẫn lọc chính xác sau đó.
+    Base URL lấy từ yt_http.base_url() (AUTOTOOL_YOUTUBE_BASE_URL - server replay cục bộ, xem replay.py).
+    stats (dict, tuỳ chọn) nhận: load_wait_seconds, scroll_wait_seconds, scrolls, stagnant_stop,
+    bytes (byte đã tải cho trang kết quả, để so sánh chế độ lean), duration_filter (giá trị sp
+    hoặc None), examined / accepted / accept_ratio (số kết quả đã xét / đã nhận), phases /
+    scroll_seconds / counters (scrape_metrics).
+    skip(href) -> True: bỏ video đã dùng ở project khác (link_registry, xem filter_results).
+    limiter (rate_limit.RateLimiter, mặc định default_limiter()): chờ lượt trước khi mở trang / scroll,
+    báo latency mở trang, trang chặn và lỗi điều hướng để tự điều chỉnh tốc độ (_report_page).
+    measure_bytes=False: bỏ page_bytes (driver không bật performance log), stats['bytes'] = None.
+    """
+    limiter = limiter or default_limiter()
+    stats = stats if stats is not None else {}
+    cache_params = {'max_results': max_results, 'min_minutes': min_minutes, 'max_minutes': max_minutes}
+    if cache is not None:
+        cached = cache.get(keyword, 'video', **cache_params)
+        if cached is not None:
+            print(f"[get_link] Cache hit: '{keyword}' -> {len(cached)} links")
+            return cached
+    url = search_url(keyword, min_minutes, max_minutes, base=yt_http.base_url())
+    host = host_of(url)
+    _acquire(limiter, host, stats)
+    print(f"[get_link] Navigate: {url}")
+    t_nav = _navigate(limiter, host, driver, url)
     # Wait for video title elements
+    t_wait = add_phase(stats, 'navigate', t_nav)
+    found = True
     try:
         WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, 'video-title')))
     except Exception as e:
+        found = False
         print(f"[get_link] WARNING: Timeout loading results for '{keyword}': {e}")
+    load_wait = add_phase(stats, 'first_result', t_wait) - t_wait
+    _report_page(limiter, host, driver, t_nav, t_wait, found, keyword)
+    scroll_wait = 0.0
+    scroll_seconds: List[float] = []
+    counters: Dict = {}
+    stagnant = 0
     want = max_results
     links: List[str] = []
     max_seconds = max_minutes * 60 if max_minutes else None
     min_seconds = min_minutes * 60 if min_minutes else None
 
     processed_ids = set()
+    examined = 0
+    next_index = 0
     scroll_count = 0
     num_scroll = 6
     # Loop scroll until we have enough links or reach scroll cap
     while len(links) < want and scroll_count <= max_scrolls:
-        try:
-            elements = driver.find_elements(By.ID, 'video-title')
-        except Exception:
-            elements = []
-        # process newly appeared elements
-        for el in elements:
-            if len(links) >= want:
-                break
-            try:
-                vid_href_raw = el.get_attribute('href')
-                href = _clean_href(vid_href_raw)
-                if not href or href in links:
-                    continue
-                # generate a simple id (video id) to avoid re-processing
-                vid_id = None
-                if 'watch?v=' in href:
-                    vid_id = href.split('watch?v=')[-1].split('&')[0]
-                if vid_id and vid_id in processed_ids:
-                    continue
-                if vid_id:
-                    processed_ids.add(vid_id)
-                dur_seconds = None
-                if max_seconds is not None or min_seconds is not None:
-                    try:
-                        container = el.find_element(By.XPATH, '(./ancestor::ytd-video-renderer | ./ancestor::ytd-rich-item-renderer)[1]')
-                    except Exception:
-                        container = None
-                    if container is not None:
-                        try:
-                            time_nodes = container.find_elements(
-                                By.XPATH,
-                                ".//ytd-thumbnail-overlay-time-status-renderer//*[contains(@class,'badge-shape__text') or contains(@class,'yt-badge-shape__text')]"
-                            )
-                            for tn in time_nodes:
-                                raw = (tn.text or '').strip()
-                                if ':' in raw:
-                                    dur_seconds = _parse_duration_to_seconds(raw)
-                                    if dur_seconds is not None:
-                                        break
-                        except Exception:
-                            pass
-                        if dur_seconds is None:
-                            try:
-                                badge = container.find_element(By.XPATH, ".//ytd-thumbnail-overlay-time-status-renderer//badge-shape[@aria-label]")
-                                aria = badge.get_attribute('aria-label') or ''
-                                dur_seconds = _parse_aria_duration(aria)
-                            except Exception:
-                                pass
-                    if dur_seconds is None:
-                        continue
-                    if max_seconds is not None and dur_seconds > max_seconds:
-                        continue
-                    if min_seconds is not None and dur_seconds < min_seconds:
-                        continue
-                links.append(href)
-            except Exception:
-                continue
+        # Chỉ lấy các kết quả mới xuất hiện sau lần scroll trước (từ next_index)
+        t_step = monotonic()
+        items, next_index = _extract_results(driver, next_index)
+        t_step = add_phase(stats, 'extract', t_step)
+        examined += filter_results(items, links, processed_ids, want, min_seconds, max_seconds, skip, counters)
+        add_phase(stats, 'filter', t_step)
         if len(links) >= want:
             break
         # Scroll further
         scroll_count += 1
         if(scroll_count > num_scroll):
             break
+        _acquire(limiter, host, stats)  # scroll -> trang gọi continuation tới cùng host
         try:
             driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
         except Exception as e:
             print(f"[get_link] Scroll exec error (ignored): {e}")
             break
-        sleep(1.6 if scroll_count < 3 else 2.2)
+        t_wait = monotonic()
+        grew = _wait_for_more_results(driver, next_index)
+        waited = add_phase(stats, 'scroll', t_wait) - t_wait
+        scroll_wait += waited
+        scroll_seconds.append(waited)
+        stagnant = 0 if grew else stagnant + 1
+        if stagnant >= STAGNANT_SCROLLS:
+            print(f"[get_link] No new results after {stagnant} scrolls -> stop scrolling.")
+            break
     if len(links) < want:
         print(f"[get_link] Reached scroll limit ({scroll_count}/{max_scrolls}) with only {len(links)}/{want} links.")
-    print(f"[get_link] Keyword '{keyword}' -> {len(links)} links (filtered)")
+    loaded = page_bytes(driver) if measure_bytes else None
+    accept_ratio = len(links) / examined if examined else None
+    print(f"[get_link] Keyword '{keyword}' -> {len(links)} links (filtered, "
+          f"accepted {len(links)}/{examined}, {scroll_count} scrolls, "
+          f"wait load {load_wait:.1f}s + scroll {scroll_wait:.1f}s"
+          + (f", {loaded / 1024:.0f} KB)" if loaded is not None else ")"))
+    stats.update({
+        'load_wait_seconds': round(load_wait, 3),
+        'scroll_wait_seconds': round(scroll_wait, 3),
+        'scroll_seconds': scroll_seconds,
+        'scrolls': scroll_count,
+        'stagnant_stop': stagnant >= STAGNANT_SCROLLS,
+        'bytes': loaded,
+        'duration_filter': duration_filter_param(min_minutes, max_minutes),
+        'examined': examined,
+        'accepted': len(links),
+        'accept_ratio': round(accept_ratio, 3) if accept_ratio is not None else None,
+        'counters': counters,
+    })
     if not links:
         # fallback 1 link mặc định để tránh rỗng hoàn toàn
-        links.append("https://www.youtube.com/watch?v=WqQUvfsavO4")
+        links.append(FALLBACK_VIDEO_LINK)
+    elif cache is not None:
+        cache.put(keyword, 'video', links=links, **cache_params)
     return links
 
 
+def _wait_for_search_responses(log, timeout: float = SCROLL_WAIT_MAX) -> List[Dict]:
+    """Chờ response continuation (/youtubei/v1/search) mới trong performance log, [] nếu hết timeout."""
+    deadline = monotonic() + timeout
+    while True:
+        responses = log.search_responses()
+        if responses or monotonic() >= deadline:
+            return responses
+        sleep(SCROLL_POLL)
+
 
-def get_dl_link_image(driver, keyword, num_of_image=10):
+def get_dl_link_video_devtools(
+    driver,
+    keyword: str,
+    max_results: int,
+    max_minutes: Optional[int] = None,
+    min_minutes: Optional[int] = None,
+    max_scrolls: int = 8,
+    cache=None,
+    stats: Optional[Dict] = None,
+    skip=None,
+    limiter=None,
+) -> List[str]:
+    """Như get_dl_link_video nhưng đọc videoId + thời lượng từ JSON trang nhận được (yt_devtools):
+    ytInitialData cho trang đầu, response /youtubei/v1/search (performance log) cho các trang sau.
+
+    Scroll chỉ để kích hoạt continuation; không query DOM từng kết quả. Driver không có
+    performance log -> chuyển sang get_dl_link_video. stats, skip, limiter: như get_dl_link_video.
+    """
+    log = yt_devtools.NetworkLog(driver)
+    if not log.drain():  # đồng thời bỏ log cũ của keyword trước
+        print("[get_link] Performance log unavailable -> DOM collector.")
+        return get_dl_link_video(driver, keyword, max_results, max_minutes, min_minutes, max_scrolls, cache, stats, skip, limiter)
+    limiter = limiter or default_limiter()
+    stats = stats if stats is not None else {}
+    log.bytes = 0
+    cache_params = {'max_results': max_results, 'min_minutes': min_minutes, 'max_minutes': max_minutes}
+    if cache is not None:
+        cached = cache.get(keyword, 'video', **cache_params)
+        if cached is not None:
+            print(f"[get_link] Cache hit: '{keyword}' -> {len(cached)} links")
+            return cached
+    url = search_url(keyword, min_minutes, max_minutes, base=yt_http.base_url())
+    host = host_of(url)
+    _acquire(limiter, host, stats)
+    print(f"[get_link] Navigate: {url}")
+    t_nav = _navigate(limiter, host, driver, url)
+    t_wait = add_phase(stats, 'navigate', t_nav)
+    first = None
+    deadline = t_wait + 20
+    while first is None and monotonic() < deadline:
+        first = yt_devtools.initial_results(driver)
+        if first is None:
+            sleep(SCROLL_POLL)
+    # ytInitialData được parse ngay khi đọc được nên thời gian chờ gồm cả extract trang đầu
+    load_wait = add_phase(stats, 'first_result', t_wait) - t_wait
+    _report_page(limiter, host, driver, t_nav, t_wait, first is not None, keyword)
+    if first is None:
+        print(f"[get_link] WARNING: ytInitialData not found for '{keyword}'")
+        first = ([], None)
+    items, token = first
+    scroll_wait = 0.0
+    scroll_seconds: List[float] = []
+    counters: Dict = {}
+    stagnant = 0
+    want = max_results
+    links: List[str] = []
+    max_seconds = max_minutes * 60 if max_minutes else None
+    min_seconds = min_minutes * 60 if min_minutes else None
+    processed_ids = set()
+    t_step = monotonic()
+    examined = filter_results(items, links, processed_ids, want, min_seconds, max_seconds, skip, counters)
+    add_phase(stats, 'filter', t_step)
+    scroll_count = 0
+    num_scroll = 6
+    while len(links) < want and token and scroll_count < min(num_scroll, max_scrolls):
+        scroll_count += 1
+        _acquire(limiter, host, stats)
+        try:
+            driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
+        except Exception as e:
+            print(f"[get_link] Scroll exec error (ignored): {e}")
+            break
+        t_wait = monotonic()
+        responses = _wait_for_search_responses(log)
+        waited = add_phase(stats, 'scroll', t_wait) - t_wait
+        scroll_wait += waited
+        scroll_seconds.append(waited)
+        stagnant = 0 if responses else stagnant + 1
+        if stagnant >= STAGNANT_SCROLLS:
+            print(f"[get_link] No continuation after {stagnant} scrolls -> stop scrolling.")
+            break
+        for data in responses:
+            t_step = monotonic()
+            items, next_token = yt_http.parse_results(data)
+            token = next_token
+            t_step = add_phase(stats, 'extract', t_step)
+            examined += filter_results(items, links, processed_ids, want, min_seconds, max_seconds, skip, counters)
+            add_phase(stats, 'filter', t_step)
+    log.drain()
+    print(f"[get_link] Keyword '{keyword}' -> {len(links)} links (devtools, "
+          f"accepted {len(links)}/{examined}, {scroll_count} scrolls, "
+          f"wait load {load_wait:.1f}s + scroll {scroll_wait:.1f}s, {log.bytes / 1024:.0f} KB)")
+    stats.update({
+        'load_wait_seconds': round(load_wait, 3),
+        'scroll_wait_seconds': round(scroll_wait, 3),
+        'scroll_seconds': scroll_seconds,
+        'scrolls': scroll_count,
+        'stagnant_stop': stagnant >= STAGNANT_SCROLLS,
+        'bytes': log.bytes,
+        'duration_filter': duration_filter_param(min_minutes, max_minutes),
+        'examined': examined,
+        'accepted': len(links),
+        'accept_ratio': round(len(links) / examined, 3) if examined else None,
+        'counters': counters,
+    })
+    if not links:
+        links.append(FALLBACK_VIDEO_LINK)
+    elif cache is not None:
+        cache.put(keyword, 'video', links=links, **cache_params)
+    return links
+
+
+
+def get_dl_link_image(driver, keyword, num_of_image=10, cache=None, skip=None, limiter=None, stats=None):
     """Lấy danh sách link ảnh từ Google Images với các cải tiến:
     - Giữ thao tác phím RIGHT như bản gốc (di chuyển qua từng ảnh).
     - Loại bỏ ảnh có link bảo vệ: data:image/*, encrypted-tbn (thumbnail preview của Google).
     - Loại bỏ ảnh mờ / quá nhỏ theo kích thước hiển thị (naturalWidth/Height < 50).
-    - Loại bỏ ảnh < 10KB nếu lấy được Content-Length (dùng requests nếu có, fallback bỏ qua kiểm tra này nếu không có).
+    - Loại bỏ ảnh < 10KB nếu lấy được Content-Length (HEAD theo lô qua image_results.SizeValidator, bỏ qua nếu thiếu requests).
     - Tự động scroll nếu chưa thu đủ số ảnh.
+    - cache (link_cache.LinkCache): trúng -> trả ngay, không mở trang.
+    - skip(url) -> True: bỏ ảnh đã dùng ở project khác (link_registry).
+    - limiter (rate_limit.RateLimiter): chờ lượt trước mỗi lần mở trang / scroll thay cho sleep cố định.
+    - stats (dict, tuỳ chọn): phases / scroll_seconds / counters (scrape_metrics).
+
+    Cần pywinauto + cửa sổ Chrome hiển thị đang focus; get_dl_link_image_dom không cần.
     """
+    if cache is not None:
+        cached = cache.get(keyword, 'image', num_of_image)
+        if cached is not None:
+            print(f"[get_link] Cache hit: '{keyword}' -> {len(cached)} images")
+            return cached
+    if send_keys is None:
+        raise RuntimeError("pywinauto is not installed (use image backend 'dom')")
     try:
         driver.maximize_window()
     except Exception:
         pass
 
-    search_url = f"https://www.google.com/search?tbm=isch&q={keyword}".replace(' ', '+')
-    driver.get(search_url)
+    limiter = limiter or default_limiter()
+    stats = stats if stats is not None else {}
+    search_url = image_search_url(keyword)
+    host = host_of(search_url)
+    _acquire(limiter, host, stats)
+    t_nav = _navigate(limiter, host, driver, search_url)
     driver.implicitly_wait(10)
-    sleep(2)
+    t_wait = add_phase(stats, 'navigate', t_nav)
+    found = _wait_for_more_results(driver, 0, timeout=10, count_js=_IMAGE_COUNT_JS)
+    add_phase(stats, 'first_result', t_wait)
+    _report_page(limiter, host, driver, t_nav, t_wait, found, keyword)
 
     # Focus để điều khiển phím
     try:
@@ -258,10 +886,11 @@ def get_dl_link_image(driver, keyword, num_of_image=10):
             jsdata = list_div.get_attribute('jsdata')
             value2 = jsdata.split(';')[1]
             #thay link search_url thành
-            search_url = f"https://www.google.com/search?tbm=isch&q={keyword}#vhid={value2}&vssid=mosaic".replace(' ', '+')
+            search_url = image_search_url(keyword, f"#vhid={value2}&vssid=mosaic")
+            _acquire(limiter, host, stats)
             driver.get(search_url)
             driver.implicitly_wait(10)
-            sleep(2)
+            _wait_for_more_results(driver, 0, timeout=10, count_js=_IMAGE_COUNT_JS)
     except Exception:
         pass
     sleep(1)
@@ -269,43 +898,34 @@ def get_dl_link_image(driver, keyword, num_of_image=10):
     # Đưa selection về bên trái như logic cũ
     send_keys('{LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT} {LEFT}')
 
-    # Tham số
-    MIN_DIMENSION = 50  # tránh icon nhỏ / blur
-    MIN_FILE_KB = 10
+    # Tham số (MIN_DIMENSION / MIN_FILE_KB / is_protected: image_results)
     MAX_SCROLL_ATTEMPTS = 20
+    size_validator = default_validator()
     collected = []
     seen = set()
     scroll_attempts = 0
     right_moves = 0
+    scroll_seconds: List[float] = []
+    counters = {'candidates': 0, 'rejected_static': 0, 'duplicates': 0, 'skipped': 0, 'rejected_size': 0}
 
-    # Thử import requests để kiểm tra Content-Length
-    try:
-        import requests  # type: ignore
-        _has_requests = True
-    except Exception:
-        _has_requests = False
+    def keep_valid(links):
+        # HEAD theo lô, tính vào pha 'head'
+        t_head = monotonic()
+        valid = size_validator.keep_valid(links)
+        add_phase(stats, 'head', t_head)
+        counters['rejected_size'] += len(links) - len(valid)
+        return valid
 
-    def is_protected(src: str) -> bool:
-        if not src:
-            return True
-        if src.startswith('data:image/') or 'static.' in src or 'resizing.' in src:  # tránh ảnh tĩnh (icon, logo)
-            return True
-        if 'encrypted' in src:  # thumbnail preview
-            return True
-        return False
-
-    def file_size_ok(src: str) -> bool:
-        if not _has_requests:
-            return True  # không kiểm tra nếu thiếu thư viện
-        if not src.lower().startswith(('http://', 'https://')):
-            return True
+    def scroll_more():
+        before = _result_count(driver, _IMAGE_COUNT_JS)
+        _acquire(limiter, host, stats)
         try:
-            head = requests.head(src, timeout=5, allow_redirects=True)
-            cl = head.headers.get('Content-Length')
-            if cl and cl.isdigit():
-                return int(cl) >= MIN_FILE_KB * 1024
+            driver.execute_script('window.scrollBy(0, document.body.scrollHeight);')
         except Exception:
-            return True  # nếu lỗi HEAD thì bỏ qua lọc này
+            return False
+        t_scroll = monotonic()
+        _wait_for_more_results(driver, before, count_js=_IMAGE_COUNT_JS)
+        scroll_seconds.append(add_phase(stats, 'scroll', t_scroll) - t_scroll)
         return True
 
     while len(collected) < num_of_image and scroll_attempts <= MAX_SCROLL_ATTEMPTS:
@@ -316,20 +936,20 @@ def get_dl_link_image(driver, keyword, num_of_image=10):
         if not anchors:
             # nếu không còn anchor, scroll thử
             scroll_attempts += 1
-            try:
-                driver.execute_script('window.scrollBy(0, document.body.scrollHeight);')
-            except Exception:
+            if not scroll_more():
                 break
-            sleep(1.2)
             continue
 
         # Lấy anchor đầu tiên (giống logic gốc) - giả định phím RIGHT sẽ thay đổi "focus" ảnh hiển thị đầu danh sách / vùng hiển thị
+        t_step = monotonic()
         try:
             image_element = anchors[1]
             img_tag = image_element.find_elements(By.TAG_NAME, 'img')[0]
             img_src = img_tag.get_attribute('src') or ''
         except Exception:
             img_src = ''
+        if img_src:
+            counters['candidates'] += 1
 
         accept = True
         if not img_src:
@@ -346,14 +966,22 @@ def get_dl_link_image(driver, keyword, num_of_image=10):
                 w = h = 0
             if w < MIN_DIMENSION or h < MIN_DIMENSION:
                 accept = False
-
-        # Kiểm tra kích thước file HEAD (nếu có)
-        if accept and not file_size_ok(img_src):
-            accept = False
+        t_step = add_phase(stats, 'extract', t_step)
+        if img_src and not accept:
+            counters['rejected_static'] += 1
+        elif accept and img_src in seen:
+            counters['duplicates'] += 1
 
         if accept and img_src not in seen:
             seen.add(img_src)
-            collected.append(img_src)
+            if skip is None or not skip(img_src):
+                collected.append(img_src)
+            else:
+                counters['skipped'] += 1
+            add_phase(stats, 'filter', t_step)
+            # Đủ ứng viên -> kiểm tra dung lượng (HEAD) cả lô song song, thiếu thì đi tiếp
+            if len(collected) >= num_of_image:
+                collected = keep_valid(collected)
 
         # Di chuyển sang ảnh kế (giữ nguyên thao tác RIGHT như yêu cầu)
         send_keys('{RIGHT}')
@@ -363,14 +991,179 @@ def get_dl_link_image(driver, keyword, num_of_image=10):
         # Thỉnh thoảng scroll để load thêm (ví dụ mỗi 8 lần di chuyển)
         if len(collected) < num_of_image and right_moves % 8 == 0:
             scroll_attempts += 1
-            try:
-                driver.execute_script('window.scrollBy(0, document.body.scrollHeight);')
-            except Exception:
+            if not scroll_more():
                 break
-            sleep(0.5 if scroll_attempts < 5 else 0.8)
 
+    collected = keep_valid(collected)
+    counters['accepted'] = len(collected[:num_of_image])
+    stats.update({'scroll_seconds': scroll_seconds, 'scrolls': scroll_attempts, 'counters': counters})
+    if cache is not None:
+        cache.put(keyword, 'image', num_of_image, links=collected[:num_of_image])
     return collected[:num_of_image]
 
+
+# Một lần execute_script: các bộ ["<url>",cao,rộng] trong <script> của trang + ảnh đang có trong DOM
+_IMAGES_JS = r"""
+const re = /\["(https?:\/\/(?:[^"\\]|\\.)+)",(\d+),(\d+)\]/g;
+const chunks = [];
+for (const s of document.querySelectorAll('script')) {
+  const t = s.textContent || '';
+  if (t.indexOf('",') < 0 || t.indexOf('http') < 0) continue;
+  const found = t.match(re);
+  if (found) chunks.push(found.join('\n'));
+}
+const imgs = [];
+for (const img of document.images) {
+  const src = img.currentSrc || img.src || '';
+  if (src.startsWith('http')) imgs.push({url: src, width: img.naturalWidth || 0, height: img.naturalHeight || 0});
+}
+return {data: chunks, imgs: imgs};
+"""
+_IMAGE_COUNT_JS = "return document.images.length;"
+IMAGE_MAX_SCROLLS = 6
+
+
+def _extract_images(driver) -> List[Dict]:
+    """Ứng viên {url, width, height}: ảnh gốc từ dữ liệu trang trước, sau đó ảnh trong DOM."""
+    try:
+        data = driver.execute_script(_IMAGES_JS)
+    except Exception as e:
+        print(f"[get_link] Image extraction script failed: {e}")
+        return []
+    if not isinstance(data, dict):
+        return []
+    return parse_image_entries(data.get('data') or []) + list(data.get('imgs') or [])
+
+
+def get_dl_link_image_dom(driver, keyword, num_of_image=10, cache=None, max_scrolls: int = IMAGE_MAX_SCROLLS, skip=None, limiter=None, stats=None):
+    """Link ảnh Google Images không cần bàn phím (chạy được headless / nhiều driver song song).
+
+    Đọc hàng loạt URL ảnh gốc kèm kích thước từ dữ liệu nhúng trong trang (fallback: ảnh trong
+    DOM), scroll bằng JS khi chưa đủ; cùng bộ lọc is_protected / MIN_DIMENSION / MIN_FILE_KB
+    với get_dl_link_image. cache, skip, limiter, stats: như get_dl_link_image.
+    """
+    if cache is not None:
+        cached = cache.get(keyword, 'image', num_of_image)
+        if cached is not None:
+            print(f"[get_link] Cache hit: '{keyword}' -> {len(cached)} images")
+            return cached
+    limiter = limiter or default_limiter()
+    stats = stats if stats is not None else {}
+    search_url = image_search_url(keyword)
+    host = host_of(search_url)
+    _acquire(limiter, host, stats)
+    print(f"[get_link] Navigate: {search_url}")
+    t_nav = _navigate(limiter, host, driver, search_url)
+    t_wait = add_phase(stats, 'navigate', t_nav)
+    found = _wait_for_more_results(driver, 0, timeout=10, count_js=_IMAGE_COUNT_JS)
+    add_phase(stats, 'first_result', t_wait)
+    _report_page(limiter, host, driver, t_nav, t_wait, found, keyword)
+    collected: List[str] = []
+    seen = set()
+    scrolls = 0
+    stagnant = 0
+    scroll_seconds: List[float] = []
+    counters: Dict = {}
+    while True:
+        t_step = monotonic()
+        candidates = _extract_images(driver)
+        t_step = add_phase(stats, 'extract', t_step)
+        head_before = counters.get('head_seconds', 0.0)
+        filter_images(candidates, collected, seen, num_of_image, skip=skip, counters=counters)
+        # filter_images gồm cả HEAD: tách phần chờ HEAD sang pha 'head'
+        head = counters['head_seconds'] - head_before
+        add_phase(stats, 'filter', t_step + head)
+        add_phase(stats, 'head', monotonic() - head)
+        if len(collected) >= num_of_image or scrolls >= max_scrolls:
+            break
+        before = _result_count(driver, _IMAGE_COUNT_JS)
+        scrolls += 1
+        _acquire(limiter, host, stats)
+        try:
+            driver.execute_script('window.scrollBy(0, document.body.scrollHeight);')
+        except Exception:
+            break
+        t_wait = monotonic()
+        grew = _wait_for_more_results(driver, before, count_js=_IMAGE_COUNT_JS)
+        scroll_seconds.append(add_phase(stats, 'scroll', t_wait) - t_wait)
+        stagnant = 0 if grew else stagnant + 1
+        if stagnant >= STAGNANT_SCROLLS:
+            break
+    counters.pop('head_seconds', None)
+    stats.update({'scroll_seconds': scroll_seconds, 'scrolls': scrolls, 'counters': counters})
+    print(f"[get_link] Keyword '{keyword}' -> {len(collected)} images ({scrolls} scrolls)")
+    if cache is not None:
+        cache.put(keyword, 'image', num_of_image, links=collected)
+    return collected
+
+
+def _collect_with_journal(
+    keywords: List[str],
+    output_txt: str,
+    only_keywords,
+    params: Dict,
+    resume: bool,
+    scrape,
+    registry=None,
+    project: Optional[str] = None,
+    metrics: bool = True,
+) -> Optional[int]:
+    """Lấy link cho keywords (hoặc chỉ phần incremental) có journal, rồi ghi lại output_txt nguyên tử.
+
+    scrape(targets, on_complete, on_metrics) -> {keyword: [links]}. Keyword đã có trong journal
+    (resume) không scrape lại. Trả về tổng số link đã ghi, None nếu ghi lỗi (journal được giữ lại).
+    registry (link_registry.LinkRegistry): sau khi ghi, đăng ký link của file cho `project`.
+    metrics: ghi số đo từng keyword vào `<thư mục output_txt>/metrics/` (scrape_metrics).
+    """
+    existing: Dict[str, List[str]] = {}
+    if only_keywords is not None:
+        existing = read_link_groups(output_txt)
+        targets = _incremental_targets(keywords, existing, only_keywords)
+        print(f"[get_link] Incremental: scrape {len(targets)}/{len(keywords)} keywords, reuse {len(keywords) - len(targets)}.")
+    else:
+        targets = list(keywords)
+    journal = LinkJournal(output_txt, params, resume=resume)
+    sink = MetricsSink(metrics_dir_for(output_txt)) if metrics else None
+    try:
+        done = {k: journal.done[k] for k in targets if k in journal.done}
+        remaining = [k for k in targets if k not in done]
+        if done:
+            print(f"[get_link] Resume: skip {len(done)} keywords already in journal, scrape {len(remaining)}.")
+        scraped = scrape(remaining, journal.record, sink.record if sink is not None else None)
+    finally:
+        journal.close()
+        if sink is not None:
+            sink.close()
+    target_set = set(targets)
+    merged = {}
+    for k in keywords:
+        if k in target_set:
+            merged[k] = scraped[k] if k in scraped else done.get(k, [])
+        else:
+            merged[k] = existing.get(k, [])
+    try:
+        total = write_link_groups(output_txt, keywords, merged)
+    except Exception as e:
+        print(f"[get_link] ERROR writing {params.get('kind')} links: {e}")
+        return None
+    journal.finish()
+    if registry is not None:
+        registry.register_groups(merged, params.get('kind') or 'video', project or _project_of(output_txt))
+    return total
+
+
+def _project_of(output_txt: str) -> str:
+    """Tên project mặc định = thư mục chứa file link (data/<project>/dl_links.txt)."""
+    return os.path.basename(os.path.dirname(os.path.abspath(output_txt)))
+
+
+def _registry_skip(registry, registry_mode: str, projects: Iterable[str]):
+    """Hàm skip cho collector khi registry_mode='skip', ngược lại None."""
+    if registry is None or registry_mode != 'skip':
+        return None
+    return registry.skipper(projects)
+
+
 def get_links_main_video(
     keywords_file,
     output_txt,
@@ -379,6 +1172,16 @@ def get_links_main_video(
     max_per_keyword: int = 2,
     max_minutes: Optional[int] = None,
     min_minutes: Optional[int] = None,
+    only_keywords: Optional[Iterable[str]] = None,
+    workers: int = 1,
+    backend: str = 'browser',
+    cache=None,
+    resume: bool = True,
+    lean: bool = False,
+    service=None,
+    registry=None,
+    registry_mode: str = 'flag',
+    metrics: bool = True,
 ):
     """Thu link video theo từng keyword và ghi ra output_txt.
 
@@ -387,6 +1190,29 @@ def get_links_main_video(
     <link 1>
     <link 2>
     ...
+
+    only_keywords (incremental): nếu truyền, chỉ scrape các keyword này (cùng các keyword
+    chưa có nhóm trong output_txt); nhóm cũ của các keyword còn lại được giữ nguyên, nhóm
+    của keyword không còn trong keywords_file bị loại. File được ghi lại theo thứ tự mới.
+
+    workers: số Chrome chạy song song (driver_pool); thứ tự "<stt> <keyword>" trong file
+    vẫn giữ đúng thứ tự keyword.
+    backend: 'browser' (mặc định), 'devtools' (Chrome, đọc JSON kết quả) hoặc 'http' (yt_http, không mở Chrome).
+    cache: link_cache.LinkCache (tuỳ chọn), keyword trúng cache không cần mở trang.
+    lean: Chrome không tải ảnh / media / font / quảng cáo (init_driver(lean=True)).
+    service: browser_service.BrowserService - dùng lại Chrome đang mở (không mở / đóng mỗi lần gọi).
+
+    Mỗi keyword xong được ghi ngay vào journal `<output_txt>.journal.jsonl` (link_journal);
+    output_txt chỉ được thay thế (nguyên tử) khi chạy xong. resume=True: lần chạy bị dừng
+    trước đó (cùng tham số) được tiếp tục, keyword đã có trong journal không scrape lại.
+
+    registry (link_registry.LinkRegistry): link đã ghi được đăng ký cho project (project_name,
+    mặc định tên thư mục của output_txt). registry_mode 'flag': chỉ ghi log số link đã dùng ở
+    project khác; 'skip': collector bỏ các link đó và chọn kết quả khác.
+
+    metrics: mỗi keyword đã scrape được ghi 1 bản ghi (thời gian từng pha, số kết quả đã xét /
+    bị loại / nhận) vào `<thư mục output_txt>/metrics/links_<thời điểm>.jsonl`; tóm tắt bằng
+    `python -m core.downloadTool.scrape_metrics <thư mục metrics>`.
     """
     print("[get_link] === START get_links_main_video ===")
     print(f"[get_link] keywords_file = {keywords_file}")
@@ -399,45 +1225,36 @@ def get_links_main_video(
         print("[get_link] No keywords found -> abort.")
         return
 
-    driver = init_driver(headless=headless)
-    stt = 0
-    num_vd = 0
-    # clear file at start
-    try:
-        with open(output_txt, 'w', encoding='utf-8') as f:
-            f.write('')
-    except Exception as e:
-        print(f"[get_link] ERROR: cannot clear output file: {e}")
-        close_driver(driver)
-        return
-
-    for idx, keyword in enumerate(keywords, start=1):
-        print(f"[get_link] --- ({idx}/{len(keywords)}) '{keyword}' ---")
-        try:
-            video_links = get_dl_link_video(
-                driver,
-                keyword,
-                max_results=max_per_keyword,
-                max_minutes=max_minutes,
-                min_minutes=min_minutes,
-            )
-        except Exception as e:
-            print(f"[get_link] ERROR collecting video links for '{keyword}': {e}")
-            video_links = []
-
-        stt += 1
-        try:
-            with open(output_txt, 'a', encoding='utf-8') as f:
-                f.write(f"{stt} {keyword}\n")
-                for link in video_links:
-                    num_vd += 1
-                    f.write(f"{link}\n")
-        except Exception as e:
-            print(f"[get_link] ERROR writing video links for '{keyword}': {e}")
-        sleep(1.0)
-
-    print(f"[get_link] TOTAL video links written: {num_vd}")
-    close_driver(driver)
+    params = {'kind': 'video', 'max_results': max_per_keyword, 'min_minutes': min_minutes, 'max_minutes': max_minutes}
+    project = project_name or _project_of(output_txt)
+    skip = _registry_skip(registry, registry_mode, [project])
+    num_vd = _collect_with_journal(
+        keywords,
+        output_txt,
+        only_keywords,
+        params,
+        resume,
+        lambda targets, on_complete, on_metrics: scrape_video_links(
+            targets,
+            headless=headless,
+            max_per_keyword=max_per_keyword,
+            max_minutes=max_minutes,
+            min_minutes=min_minutes,
+            workers=workers,
+            backend=backend,
+            cache=cache,
+            on_complete=on_complete,
+            lean=lean,
+            service=service,
+            skip=skip,
+            on_metrics=on_metrics,
+        ),
+        registry=registry,
+        project=project,
+        metrics=metrics,
+    )
+    if num_vd is not None:
+        print(f"[get_link] TOTAL video links written: {num_vd}")
     print("[get_link] === END get_links_main_video ===")
 
 
@@ -447,6 +1264,15 @@ def get_links_main_image(
     project_name=None,
     headless=False,
     images_per_keyword: int = 10,
+    only_keywords: Optional[Iterable[str]] = None,
+    cache=None,
+    workers: int = 1,
+    backend: str = 'dom',
+    resume: bool = True,
+    service=None,
+    registry=None,
+    registry_mode: str = 'flag',
+    metrics: bool = True,
 ):
     """Thu link ảnh theo từng keyword và ghi ra output_txt.
 
@@ -457,6 +1283,12 @@ def get_links_main_image(
     <link ảnh 1>
     <link ảnh 2>
     ...
+
+    only_keywords: chế độ incremental, giống get_links_main_video.
+    cache: như get_links_main_video.
+    backend: 'dom' (mặc định, headless / song song `workers` driver) hoặc 'keyboard' (pywinauto, 1 driver).
+    resume: journal / chạy tiếp như get_links_main_video.
+    service, registry, registry_mode, metrics: như get_links_main_video.
     """
     print("[get_link] === START get_links_main_image ===")
     print(f"[get_link] keywords_file = {keywords_file}")
@@ -469,37 +1301,32 @@ def get_links_main_image(
         print("[get_link] No keywords found -> abort.")
         return
 
-    driver = init_driver(headless=headless)
-    stt = 0
-    # clear file at start
-    try:
-        with open(output_txt, 'w', encoding='utf-8') as f:
-            f.write('')
-    except Exception as e:
-        print(f"[get_link] ERROR: cannot clear output file: {e}")
-        close_driver(driver)
-        return
-
-    for idx, keyword in enumerate(keywords, start=1):
-        print(f"[get_link] --- ({idx}/{len(keywords)}) '{keyword}' ---")
-        try:
-            img_count = images_per_keyword if images_per_keyword and images_per_keyword > 0 else 10
-            image_links = get_dl_link_image(driver, keyword, num_of_image=img_count)
-        except Exception as e:
-            print(f"[get_link] ERROR collecting image links for '{keyword}': {e}")
-            image_links = []
-
-        stt += 1
-        try:
-            with open(output_txt, 'a', encoding='utf-8') as f:
-                f.write(f"{stt} {keyword}\n")
-                for link in image_links:
-                    f.write(f"{link}\n")
-        except Exception as e:
-            print(f"[get_link] ERROR writing image links for '{keyword}': {e}")
-        sleep(1.0)
-
-    close_driver(driver)
+    img_count = images_per_keyword if images_per_keyword and images_per_keyword > 0 else 10
+    params = {'kind': 'image', 'max_results': img_count}
+    project = project_name or _project_of(output_txt)
+    skip = _registry_skip(registry, registry_mode, [project])
+    _collect_with_journal(
+        keywords,
+        output_txt,
+        only_keywords,
+        params,
+        resume,
+        lambda targets, on_complete, on_metrics: scrape_image_links(
+            targets,
+            headless=headless,
+            images_per_keyword=img_count,
+            cache=cache,
+            workers=workers,
+            backend=backend,
+            on_complete=on_complete,
+            service=service,
+            skip=skip,
+            on_metrics=on_metrics,
+        ),
+        registry=registry,
+        project=project,
+        metrics=metrics,
+    )
     print("[get_link] === END get_links_main_image ===")
 
 def get_links_main(
@@ -511,12 +1338,27 @@ def get_links_main(
     max_minutes: Optional[int] = None,
     min_minutes: Optional[int] = None,
     images_per_keyword: int = 10,
+    only_keywords: Optional[Iterable[str]] = None,
+    workers: int = 1,
+    backend: str = 'browser',
+    cache=None,
+    image_backend: str = 'dom',
+    resume: bool = True,
+    lean: bool = False,
+    service=None,
+    registry=None,
+    registry_mode: str = 'flag',
+    metrics: bool = True,
 ):
     """Giữ tương thích cũ: chạy cả video và ảnh.
 
     - Video -> ghi vào output_txt.
     - Ảnh  -> ghi vào output_txt với hậu tố `_image.txt` nếu tên file kết thúc bằng .txt,
               ngược lại thêm hậu tố `_image`.
+    - service (browser_service.BrowserService): pha ảnh dùng lại Chrome pha video vừa trả về khi
+      cùng cấu hình - tức lean=False (lean chặn ảnh nên chỉ dùng cho video; bật lean thì pha ảnh
+      mở Chrome riêng, vẫn được giữ lại cho project sau trong batch).
+    - registry / registry_mode / metrics: như get_links_main_video (cả 2 pha).
     """
     print("[get_link] === START get_links_main (compat) ===")
     # 1) Video
@@ -528,6 +1370,16 @@ def get_links_main(
         max_per_keyword=max_per_keyword,
         max_minutes=max_minutes,
         min_minutes=min_minutes,
+        only_keywords=only_keywords,
+        workers=workers,
+        backend=backend,
+        cache=cache,
+        resume=resume,
+        lean=lean,
+        service=service,
+        registry=registry,
+        registry_mode=registry_mode,
+        metrics=metrics,
     )
 
     # 2) Image
@@ -541,6 +1393,15 @@ def get_links_main(
         project_name=project_name,
         headless=headless,
         images_per_keyword=images_per_keyword,
+        only_keywords=only_keywords,
+        cache=cache,
+        workers=workers,
+        backend=image_backend,
+        resume=resume,
+        service=service,
+        registry=registry,
+        registry_mode=registry_mode,
+        metrics=metrics,
     )
     print("[get_link] === END get_links_main (compat) ===")
 
@@ -4,11 +4,23 @@
    (improved: also extract start/end time for each text if possible)
 '''
 import gzip
+import io
 import os
+import sys
 import xml.etree.ElementTree as ET
 
 import re
 
+try:
+    from . import extract_cache  # type: ignore
+    from .instance_table import InstanceTable  # type: ignore
+except ImportError:
+    _ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if _ROOT_DIR not in sys.path:
+        sys.path.insert(0, _ROOT_DIR)
+    from core.downloadTool import extract_cache  # type: ignore
+    from core.downloadTool.instance_table import InstanceTable  # type: ignore
+
 def _sanitize_keyword(name: str) -> str:
     """Remove special characters from keyword before adding to list."""
     if not isinstance(name, str):
@@ -21,45 +33,283 @@ def _sanitize_keyword(name: str) -> str:
     name = ' '.join(name.split()).strip()
     return name
 
+# Kích thước mỗi lần đọc khi parse dạng streaming (bytes đã giải nén)
+_STREAM_CHUNK_SIZE = 1 << 20
+
 def _read_prproj_xml(path: str) -> ET.Element:
     with gzip.open(path, "rb") as f:
         xml_data = f.read().decode("utf-8", errors="replace")
     return ET.fromstring(xml_data)
 
-def _build_parent_map(root: ET.Element):
-    return {child: parent for parent in root.iter() for child in parent}
-
-def _get_timebase(root: ET.Element) -> int:
-    # Premiere thường có Sequence/Rate/Timebase
-    seq = root.find(".//Sequence")
-    if seq is not None:
-        tb = seq.find(".//Rate/Timebase")
-        if tb is not None and tb.text and tb.text.isdigit():
-            return int(tb.text)
-    # fallback
-    return 25
-
-def _text_or_none(elem: ET.Element, tag_name: str):
-    if elem is None:
-        return None
-    t = elem.find(tag_name)
-    if t is not None and t.text and t.text.strip().isdigit():
-        return int(t.text.strip())
+def _iter_prproj_events(path: str, chunk_size: int = _STREAM_CHUNK_SIZE):
+    """Yield (event, elem) pairs while feeding gzip chunks into an incremental parser.
+
+    Không giữ toàn bộ file trong bộ nhớ: mỗi chunk đã giải nén được đẩy thẳng vào
+    XMLPullParser. Người gọi chịu trách nhiệm giải phóng subtree đã xử lý xong.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    # decode giống _read_prproj_xml (errors="replace") nhưng theo từng chunk
+    with io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+def _iter_tree_events(root: ET.Element):
+    """Duyệt cây đã parse sẵn và phát (event, elem) giống XMLPullParser (một lượt duy nhất)."""
+    yield "start", root
+    stack = [iter(root)]
+    path = [root]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            yield "end", path.pop()
+            continue
+        yield "start", child
+        stack.append(iter(child))
+        path.append(child)
+
+# fallback khi không xác định được timebase của sequence
+_DEFAULT_TIMEBASE = 25
+
+def _int_or_none(text):
+    if text and text.strip().isdigit():
+        return int(text.strip())
     return None
 
-def _extract_start_end(clip_item: ET.Element):
-    # Ưu tiên Start / End; nếu thiếu dùng InPoint / OutPoint
-    start = _text_or_none(clip_item, "Start")
-    end = _text_or_none(clip_item, "End")
+def _start_end_from_texts(texts: dict):
+    """Start/End (ưu tiên) hoặc InPoint/OutPoint từ dict {tag: text} các con trực tiếp của ClipItem."""
+    start = _int_or_none(texts.get("Start"))
+    end = _int_or_none(texts.get("End"))
     if start is not None and end is not None:
         return start, end
-    in_p = _text_or_none(clip_item, "InPoint")
-    out_p = _text_or_none(clip_item, "OutPoint")
+    in_p = _int_or_none(texts.get("InPoint"))
+    out_p = _int_or_none(texts.get("OutPoint"))
     if in_p is not None and out_p is not None:
         return in_p, out_p
     return None, None
 
-def extract_text_instances_with_timing(path: str, save_txt: str = "list_names.txt"):
+_TIMING_TAGS = ("Start", "End", "InPoint", "OutPoint")
+
+def _object_key(attrib):
+    """Khoá index cho phần tử có ObjectID/ObjectUID (ObjectRef trỏ tới ObjectID, ObjectURef tới ObjectUID)."""
+    if "ObjectID" in attrib:
+        return ("id", attrib["ObjectID"])
+    if "ObjectUID" in attrib:
+        return ("uid", attrib["ObjectUID"])
+    return None
+
+def _ref_key(attrib):
+    if "ObjectRef" in attrib:
+        return ("id", attrib["ObjectRef"])
+    if "ObjectURef" in attrib:
+        return ("uid", attrib["ObjectURef"])
+    return None
+
+def _parse_timebase(text):
+    if text and text.isdigit():
+        return int(text)
+    return None
+
+class _InstanceCollector:
+    """Gom text instance từ luồng sự kiện start/end (XMLPullParser hoặc _iter_tree_events).
+
+    Chỉ giữ một stack các phần tử đang mở (tổ tiên) nên biết ngay ClipItem bao ngoài
+    mà không cần parent map. Khi free=True, mỗi phần tử đóng xong sẽ bị clear() và gỡ
+    khỏi cha -> bộ nhớ đỉnh phụ thuộc độ sâu lồng nhau chứ không phụ thuộc kích thước file.
+
+    Cùng lượt duyệt đó dựng index ObjectID/ObjectUID <-> ObjectRef/ObjectURef:
+      - mỗi object biết object chứa nó (lồng trực tiếp) hoặc object tham chiếu tới nó
+      - mỗi Sequence biết Rate/Timebase của chính nó
+    Sau khi duyệt xong, ClipItem được gán về Sequence sở hữu (lồng trực tiếp, hoặc lần
+    theo chuỗi tham chiếu với memo nên tổng chi phí tuyến tính) và dùng timebase riêng
+    của Sequence đó để tính giây.
+    """
+
+    def __init__(self, free: bool = False):
+        self._free = free
+        # [(elem, info, owner_object, sequence)] các phần tử đang mở
+        self._stack = []
+        # [(name, clip_timing_dict | None, sequence | None, owner_object | None)] theo thứ tự tài liệu
+        self._rows = []
+        self._first_sequence = None
+        self._seq_timebase = {}     # sequence key -> text Timebase (None nếu chưa thấy)
+        self._obj_timebase = {}     # object (không phải Sequence) key -> text Timebase
+        self._obj_parent = {}       # object -> object lồng trực tiếp bên ngoài
+        self._ref_owner = {}        # object được tham chiếu -> object chứa ObjectRef
+        self._resolved = {}         # memo object -> sequence
+
+    def start(self, elem: ET.Element):
+        if self._stack:
+            _, _, parent_obj, parent_seq = self._stack[-1]
+        else:
+            parent_obj = parent_seq = None
+        attrib = elem.attrib
+        tag = elem.tag
+        obj = _object_key(attrib) if attrib else None
+        info = None
+        seq = parent_seq
+        if tag == "Sequence":
+            if obj is None:
+                obj = ("seq", len(self._seq_timebase))
+            self._seq_timebase.setdefault(obj, None)
+            if self._first_sequence is None:
+                self._first_sequence = obj
+            seq = obj
+            info = {"timebase_found": False}
+        elif tag == "ClipItem":
+            info = {}
+        elif tag == "VideoFilterComponent":
+            info = {"found": False, "name": None}
+        if obj is not None:
+            if parent_obj is not None:
+                self._obj_parent.setdefault(obj, parent_obj)
+            owner = obj
+        else:
+            owner = parent_obj
+        if attrib and owner is not None:
+            ref = _ref_key(attrib)
+            if ref is not None and ref != owner:
+                self._ref_owner.setdefault(ref, owner)
+        self._stack.append((elem, info, owner, seq))
+
+    def end(self, elem: ET.Element):
+        _, info, owner, seq = self._stack.pop()
+        if self._stack:
+            parent, parent_info = self._stack[-1][0], self._stack[-1][1]
+        else:
+            parent = parent_info = None
+        tag = elem.tag
+
+        if tag == "InstanceName":
+            # VideoFilterComponent/Component/InstanceName (lấy phần tử đầu tiên như find())
+            if parent is not None and parent.tag == "Component" and len(self._stack) >= 2:
+                vfc, vfc_info = self._stack[-2][0], self._stack[-2][1]
+                if vfc.tag == "VideoFilterComponent" and not vfc_info["found"]:
+                    vfc_info["found"] = True
+                    vfc_info["name"] = elem.text
+        elif tag in _TIMING_TAGS:
+            if parent is not None and parent.tag == "ClipItem":
+                parent_info.setdefault(tag, elem.text)
+        elif tag == "Timebase":
+            if parent is not None and parent.tag == "Rate":
+                self._record_timebase(elem.text, owner, seq)
+        elif tag == "VideoFilterComponent":
+            self._add_row(info)
+
+        if self._free:
+            # Giải phóng subtree đã xử lý xong
+            elem.clear()
+            if parent is not None:
+                parent.remove(elem)
+
+    def _record_timebase(self, text, owner, seq):
+        if seq is not None:
+            # Rate/Timebase đầu tiên bên trong Sequence (như _get_timebase cũ, nhưng cho từng Sequence)
+            seq_info = next(f[1] for f in reversed(self._stack) if f[3] == seq and f[0].tag == "Sequence")
+            if not seq_info["timebase_found"]:
+                seq_info["timebase_found"] = True
+                self._seq_timebase[seq] = text
+        elif owner is not None:
+            # object cài đặt được Sequence tham chiếu qua ObjectRef
+            self._obj_timebase.setdefault(owner, text)
+
+    def _add_row(self, info: dict):
+        text = info["name"]
+        if not text:
+            return
+        name = _sanitize_keyword(text.strip())
+        if not name:
+            return
+        # Lần lên ClipItem gần nhất trong stack tổ tiên
+        for anc, anc_info, anc_owner, anc_seq in reversed(self._stack):
+            if anc.tag == "ClipItem":
+                self._rows.append((name, anc_info, anc_seq, anc_owner))
+                return
+        self._rows.append((name, None, None, None))
+
+    def _resolve_sequence(self, node):
+        """Sequence sở hữu object `node` qua chuỗi ObjectRef/lồng nhau (memo, chống vòng lặp)."""
+        path = []
+        result = None
+        seen = set()
+        while node is not None:
+            if node in self._seq_timebase:
+                result = node
+                break
+            if node in self._resolved:
+                result = self._resolved[node]
+                break
+            if node in seen:
+                break
+            seen.add(node)
+            path.append(node)
+            node = self._ref_owner.get(node) or self._obj_parent.get(node)
+        for n in path:
+            self._resolved[n] = result
+        return result
+
+    def _sequence_timebases(self):
+        # Sequence không có Rate/Timebase riêng: lấy từ object mà nó tham chiếu tới
+        for obj, text in self._obj_timebase.items():
+            seq = self._resolve_sequence(obj)
+            if seq is not None and self._seq_timebase.get(seq) is None:
+                self._seq_timebase[seq] = text
+        return {k: _parse_timebase(v) for k, v in self._seq_timebase.items()}
+
+    @property
+    def timebase(self) -> int:
+        """Timebase mặc định của tài liệu (Sequence đầu tiên), fallback 25."""
+        tb = None
+        if self._first_sequence is not None:
+            tb = self._sequence_timebases().get(self._first_sequence)
+        return tb or _DEFAULT_TIMEBASE
+
+    def results(self) -> InstanceTable:
+        seq_tb = self._sequence_timebases()
+        default_tb = seq_tb.get(self._first_sequence) or _DEFAULT_TIMEBASE
+        out = InstanceTable()
+        for name, clip_timing, seq, owner in self._rows:
+            if clip_timing is not None:
+                start, end = _start_end_from_texts(clip_timing)
+                if seq is None and owner is not None:
+                    seq = self._resolve_sequence(owner)
+                timebase = (seq_tb.get(seq) if seq is not None else None) or default_tb
+            else:
+                start = end = None
+                timebase = default_tb
+            out.append(name, start, end, timebase)
+        return out
+
+def _collect(events, free: bool):
+    collector = _InstanceCollector(free=free)
+    for event, elem in events:
+        if event == "start":
+            collector.start(elem)
+        else:
+            collector.end(elem)
+    return collector.results()
+
+def _extract_streaming(path: str):
+    return _collect(_iter_prproj_events(path), free=True)
+
+def _extract_tree(path: str):
+    root = _read_prproj_xml(path)
+    return _collect(_iter_tree_events(root), free=False)
+
+def extract_text_instances_with_timing(
+    path: str,
+    save_txt: str = "list_names.txt",
+    streaming: bool = False,
+    use_cache: bool = False,
+    project_name=None,
+    as_table: bool = False,
+):
     """
     Trả về danh sách dict:
       {
@@ -71,74 +321,71 @@ def extract_text_instances_with_timing(path: str, save_txt: str = "list_names.tx
       }
 
     Ghi file nếu save_txt != None (mỗi dòng: name|start_frame|end_frame|start_seconds|end_seconds)
-    """
-    root = _read_prproj_xml(path)
-    parent_map = _build_parent_map(root)
-    timebase = _get_timebase(root)
 
-    results = []
-    for comp in root.findall(".//VideoFilterComponent"):
-        inst = comp.find("Component/InstanceName")
-        if inst is None or not inst.text:
-            continue
-        name = inst.text.strip()
-        name = _sanitize_keyword(name)
-        if not name:
-            continue
-        # Lần lên ClipItem gần nhất
-        current = comp
-        clip_item = None
-        while current in parent_map:
-            current = parent_map[current]
-            if current.tag == "ClipItem":
-                clip_item = current
-                break
-        if clip_item is not None:
-            start, end = _extract_start_end(clip_item)
-        else:
-            start = end = None
+    start_seconds/end_seconds dùng timebase của Sequence chứa ClipItem (lồng trực tiếp hoặc
+    qua ObjectRef/ObjectURef), fallback Sequence đầu tiên rồi 25.
 
-        if start is not None and end is not None and end < start:
-            # Trường hợp dữ liệu bất thường
-            end = None
+    streaming=True: parse theo luồng (gzip chunk -> XMLPullParser), không dựng cây đầy đủ
+    và không dựng parent map -> bộ nhớ đỉnh chỉ phụ thuộc độ sâu lồng nhau của XML.
+    Kết quả giống hệt chế độ mặc định.
 
-        if start is not None and end is not None:
-            start_sec = round(start / timebase, 4)
-            end_sec = round(end / timebase, 4)
-        else:
-            start_sec = end_sec = None
+    use_cache=True: dùng cache data/<project_name>/extract_cache.json (xem extract_cache);
+    hit thì không giải nén project. project_name mặc định lấy theo tên file .prproj.
+    Mặc định tắt (không ghi gì vào data/); GUI và batch_extract bật theo tuỳ chọn cache.
 
-        results.append({
-            "name": name,
-            "start_frame": start,
-            "end_frame": end,
-            "start_seconds": start_sec,
-            "end_seconds": end_sec
-        })
+    as_table=True: trả về InstanceTable (dạng cột, gọn bộ nhớ) thay vì list dict;
+    list dict mặc định chỉ là view được dựng từ bảng này.
+    """
+    table = None
+    fp = None
+    if use_cache:
+        try:
+            table, fp = extract_cache.lookup(path, project_name)
+        except Exception as e:
+            print(f"[get_name_list] WARN: cache lookup failed: {e}")
+            table = None
+        if table is not None:
+            print(f"[get_name_list] Cache hit: {path} ({len(table)} instances)")
+
+    if table is None:
+        if streaming:
+            table = _extract_streaming(path)
+        else:
+            table = _extract_tree(path)
+        if use_cache:
+            try:
+                extract_cache.store(path, table, project_name, fp=fp)
+            except Exception as e:
+                print(f"[get_name_list] WARN: cache store failed: {e}")
 
     if save_txt:
-        with open(save_txt, "w", encoding="utf-8") as f:
-            f.write("")
-            for r in results:
-                f.write(
-                    f"{r['name']}|{r['start_frame']}|{r['end_frame']}|{r['start_seconds']}|{r['end_seconds']}\n"
-                )
-    return results
+        table.write_txt(save_txt)
+    return table if as_table else table.to_dicts()
 
 # Giữ hàm cũ (backward compatibility)
-def extract_instance_names(path, save_txt=None, project_name=None):
+def extract_instance_names(path, save_txt=None, project_name=None, streaming: bool = False, use_cache: bool = False):
     '''Extract instance names from .prproj file to a list of names.
     Input: .prproj file path, optional save_txt to save names to txt file
+           streaming=True để parse theo luồng (dùng cho project rất lớn)
+           use_cache=True để dùng cache trích xuất (mặc định luôn parse lại)
     Output: List of instance names
     '''
-    data = extract_text_instances_with_timing(path, save_txt=None)
-    names = [d["name"] for d in data]
+    table = extract_text_instances_with_timing(
+        path, save_txt=None, streaming=streaming, use_cache=use_cache, project_name=project_name, as_table=True
+    )
+    names = table.name_list()
     if save_txt:
-        with open(save_txt, "w", encoding="utf-8") as f:
-            for n in names:
-                #nếu n không bắt đầu bằng 1 kí tự đơn lẻ + " " thì ghi vào file vis dụ: "A bcd" thì bỏ
-                if (len(n) >= 2 and n[0].isalpha() and n[1] == " "):
-                    continue
-                else:
-                    f.write(n + "\n")
+        write_name_list(names, save_txt)
     return names
+
+def is_listed_name(n: str) -> bool:
+    """Tên có được ghi vào list_name.txt hay không."""
+    #nếu n không bắt đầu bằng 1 kí tự đơn lẻ + " " thì ghi vào file vis dụ: "A bcd" thì bỏ
+    return not (len(n) >= 2 and n[0].isalpha() and n[1] == " ")
+
+def write_name_list(names, save_txt: str):
+    """Ghi list_name.txt (mỗi dòng 1 tên) theo đúng quy tắc lọc của extract_instance_names."""
+    with open(save_txt, "w", encoding="utf-8") as f:
+        for n in names:
+            if is_listed_name(n):
+                f.write(n + "\n")
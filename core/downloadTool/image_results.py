@@ -0,0 +1,268 @@
+"""image_results.py
+Lọc kết quả Google Images dùng chung cho collector bàn phím (get_dl_link_image) và
+collector đọc trực tiếp dữ liệu trang (get_dl_link_image_dom).
+
+Mỗi ứng viên là dict {url, width, height}; filter_images áp dụng cùng quy tắc cũ:
+bỏ link bảo vệ / thumbnail (is_protected), bỏ ảnh nhỏ hơn MIN_DIMENSION, bỏ file
+< MIN_FILE_KB nếu HEAD trả Content-Length, bỏ trùng, dừng khi đủ số ảnh.
+
+Kiểm tra dung lượng (HEAD) chạy theo lô qua SizeValidator: session có connection pool,
+tối đa HEAD_WORKERS request song song, tối đa PER_HOST_LIMIT request cùng lúc cho mỗi host,
+kết quả cache theo URL trong process (dùng lại giữa các keyword / project).
+
+Module không phụ thuộc selenium; requests là tuỳ chọn (thiếu -> bỏ qua kiểm tra dung lượng).
+
+image_search_url: URL trang kết quả; base URL đổi được qua biến môi trường
+AUTOTOOL_GOOGLE_BASE_URL (server replay cục bộ, xem replay.py).
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+try:
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+except ImportError:
+    requests = None
+    HTTPAdapter = None
+
+GOOGLE_BASE_URL = 'https://www.google.com'
+GOOGLE_BASE_URL_ENV = 'AUTOTOOL_GOOGLE_BASE_URL'
+MIN_DIMENSION = 50  # tránh icon nhỏ / blur
+MIN_FILE_KB = 10
+HEAD_TIMEOUT = 5
+HEAD_WORKERS = 8
+PER_HOST_LIMIT = 2
+SIZE_CACHE_MAX = 20000
+
+# Dữ liệu kết quả nhúng trong <script> của Google Images: ["<url ảnh gốc>",<cao>,<rộng>]
+_ENTRY_RE = re.compile(r'\["(https?://(?:[^"\\]|\\.)+)",(\d+),(\d+)\]')
+
+
+def image_search_url(keyword: str, fragment: str = '') -> str:
+    """URL tìm ảnh Google cho keyword (giữ cách ghép cũ: khoảng trắng -> '+')."""
+    base = (os.environ.get(GOOGLE_BASE_URL_ENV) or GOOGLE_BASE_URL).rstrip('/')
+    return f"{base}/search?tbm=isch&q={keyword}{fragment}".replace(' ', '+')
+
+
+def is_protected(src: str) -> bool:
+    if not src:
+        return True
+    if src.startswith('data:image/') or 'static.' in src or 'resizing.' in src:  # tránh ảnh tĩnh (icon, logo)
+        return True
+    if 'encrypted' in src:  # thumbnail preview
+        return True
+    return False
+
+
+def file_size_ok(src: str, session=None) -> bool:
+    """False nếu HEAD báo Content-Length < MIN_FILE_KB; lỗi / thiếu requests -> True (bỏ qua lọc).
+
+    Kiểm tra 1 URL, không cache; nhiều URL dùng SizeValidator.
+    """
+    if requests is None and session is None:
+        return True  # không kiểm tra nếu thiếu thư viện
+    if not src.lower().startswith(('http://', 'https://')):
+        return True
+    try:
+        head = (session or requests).head(src, timeout=HEAD_TIMEOUT, allow_redirects=True)
+        cl = head.headers.get('Content-Length')
+        if cl and cl.isdigit():
+            return int(cl) >= MIN_FILE_KB * 1024
+    except Exception:
+        return True  # nếu lỗi HEAD thì bỏ qua lọc này
+    return True
+
+
+class SizeValidator:
+    """Kiểm tra dung lượng ảnh theo lô (HEAD song song, giới hạn theo host, cache theo URL)."""
+
+    def __init__(self, workers: int = HEAD_WORKERS, per_host: int = PER_HOST_LIMIT, max_cached: int = SIZE_CACHE_MAX):
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[str, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._session = None
+        self._executor = None
+        self.stats = {'checked': 0, 'cached': 0, 'rejected': 0}
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None and requests is not None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.per_host)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='img-head')
+            return self._session
+
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.Semaphore(self.per_host)
+            return slot
+
+    def _check(self, url: str, session) -> bool:
+        with self._host_slot(url):
+            ok = file_size_ok(url, session)
+        with self._lock:
+            self._cache[url] = ok
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+            self.stats['checked'] += 1
+            if not ok:
+                self.stats['rejected'] += 1
+        return ok
+
+    def validate(self, urls: Iterable[str]) -> Dict[str, bool]:
+        """{url: ok} cho mọi URL; URL đã kiểm tra trước đó lấy từ cache."""
+        urls = list(dict.fromkeys(urls))
+        result: Dict[str, bool] = {}
+        todo = []
+        with self._lock:
+            for url in urls:
+                if url in self._cache:
+                    self._cache.move_to_end(url)
+                    result[url] = self._cache[url]
+                    self.stats['cached'] += 1
+                else:
+                    todo.append(url)
+        if not todo:
+            return result
+        session = self._get_session()
+        if session is None:  # thiếu requests -> không lọc được
+            result.update({url: True for url in todo})
+            return result
+        for url, ok in zip(todo, self._executor.map(lambda u: self._check(u, session), todo)):
+            result[url] = ok
+        return result
+
+    def keep_valid(self, urls: List[str]) -> List[str]:
+        """Giữ thứ tự, bỏ URL có dung lượng < MIN_FILE_KB."""
+        ok = self.validate(urls)
+        return [u for u in urls if ok.get(u, True)]
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_default_validator: Optional[SizeValidator] = None
+_default_validator_lock = threading.Lock()
+
+
+def default_validator() -> SizeValidator:
+    """SizeValidator dùng chung trong process (cache URL giữa các keyword / project)."""
+    global _default_validator
+    with _default_validator_lock:
+        if _default_validator is None:
+            _default_validator = SizeValidator()
+        return _default_validator
+
+
+def set_default_validator(validator: Optional[SizeValidator]) -> Optional[SizeValidator]:
+    """Thay SizeValidator dùng chung (vd. benchmark replay), None = tạo lại mặc định. Trả về validator cũ."""
+    global _default_validator
+    with _default_validator_lock:
+        old, _default_validator = _default_validator, validator
+        return old
+
+
+def _unescape(raw: str) -> str:
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
+
+
+def parse_image_entries(texts: Iterable[str]) -> List[Dict]:
+    """Ứng viên {url, width, height} theo thứ tự xuất hiện trong các đoạn script của trang."""
+    out: List[Dict] = []
+    for text in texts:
+        for m in _ENTRY_RE.finditer(text or ''):
+            out.append({'url': _unescape(m.group(1)), 'height': int(m.group(2)), 'width': int(m.group(3))})
+    return out
+
+
+def filter_images(
+    candidates: Iterable[Dict],
+    collected: List[str],
+    seen: Set[str],
+    want: int,
+    check_size: bool = True,
+    validator: Optional[SizeValidator] = None,
+    skip: Optional[Callable[[str], bool]] = None,
+    counters: Optional[Dict] = None,
+) -> None:
+    """Thêm vào `collected` các ảnh hợp lệ trong `candidates` cho tới khi đủ `want` (sửa tại chỗ).
+
+    Lọc tĩnh (is_protected / MIN_DIMENSION / trùng / skip(url) - ảnh đã dùng ở project khác)
+    trước, sau đó kiểm tra dung lượng theo lô (validator, mặc định default_validator()); lô sau
+    chỉ chạy khi lô trước chưa đủ ảnh.
+    counters (dict, tuỳ chọn) được cộng dồn: candidates, duplicates, rejected_static, skipped,
+    rejected_size, accepted, head_seconds (thời gian chờ HEAD) - scrape_metrics.
+    """
+    counters = counters if counters is not None else {}
+    for key in ('candidates', 'duplicates', 'rejected_static', 'skipped', 'rejected_size', 'accepted'):
+        counters.setdefault(key, 0)
+    counters.setdefault('head_seconds', 0.0)
+    passed: List[str] = []
+    for cand in candidates:
+        src = cand.get('url') or ''
+        if not src:
+            continue
+        counters['candidates'] += 1
+        if src in seen:
+            counters['duplicates'] += 1
+            continue
+        seen.add(src)
+        w = int(cand.get('width') or 0)
+        h = int(cand.get('height') or 0)
+        if is_protected(src) or w < MIN_DIMENSION or h < MIN_DIMENSION:
+            counters['rejected_static'] += 1
+            continue
+        if skip is not None and skip(src):
+            counters['skipped'] += 1
+            continue
+        passed.append(src)
+    if not check_size:
+        added = passed[:max(0, want - len(collected))]
+        collected.extend(added)
+        counters['accepted'] += len(added)
+        return
+    validator = validator or default_validator()
+    pos = 0
+    while pos < len(passed) and len(collected) < want:
+        # Kiểm tra dư 1 chút so với số còn thiếu để ít phải chạy thêm lô
+        need = want - len(collected)
+        batch = passed[pos:pos + need + max(2, need // 2)]
+        pos += len(batch)
+        t_head = monotonic()
+        valid = validator.keep_valid(batch)
+        counters['head_seconds'] += monotonic() - t_head
+        counters['rejected_size'] += len(batch) - len(valid)
+        for src in valid:
+            if len(collected) >= want:
+                break
+            collected.append(src)
+            counters['accepted'] += 1
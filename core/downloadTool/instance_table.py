@@ -0,0 +1,309 @@
+"""instance_table.py
+Compact columnar container for text instances extracted from .prproj files.
+
+Thay vì list các dict 5 khoá (mỗi dict tốn vài trăm byte), dữ liệu được giữ theo cột:
+  - names:       bảng chuỗi đã intern (mỗi tên duy nhất lưu 1 lần)
+  - name_id:     array('I')  chỉ số vào bảng tên
+  - start_frame: array('q')  (_NONE nếu không có)
+  - end_frame:   array('q')  (_NONE nếu không có)
+  - timebase:    array('d')  timebase của Sequence chứa clip
+
+Đổi frame -> giây và lọc theo khoảng thời gian được vector hoá bằng NumPy nếu có cài,
+ngược lại dùng array thuần. `to_dicts()` / index / iterate trả về dict giống API cũ của
+get_name_list.extract_text_instances_with_timing.
+
+Xuất nhanh: write_txt (định dạng name|start|end|start_s|end_s), to_csv, to_jsonl,
+save_binary / load_binary (định dạng nhị phân riêng, đọc lại không cần parse text).
+"""
+from __future__ import annotations
+
+import csv
+import json
+import math
+import struct
+import sys
+from array import array
+from itertools import repeat
+from operator import truediv
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # numpy là tuỳ chọn
+    np = None
+
+__all__ = ['InstanceTable']
+
+# Giá trị đánh dấu "không có frame" trong cột int64
+_NONE = -(2 ** 63)
+_MAGIC = b'ITBL'
+_BIN_VERSION = 1
+_HEADER = struct.Struct('<4sBBII')  # magic, version, little_endian, rows, names_json_len
+_FIELDS = ('name', 'start_frame', 'end_frame', 'start_seconds', 'end_seconds')
+_PLAIN_SECONDS_LIMIT = 1e11
+
+
+def _opt(v: int) -> Optional[int]:
+    return None if v == _NONE else v
+
+
+def _csv_quote(field: str) -> str:
+    """Như csv.writer (dialect excel, QUOTE_MINIMAL) với 1 ô chuỗi trong hàng nhiều cột."""
+    if any(c in field for c in ',"\r\n'):
+        return '"' + field.replace('"', '""') + '"'
+    return field
+
+
+def _format_seconds(values: List[float]) -> List[str]:
+    """Chuỗi giống str(round(v, 4)) cho cả cột.
+
+    '%.4f' làm tròn đúng như round(v, 4); bỏ số 0 thừa cho ra đúng repr khi |v| < 1e11
+    (<= 15 chữ số có nghĩa), nhanh gấp ~2 lần round + repr. Ngoài khoảng đó dùng round + repr.
+    """
+    if values and max(map(abs, values)) >= _PLAIN_SECONDS_LIMIT:
+        return [repr(round(v, 4)) for v in values]
+    stripped = map(str.rstrip, map('%.4f'.__mod__, values), repeat('0'))
+    return [v + '0' if v[-1] == '.' else v for v in stripped]
+
+
+class InstanceTable:
+    """Bảng instance theo cột (xem docstring module)."""
+
+    __slots__ = ('names', '_name_index', 'name_id', 'start_frame', 'end_frame', 'timebase')
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._name_index: Dict[str, int] = {}
+        self.name_id = array('I')
+        self.start_frame = array('q')
+        self.end_frame = array('q')
+        self.timebase = array('d')
+
+    # ------------------------------------------------------------------
+    # Xây dựng
+    # ------------------------------------------------------------------
+    def _intern(self, name: str) -> int:
+        idx = self._name_index.get(name)
+        if idx is None:
+            idx = len(self.names)
+            self.names.append(name)
+            self._name_index[name] = idx
+        return idx
+
+    def append(self, name: str, start: Optional[int], end: Optional[int], timebase: float):
+        if start is not None and end is not None and end < start:
+            # Trường hợp dữ liệu bất thường
+            end = None
+        self.name_id.append(self._intern(name))
+        self.start_frame.append(_NONE if start is None else start)
+        self.end_frame.append(_NONE if end is None else end)
+        self.timebase.append(float(timebase))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> 'InstanceTable':
+        """Dựng bảng từ các hàng (name, start_frame, end_frame, timebase) - xem rows()."""
+        table = cls()
+        for name, start, end, tb in rows:
+            table.append(name, start, end, tb)
+        return table
+
+    def rows(self) -> Iterator[tuple]:
+        """Hàng (name, start_frame, end_frame, timebase) - dạng gọn để lưu JSON."""
+        names = self.names
+        for i in range(len(self)):
+            yield names[self.name_id[i]], _opt(self.start_frame[i]), _opt(self.end_frame[i]), self.timebase[i]
+
+    # ------------------------------------------------------------------
+    # View tương thích list-of-dicts
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.name_id)
+
+    def _row(self, i: int) -> Dict:
+        start = _opt(self.start_frame[i])
+        end = _opt(self.end_frame[i])
+        if start is not None and end is not None:
+            tb = self.timebase[i]
+            start_sec = round(start / tb, 4)
+            end_sec = round(end / tb, 4)
+        else:
+            start_sec = end_sec = None
+        return {
+            'name': self.names[self.name_id[i]],
+            'start_frame': start,
+            'end_frame': end,
+            'start_seconds': start_sec,
+            'end_seconds': end_sec,
+        }
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('InstanceTable index out of range')
+        return self._row(i)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def to_dicts(self) -> List[Dict]:
+        return [self._row(i) for i in range(len(self))]
+
+    def name_list(self) -> List[str]:
+        names = self.names
+        return [names[i] for i in self.name_id]
+
+    # ------------------------------------------------------------------
+    # Vector hoá
+    # ------------------------------------------------------------------
+    def to_numpy(self):
+        """Structured array (name_id, start_frame, end_frame, timebase). Cần numpy."""
+        if np is None:
+            raise RuntimeError('numpy is not installed')
+        n = len(self)
+        out = np.empty(n, dtype=[('name_id', '<u4'), ('start_frame', '<i8'), ('end_frame', '<i8'), ('timebase', '<f8')])
+        out['name_id'] = np.frombuffer(self.name_id, dtype=np.uint32) if n else []
+        out['start_frame'] = np.frombuffer(self.start_frame, dtype=np.int64) if n else []
+        out['end_frame'] = np.frombuffer(self.end_frame, dtype=np.int64) if n else []
+        out['timebase'] = np.frombuffer(self.timebase, dtype=np.float64) if n else []
+        return out
+
+    def _raw_seconds(self, missing: List[int], fill: float):
+        """frame / timebase chưa làm tròn (list float) cho start và end; hàng `missing` = fill.
+        Phép chia theo cột (numpy nếu có, ngược lại map)."""
+        if np is not None and len(self):
+            tb = np.frombuffer(self.timebase, dtype=np.float64)
+            s_raw = (np.frombuffer(self.start_frame, dtype=np.int64) / tb).tolist()
+            e_raw = (np.frombuffer(self.end_frame, dtype=np.int64) / tb).tolist()
+        else:
+            s_raw = list(map(truediv, self.start_frame, self.timebase))
+            e_raw = list(map(truediv, self.end_frame, self.timebase))
+        for i in missing:
+            s_raw[i] = e_raw[i] = fill
+        return s_raw, e_raw
+
+    def _round_seconds(self):
+        """(start_seconds, end_seconds) dạng list float, round(x, 4) của Python như _row; NaN khi
+        thiếu start hoặc end."""
+        s_raw, e_raw = self._raw_seconds(self._missing_rows(), math.nan)
+        four = repeat(4)
+        return list(map(round, s_raw, four)), list(map(round, e_raw, four))
+
+    def _missing_rows(self) -> List[int]:
+        """Chỉ số hàng thiếu start hoặc end (thường rất ít; tìm bằng array.index, không duyệt từng hàng)."""
+        rows = set()
+        for col in (self.start_frame, self.end_frame):
+            i = -1
+            for _ in range(col.count(_NONE)):
+                i = col.index(_NONE, i + 1)
+                rows.add(i)
+        return sorted(rows)
+
+    def seconds(self):
+        """(start_seconds, end_seconds) theo cột; NaN khi thiếu start hoặc end.
+
+        Cùng cách làm tròn với view dict (round(x, 4)). Trả về numpy.ndarray nếu có numpy,
+        ngược lại array('d').
+        """
+        s, e = self._round_seconds()
+        if np is not None:
+            return np.array(s, dtype=np.float64), np.array(e, dtype=np.float64)
+        return array('d', s), array('d', e)
+
+    def _take(self, indices: Iterable[int]) -> 'InstanceTable':
+        out = InstanceTable()
+        names = self.names
+        for i in indices:
+            out.name_id.append(out._intern(names[self.name_id[i]]))
+            out.start_frame.append(self.start_frame[i])
+            out.end_frame.append(self.end_frame[i])
+            out.timebase.append(self.timebase[i])
+        return out
+
+    def filter_time_range(self, start_seconds: float, end_seconds: float) -> 'InstanceTable':
+        """Các instance có timing giao với [start_seconds, end_seconds] (bỏ instance không có timing)."""
+        s, e = self.seconds()
+        if np is not None:
+            mask = (s <= end_seconds) & (e >= start_seconds)
+            return self._take(np.nonzero(mask)[0].tolist())
+        return self._take(i for i in range(len(self)) if s[i] <= end_seconds and e[i] >= start_seconds)
+
+    # ------------------------------------------------------------------
+    # Xuất / nhập
+    # ------------------------------------------------------------------
+    def _text_columns(self, none: str, names: Optional[List[str]] = None):
+        """5 cột chuỗi (name, start_frame, end_frame, start_seconds, end_seconds) dựng 1 lần cho
+        cả bảng; ô thiếu = `none`. names: bảng tên đã định dạng sẵn (vd. JSON), mặc định self.names.
+        Số in như f-string / str() của view dict."""
+        names = self.names if names is None else names
+        missing = self._missing_rows()
+        name_col = list(map(names.__getitem__, self.name_id))
+        start_col = list(map(str, self.start_frame))
+        end_col = list(map(str, self.end_frame))
+        s_raw, e_raw = self._raw_seconds(missing, 0.0)
+        s_col = _format_seconds(s_raw)
+        e_col = _format_seconds(e_raw)
+        for i in missing:
+            s_col[i] = e_col[i] = none
+            if self.start_frame[i] == _NONE:
+                start_col[i] = none
+            if self.end_frame[i] == _NONE:
+                end_col[i] = none
+        return name_col, start_col, end_col, s_col, e_col
+
+    def write_txt(self, path: str):
+        """Định dạng cũ: name|start_frame|end_frame|start_seconds|end_seconds (None nếu thiếu)."""
+        if not len(self):
+            open(path, 'w', encoding='utf-8').close()
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(map('|'.join, zip(*self._text_columns('None')))))
+            f.write('\n')
+
+    def to_csv(self, path: str):
+        # Chỉ cột tên có thể cần quote: quote 1 lần / tên duy nhất theo quy tắc csv.writer (QUOTE_MINIMAL)
+        names = [_csv_quote(n) for n in self.names]
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerow(_FIELDS)
+            if len(self):
+                f.write('\r\n'.join(map(','.join, zip(*self._text_columns('', names)))))
+                f.write('\r\n')
+
+    def to_jsonl(self, path: str):
+        # Tên JSON-escape 1 lần / tên duy nhất; số đã là literal JSON hợp lệ
+        names = [json.dumps(n, ensure_ascii=False) for n in self.names]
+        template = '{' + ', '.join(f'"{k}": %s' for k in _FIELDS) + '}\n'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(map(template.__mod__, zip(*self._text_columns('null', names))))
+
+    def save_binary(self, path: str):
+        """Header + bảng tên (JSON UTF-8) + 4 cột dạng raw little-endian."""
+        names_blob = json.dumps(self.names, ensure_ascii=False).encode('utf-8')
+        cols = [self.name_id, self.start_frame, self.end_frame, self.timebase]
+        if sys.byteorder != 'little':
+            cols = [array(c.typecode, c) for c in cols]
+            for c in cols:
+                c.byteswap()
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _BIN_VERSION, 1, len(self), len(names_blob)))
+            f.write(names_blob)
+            for c in cols:
+                c.tofile(f)
+
+    @classmethod
+    def load_binary(cls, path: str) -> 'InstanceTable':
+        table = cls()
+        with open(path, 'rb') as f:
+            magic, version, _, rows, names_len = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or version != _BIN_VERSION:
+                raise ValueError(f'not an InstanceTable file: {path}')
+            table.names = json.loads(f.read(names_len).decode('utf-8'))
+            table._name_index = {n: i for i, n in enumerate(table.names)}
+            for col in (table.name_id, table.start_frame, table.end_frame, table.timebase):
+                col.fromfile(f, rows)
+                if sys.byteorder != 'little':
+                    col.byteswap()
+        return table
@@ -0,0 +1,127 @@
+"""keyword_diff.py
+So sánh keyword giữa hai lần trích xuất của cùng một project (.prproj).
+
+Snapshot của lần trích xuất đã được lấy link được lưu tại
+`data/<project_slug>/keywords_snapshot.json`. Lần chạy sau so sánh các instance vừa
+trích với snapshot để biết keyword nào được thêm, bị xoá hay bị đổi tên; chỉ keyword
+thêm mới / đổi tên mới cần scrape lại (xem get_link.get_links_main_video(only_keywords=...)).
+
+Đổi tên = cùng vị trí timeline (start_frame, end_frame) nhưng keyword khác, với keyword cũ
+không còn và keyword mới chưa từng có.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+try:
+    from .get_name_list import is_listed_name  # type: ignore
+    from .get_link import keywords_from_lines  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.downloadTool.get_name_list import is_listed_name  # type: ignore
+    from core.downloadTool.get_link import keywords_from_lines  # type: ignore
+
+SNAPSHOT_FILENAME = 'keywords_snapshot.json'
+
+
+def listed_keywords(records: List[Dict]) -> List[str]:
+    """Keyword (theo thứ tự, không trùng) mà get_link sẽ đọc từ list_name.txt sinh ra bởi records."""
+    return keywords_from_lines(r['name'] for r in records if is_listed_name(r['name']))
+
+
+def _keyword_by_position(records: List[Dict]) -> Dict:
+    out = {}
+    for r in records:
+        if not is_listed_name(r['name']):
+            continue
+        start, end = r.get('start_frame'), r.get('end_frame')
+        if start is None or end is None:
+            continue
+        kw = keywords_from_lines([r['name']])
+        if kw:
+            out.setdefault((start, end), kw[0])
+    return out
+
+
+def diff_instances(old_records: List[Dict], new_records: List[Dict]) -> Dict:
+    """So sánh 2 lần trích xuất.
+
+    Trả về dict:
+      added:     keyword mới (không phải đổi tên), theo thứ tự mới
+      removed:   keyword không còn (không phải đổi tên), theo thứ tự cũ
+      renamed:   [(old, new)] cùng vị trí timeline nhưng đổi keyword
+      unchanged: keyword có ở cả 2 lần
+      to_scrape: added + phần "new" của renamed, theo thứ tự mới
+    """
+    old_kw = listed_keywords(old_records)
+    new_kw = listed_keywords(new_records)
+    old_set, new_set = set(old_kw), set(new_kw)
+    added_set = new_set - old_set
+    removed_set = old_set - new_set
+
+    renamed = []
+    renamed_old, renamed_new = set(), set()
+    old_pos = _keyword_by_position(old_records)
+    new_pos = _keyword_by_position(new_records)
+    for key, new_name in new_pos.items():
+        old_name = old_pos.get(key)
+        if old_name is None or old_name == new_name:
+            continue
+        if old_name in removed_set and new_name in added_set \
+                and old_name not in renamed_old and new_name not in renamed_new:
+            renamed.append((old_name, new_name))
+            renamed_old.add(old_name)
+            renamed_new.add(new_name)
+    order = {k: i for i, k in enumerate(new_kw)}
+    renamed.sort(key=lambda pair: order[pair[1]])
+
+    return {
+        'added': [k for k in new_kw if k in added_set and k not in renamed_new],
+        'removed': [k for k in old_kw if k in removed_set and k not in renamed_old],
+        'renamed': renamed,
+        'unchanged': [k for k in new_kw if k in old_set],
+        'to_scrape': [k for k in new_kw if k in added_set],
+    }
+
+
+def load_snapshot(project_dir: str) -> Optional[List[Dict]]:
+    """Records của lần trích xuất trước (None nếu chưa có snapshot)."""
+    path = os.path.join(project_dir, SNAPSHOT_FILENAME)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"[keyword_diff] WARN: cannot read snapshot {path}: {e}")
+        return None
+    records = data.get('records') if isinstance(data, dict) else None
+    return records if isinstance(records, list) else None
+
+
+def save_snapshot(project_dir: str, records: List[Dict]) -> str:
+    os.makedirs(project_dir, exist_ok=True)
+    path = os.path.join(project_dir, SNAPSHOT_FILENAME)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'records': records}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return path
+
+
+def format_diff(diff: Dict, limit: int = 10) -> str:
+    """Tóm tắt diff 1 dòng để ghi log."""
+    def _head(items):
+        shown = ', '.join(str(x) for x in items[:limit])
+        return shown + (f" (+{len(items) - limit})" if len(items) > limit else '')
+    renamed = [f"{a} -> {b}" for a, b in diff['renamed']]
+    return (
+        f"+{len(diff['added'])} [{_head(diff['added'])}] | "
+        f"-{len(diff['removed'])} [{_head(diff['removed'])}] | "
+        f"~{len(renamed)} [{_head(renamed)}]"
+    )
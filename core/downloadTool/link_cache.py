@@ -0,0 +1,187 @@
+"""link_cache.py
+Cache keyword -> links (SQLite) dùng chung giữa các project và các lần chạy.
+
+File mặc định: `data/link_cache.sqlite`. Khoá: (keyword, mode, max_results, min_minutes,
+max_minutes) với mode = 'video' | 'image'; keyword được chuẩn hoá (gộp khoảng trắng,
+không phân biệt hoa thường) giống batch_links.keyword_key.
+
+- TTL: mục cũ hơn ttl_seconds coi như miss (và bị xoá khi purge_expired / put).
+- LRU: giữ tối đa max_entries mục, xoá mục truy cập lâu nhất khi vượt.
+- Bộ đếm hit / miss / store / eviction trong process (stats()).
+- Không cache kết quả rỗng hoặc chỉ có link fallback (lỗi tạm thời không bị "đóng băng").
+
+An toàn khi dùng từ nhiều thread (driver_pool): 1 connection dùng chung (WAL bật 1 lần khi mở),
+mọi thao tác chạy trong lock; close() đóng connection (default_cache() tự close khi thoát process).
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+try:
+    from ..project_data import DATA_DIR  # type: ignore
+    from .yt_results import FALLBACK_VIDEO_LINK  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.project_data import DATA_DIR  # type: ignore
+    from core.downloadTool.yt_results import FALLBACK_VIDEO_LINK  # type: ignore
+
+CACHE_FILENAME = 'link_cache.sqlite'
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    keyword     TEXT NOT NULL,
+    mode        TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    min_minutes INTEGER NOT NULL,
+    max_minutes INTEGER NOT NULL,
+    links       TEXT NOT NULL,
+    created     REAL NOT NULL,
+    accessed    REAL NOT NULL,
+    PRIMARY KEY (keyword, mode, max_results, min_minutes, max_minutes)
+);
+CREATE INDEX IF NOT EXISTS idx_links_accessed ON links(accessed);
+"""
+
+
+def _norm_keyword(keyword: str) -> str:
+    return ' '.join(str(keyword).split()).casefold()
+
+
+class LinkCache:
+    """Cache SQLite keyword -> links (xem docstring module)."""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path or os.path.join(DATA_DIR, CACHE_FILENAME)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._db: Optional[sqlite3.Connection] = None
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection dùng chung (mở lần đầu dùng / sau close()). Gọi khi đang giữ self._lock."""
+        if self._db is None:
+            # check_same_thread=False: nhiều thread dùng chung, tuần tự hoá bằng self._lock
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+        return self._db
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    @staticmethod
+    def _key(keyword: str, mode: str, max_results: int, min_minutes: Optional[int], max_minutes: Optional[int]):
+        # None -> 0 để dùng được trong PRIMARY KEY (0 phút = không lọc, giống get_dl_link_video)
+        return (_norm_keyword(keyword), mode, int(max_results or 0), int(min_minutes or 0), int(max_minutes or 0))
+
+    def get(self, keyword: str, mode: str, max_results: int,
+            min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> Optional[List[str]]:
+        """Links đã cache (còn hạn) hoặc None."""
+        key = self._key(keyword, mode, max_results, min_minutes, max_minutes)
+        now = time.time()
+        with self._lock:
+            with self._conn() as conn:
+                row = conn.execute(
+                    'SELECT links, created FROM links WHERE keyword=? AND mode=? AND max_results=? '
+                    'AND min_minutes=? AND max_minutes=?', key
+                ).fetchone()
+                if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                    self._counters['misses'] += 1
+                    return None
+                conn.execute(
+                    'UPDATE links SET accessed=? WHERE keyword=? AND mode=? AND max_results=? '
+                    'AND min_minutes=? AND max_minutes=?', (now,) + key
+                )
+                self._counters['hits'] += 1
+        try:
+            return list(json.loads(row[0]))
+        except ValueError:
+            return None
+
+    def put(self, keyword: str, mode: str, max_results: int, links: List[str],
+            min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> bool:
+        """Lưu links. Trả về False nếu bỏ qua (rỗng / chỉ link fallback)."""
+        if not links or links == [FALLBACK_VIDEO_LINK]:
+            return False
+        key = self._key(keyword, mode, max_results, min_minutes, max_minutes)
+        now = time.time()
+        with self._lock:
+            with self._conn() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO links (keyword, mode, max_results, min_minutes, max_minutes, links, created, accessed) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', key + (json.dumps(list(links), ensure_ascii=False), now, now)
+                )
+                self._counters['stores'] += 1
+                self._evict(conn)
+        return True
+
+    def _evict(self, conn: sqlite3.Connection):
+        if not self.max_entries:
+            return
+        (count,) = conn.execute('SELECT COUNT(*) FROM links').fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                'DELETE FROM links WHERE rowid IN (SELECT rowid FROM links ORDER BY accessed ASC LIMIT ?)', (excess,)
+            )
+            self._counters['evictions'] += excess
+
+    def purge_expired(self) -> int:
+        """Xoá mục hết hạn. Trả về số mục đã xoá."""
+        if not self.ttl_seconds:
+            return 0
+        with self._lock:
+            with self._conn() as conn:
+                cur = conn.execute('DELETE FROM links WHERE created < ?', (time.time() - self.ttl_seconds,))
+                return cur.rowcount
+
+    def clear(self) -> int:
+        with self._lock:
+            with self._conn() as conn:
+                return conn.execute('DELETE FROM links').rowcount
+
+    def stats(self) -> Dict:
+        """Bộ đếm trong process + số mục và dung lượng file."""
+        with self._lock:
+            out = dict(self._counters)
+            (out['entries'],) = self._conn().execute('SELECT COUNT(*) FROM links').fetchone()
+        try:
+            out['bytes'] = os.path.getsize(self.path)
+        except OSError:
+            out['bytes'] = 0
+        return out
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache(ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None) -> LinkCache:
+    """Cache dùng chung trong process (data/link_cache.sqlite); cập nhật TTL / kích thước nếu truyền."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = LinkCache()
+            atexit.register(_default.close)
+        if ttl_seconds is not None:
+            _default.ttl_seconds = ttl_seconds
+        if max_entries is not None:
+            _default.max_entries = max_entries
+        return _default
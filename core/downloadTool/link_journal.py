@@ -0,0 +1,114 @@
+"""link_journal.py
+Journal (JSONL) cho các lần lấy link dài để chạy tiếp được sau khi bị dừng giữa chừng.
+
+File nằm cạnh file link: `dl_links.txt.journal.jsonl` / `dl_links_image.txt.journal.jsonl`.
+  - Dòng đầu: {"type": "run", "params": {...}, "started": <epoch>} (tham số lấy link: loại,
+    số kết quả / keyword, min/max phút).
+  - Mỗi keyword xong: {"type": "keyword", "keyword": ..., "links": [...]}, flush + fsync ngay
+    nên khi Chrome crash / đóng GUI chỉ mất tối đa keyword đang chạy.
+
+Chạy lại với resume=True và cùng params -> các keyword đã có trong journal được bỏ qua; khác
+params (hoặc resume=False) -> bắt đầu journal mới. Khi file link đã được ghi lại đầy đủ
+(get_link.write_link_groups, thay thế nguyên tử) thì gọi finish() để xoá journal.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+JOURNAL_SUFFIX = '.journal.jsonl'
+
+
+def journal_path(output_txt: str) -> str:
+    return f"{output_txt}{JOURNAL_SUFFIX}"
+
+
+def _load(path: str, params: Dict) -> Optional[Tuple[Dict[str, List[str]], int]]:
+    """(keyword đã xong, offset byte sau dòng hoàn chỉnh cuối cùng) hoặc None nếu không có /
+    khác params / hỏng header.
+
+    Dòng cuối ghi dở (không có '\n') nằm sau offset; dòng hỏng ở giữa được bỏ qua.
+    """
+    if not os.path.isfile(path):
+        return None
+    done: Dict[str, List[str]] = {}
+    try:
+        with open(path, 'rb') as f:
+            first = f.readline()
+            if not first.endswith(b'\n'):
+                return None
+            header = json.loads(first.decode('utf-8'))
+            if not isinstance(header, dict) or header.get('type') != 'run' or header.get('params') != params:
+                return None
+            good = len(first)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # dòng cuối ghi dở khi bị dừng
+                good += len(line)
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and entry.get('type') == 'keyword':
+                    done[str(entry.get('keyword'))] = list(entry.get('links') or [])
+    except (OSError, ValueError):
+        return None
+    return done, good
+
+
+class LinkJournal:
+    """Journal keyword -> links của 1 file output (xem docstring module)."""
+
+    def __init__(self, output_txt: str, params: Dict, resume: bool = True):
+        self.path = journal_path(output_txt)
+        self.params = json.loads(json.dumps(params))  # so sánh được với bản đọc từ JSON
+        self._lock = threading.Lock()
+        loaded = _load(self.path, self.params) if resume else None
+        if loaded is not None:
+            self.done, good = loaded
+            self.resumed = True
+            # Cắt dòng ghi dở để bản ghi mới bắt đầu ở dòng riêng
+            with open(self.path, 'r+b') as f:
+                f.truncate(good)
+            self._fh = open(self.path, 'a', encoding='utf-8')
+            print(f"[link_journal] Resume: {len(self.done)} keywords already done ({self.path})")
+        else:
+            if os.path.isfile(self.path):
+                print(f"[link_journal] Discard previous journal (different parameters or resume off): {self.path}")
+            self.done = {}
+            self.resumed = False
+            self._fh = open(self.path, 'w', encoding='utf-8')
+            self._write({'type': 'run', 'params': self.params, 'started': round(time.time(), 3)})
+
+    def _write(self, entry: Dict):
+        self._fh.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._fh.flush()
+        try:
+            os.fsync(self._fh.fileno())
+        except OSError:
+            pass
+
+    def record(self, keyword: str, links: List[str]):
+        """Ghi 1 keyword đã xong (an toàn khi gọi từ nhiều thread)."""
+        with self._lock:
+            if self._fh is None:
+                return
+            self.done[keyword] = list(links)
+            self._write({'type': 'keyword', 'keyword': keyword, 'links': list(links)})
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def finish(self):
+        """Đóng và xoá journal (gọi sau khi file link đã ghi đầy đủ)."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
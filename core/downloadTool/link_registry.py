@@ -0,0 +1,330 @@
+"""link_registry.py
+Sổ đăng ký link đã dùng (video / ảnh) giữa mọi project, để không tải + import lại cùng 1 video.
+
+File mặc định: `data/link_registry.sqlite` (bảng owned: key -> kind, project, keyword, added).
+Khoá chuẩn hoá (registry_key): video YouTube -> 'yt:<video id>' (watch / shorts / youtu.be,
+sau yt_results.clean_href), link khác -> 'url:<url>'. Link fallback không bao giờ được đăng ký.
+
+Phía trước SQLite là Bloom filter trong bộ nhớ (~1.2 MB / 1 triệu khoá, sai dương ~1%):
+khoá chưa từng đăng ký (đa số) được trả lời ngay không cần truy vấn đĩa; khoá "có thể có"
+mới tra PRIMARY KEY. Bloom được lưu cạnh file DB (`.bloom`) kèm max(rowid) để mở lại không
+phải đọc toàn bộ bảng; lệch (DB đổi bên ngoài) -> dựng lại từ DB. Vượt capacity -> dựng lại
+với capacity gấp đôi.
+
+Dùng:
+  - skipper(projects): hàm link -> True nếu link đã thuộc project khác (truyền vào
+    filter_results / filter_images qua tham số skip để collector chọn kết quả khác).
+  - register_groups(groups, kind, project): sau khi ghi file link của project; ghi log số link
+    đã thuộc project khác (flag) rồi đăng ký phần còn lại (project đầu tiên giữ quyền sở hữu).
+  - save() / close(): lưu Bloom 1 lần cuối batch (default_registry() tự close khi thoát process).
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from ..project_data import DATA_DIR  # type: ignore
+    from .yt_results import FALLBACK_VIDEO_LINK, clean_href  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.project_data import DATA_DIR  # type: ignore
+    from core.downloadTool.yt_results import FALLBACK_VIDEO_LINK, clean_href  # type: ignore
+
+REGISTRY_FILENAME = 'link_registry.sqlite'
+BLOOM_SUFFIX = '.bloom'
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.01
+# 'skip': collector bỏ qua link đã thuộc project khác; 'flag': chỉ ghi log; 'off': không dùng
+REGISTRY_MODES = ('off', 'flag', 'skip')
+
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/)([A-Za-z0-9_-]{6,})')
+_BLOOM_HEADER = struct.Struct('<8sQQQQQ')  # magic, capacity, bits, hashes, count, max rowid
+_BLOOM_MAGIC = b'LREGBLM2'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS owned (
+    key     TEXT PRIMARY KEY,
+    kind    TEXT NOT NULL,
+    project TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    added   REAL NOT NULL
+);
+"""
+
+
+def registry_key(link: str) -> Optional[str]:
+    """Khoá chuẩn hoá của link, None nếu rỗng / link fallback."""
+    if not link:
+        return None
+    href = clean_href(link.strip())
+    if not href or href == FALLBACK_VIDEO_LINK:
+        return None
+    if 'youtube.com' in href or 'youtu.be' in href:
+        m = _VIDEO_ID_RE.search(href)
+        if m:
+            return f"yt:{m.group(1)}"
+    return f"url:{href}"
+
+
+class BloomFilter:
+    """Bloom filter trên bytearray, double hashing từ 1 digest blake2b."""
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE, bits: Optional[int] = None, hashes: Optional[int] = None):
+        self.capacity = max(1, int(capacity))
+        if bits is None:
+            bits = int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        if hashes is None:
+            hashes = max(1, int(round(bits / self.capacity * math.log(2))))
+        self.bits = max(8, int(bits))
+        self.hashes = int(hashes)
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        array = self.array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class LinkRegistry:
+    """Sổ đăng ký link SQLite + Bloom filter (xem docstring module).
+
+    Mỗi thread giữ 1 kết nối SQLite (WAL bật 1 lần khi mở); lock chỉ bảo vệ Bloom + bộ đếm,
+    truy vấn đĩa chạy ngoài lock.
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        self.path = path or os.path.join(DATA_DIR, REGISTRY_FILENAME)
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._dirty = False  # Bloom đổi từ lần save() trước
+        self._counters = {'bloom_negative': 0, 'db_lookups': 0, 'false_positives': 0, 'skipped': 0, 'added': 0}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+        self._bloom = self._load_bloom(capacity)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Kết nối SQLite của thread hiện tại (mở lần đầu dùng)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False chỉ để close() đóng được từ thread khác; mỗi kết nối vẫn chỉ 1 thread dùng
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    @property
+    def bloom_path(self) -> str:
+        return self.path + BLOOM_SUFFIX
+
+    def _max_rowid(self, conn: sqlite3.Connection) -> int:
+        return int(conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM owned').fetchone()[0])
+
+    def _load_bloom(self, capacity: int) -> BloomFilter:
+        max_rowid = self._max_rowid(self._conn())
+        try:
+            with open(self.bloom_path, 'rb') as f:
+                magic, saved_capacity, bits, hashes, count, stamp = _BLOOM_HEADER.unpack(f.read(_BLOOM_HEADER.size))
+                if magic == _BLOOM_MAGIC and stamp == max_rowid:
+                    bloom = BloomFilter(saved_capacity, self.error_rate, bits=bits, hashes=hashes)
+                    data = f.read()
+                    if len(data) == len(bloom.array):
+                        bloom.array[:] = data
+                        bloom.count = count
+                        if count <= bloom.capacity:
+                            return bloom
+        except (OSError, struct.error):
+            pass
+        self._dirty = True
+        return self._rebuild(capacity)
+
+    def _rebuild(self, capacity: int) -> BloomFilter:
+        """Dựng lại Bloom từ DB (capacity tối thiểu gấp đôi số khoá hiện có)."""
+        t0 = time.time()
+        conn = self._conn()
+        (entries,) = conn.execute('SELECT COUNT(*) FROM owned').fetchone()
+        bloom = BloomFilter(max(capacity, entries * 2), self.error_rate)
+        for (key,) in conn.execute('SELECT key FROM owned'):
+            bloom.add(key)
+        if entries:
+            print(f"[link_registry] Bloom rebuilt: {entries} keys in {time.time() - t0:.1f}s")
+        return bloom
+
+    def save(self):
+        """Lưu Bloom ra file nếu đã đổi (mở lại không cần đọc bảng). Gọi 1 lần cuối batch / khi đóng."""
+        stamp = self._max_rowid(self._conn())
+        with self._lock:
+            if not self._dirty:
+                return
+            bloom = self._bloom
+            tmp = self.bloom_path + '.tmp'
+            try:
+                with open(tmp, 'wb') as f:
+                    f.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, bloom.capacity, bloom.bits, bloom.hashes, bloom.count, stamp))
+                    f.write(bytes(bloom.array))
+                os.replace(tmp, self.bloom_path)
+                self._dirty = False
+            except OSError as e:
+                print(f"[link_registry] WARN: cannot save bloom filter: {e}")
+
+    def close(self):
+        """save() rồi đóng mọi kết nối SQLite (mở lại tự động nếu còn dùng tiếp)."""
+        self.save()
+        with self._lock:
+            conns, self._conns = self._conns, []
+            self._local = threading.local()
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _maybe_in_db(self, key: str) -> bool:
+        """Bloom: False = chắc chắn chưa đăng ký, True = cần tra DB."""
+        with self._lock:
+            if key not in self._bloom:
+                self._counters['bloom_negative'] += 1
+                return False
+            self._counters['db_lookups'] += 1
+            return True
+
+    def _owner_of(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        if not self._maybe_in_db(key):
+            return None
+        row = conn.execute('SELECT project FROM owned WHERE key=?', (key,)).fetchone()
+        if row is None:
+            with self._lock:
+                self._counters['false_positives'] += 1
+            return None
+        return row[0]
+
+    def owner(self, link: str) -> Optional[str]:
+        """Project sở hữu link, None nếu chưa đăng ký."""
+        key = registry_key(link)
+        if key is None:
+            return None
+        return self._owner_of(self._conn(), key)
+
+    def contains(self, link: str) -> bool:
+        return self.owner(link) is not None
+
+    def skipper(self, projects: Iterable[str] = ()) -> Callable[[str], bool]:
+        """Hàm link -> True nếu link đã thuộc project ngoài `projects` (dùng cho tham số skip)."""
+        mine = set(p for p in projects if p)
+
+        def skip(link: str) -> bool:
+            owner = self.owner(link)
+            if owner is None or owner in mine:
+                return False
+            with self._lock:
+                self._counters['skipped'] += 1
+            return True
+        return skip
+
+    def _insert(self, conn: sqlite3.Connection, rows: List[tuple]) -> int:
+        """INSERT OR IGNORE các (key, kind, project, keyword, added) qua conn. Trả về số khoá mới."""
+        before = conn.total_changes
+        conn.executemany('INSERT OR IGNORE INTO owned (key, kind, project, keyword, added) VALUES (?, ?, ?, ?, ?)', rows)
+        return conn.total_changes - before
+
+    def _after_insert(self, keys: Iterable[str], added: int):
+        with self._lock:
+            for k in keys:
+                if k not in self._bloom:
+                    self._bloom.add(k)
+            self._counters['added'] += added
+            self._dirty = True
+            grow = self._bloom.count > self._bloom.capacity
+        if grow:
+            bloom = self._rebuild(self._bloom.capacity * 2)
+            with self._lock:
+                self._bloom = bloom
+
+    def add_many(self, links: Iterable[str], kind: str, project: str, keyword: str = '') -> int:
+        """Đăng ký links cho project (link đã có chủ giữ nguyên chủ cũ). Trả về số khoá mới."""
+        keys = [k for k in dict.fromkeys(registry_key(link) for link in links) if k]
+        if not keys:
+            return 0
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            added = self._insert(conn, [(k, kind, project, keyword, now) for k in keys])
+        self._after_insert(keys, added)
+        return added
+
+    def register_groups(self, groups: Dict[str, List[str]], kind: str, project: str) -> Dict[str, int]:
+        """Đăng ký link của 1 project ({keyword: [links]}), ghi log số link đã thuộc project khác.
+
+        Kiểm tra chủ + ghi chung 1 transaction; không lưu Bloom (gọi save() / close() cuối batch).
+        """
+        flagged = 0
+        total = 0
+        rows = []
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')  # giữ quyền ghi từ lúc kiểm tra chủ tới lúc ghi
+            for keyword, links in groups.items():
+                total += len(links)
+                for key in dict.fromkeys(registry_key(link) for link in links):
+                    if not key:
+                        continue
+                    owner = self._owner_of(conn, key)
+                    if owner is not None and owner != project:
+                        flagged += 1
+                    rows.append((key, kind, project, keyword, now))
+            added = self._insert(conn, rows)
+        self._after_insert([r[0] for r in rows], added)
+        if flagged:
+            print(f"[link_registry] {project}: {flagged}/{total} {kind} links already used by other projects.")
+        return {'links': total, 'flagged': flagged, 'added': added}
+
+    def stats(self) -> Dict:
+        (entries,) = self._conn().execute('SELECT COUNT(*) FROM owned').fetchone()
+        with self._lock:
+            out = dict(self._counters)
+            out['bloom_bytes'] = len(self._bloom.array)
+            out['bloom_capacity'] = self._bloom.capacity
+        out['entries'] = entries
+        return out
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_registry() -> LinkRegistry:
+    """Registry dùng chung trong process (data/link_registry.sqlite)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = LinkRegistry()
+            atexit.register(_default.close)  # lưu Bloom nếu chưa ai gọi save()
+        return _default
@@ -0,0 +1,154 @@
+"""prproj_synth.py
+Sinh file .prproj giả lập (XML gzip theo kiểu Premiere) để đo / kiểm tra get_name_list.
+
+File sinh ra có:
+  - n_sequences Sequence, mỗi Sequence có Rate/Timebase riêng (25, 30, 24, ...)
+  - tracks_per_sequence video track (+1 audio track không có text) mỗi Sequence
+  - ClipItem chia đều vào các track, mỗi ClipItem có Start/End (frame), Name, PathUrl
+    và một VideoFilterComponent/Component/InstanceName (text instance)
+  - layout='nested': Sequence > Media > Video > Track > ClipItem lồng trực tiếp
+    layout='refs':   Sequence -> VideoTrackGroup -> VideoClipTrack -> ClipItem nối qua
+                     ObjectRef/ObjectURef như project thật
+
+Ghi theo luồng (không dựng chuỗi XML trong bộ nhớ) nên sinh được 1M instance.
+
+CLI:
+    python -m core.downloadTool.prproj_synth <out.prproj> <n_instances> [--sequences N] [--tracks N] [--layout nested|refs] [--seed N]
+"""
+from __future__ import annotations
+
+import gzip
+import random
+import sys
+from typing import Dict, Optional
+from xml.sax.saxutils import escape
+
+_TIMEBASES = (25, 30, 24, 60, 50)
+_WORDS = (
+    'Amber', 'Portwood', 'cat', 'clip', 'tutorial', 'segment', 'river', 'night', 'city', 'drone',
+    'sunset', 'interview', 'market', 'street', 'forest', 'ocean', 'train', 'crowd', 'studio', 'podcast',
+)
+
+
+def _instance_name(rnd: random.Random, i: int) -> str:
+    words = rnd.sample(_WORDS, rnd.randint(1, 3))
+    # Chừa một phần tên ngắn dạng "A bcd" (bị is_listed_name bỏ qua) và tên lặp lại
+    if i % 97 == 0:
+        return 'A ' + words[0].lower()
+    if i % 11 == 0:
+        return ' '.join(words[:1])
+    return f"{' '.join(words)} {i}"
+
+
+def _split(total: int, parts: int):
+    base, extra = divmod(total, parts)
+    return [base + (1 if k < extra else 0) for k in range(parts)]
+
+
+def generate_prproj(
+    path: str,
+    n_instances: int,
+    n_sequences: int = 2,
+    tracks_per_sequence: int = 3,
+    layout: str = 'nested',
+    seed: int = 0,
+    compresslevel: int = 6,
+) -> Dict:
+    """Ghi file .prproj giả lập tại path. Trả về thông số đã sinh (số sequence/track/clip)."""
+    if layout not in ('nested', 'refs'):
+        raise ValueError(f"unknown layout: {layout}")
+    n_sequences = max(1, n_sequences)
+    tracks_per_sequence = max(1, tracks_per_sequence)
+    rnd = random.Random(seed)
+    per_track = _split(n_instances, n_sequences * tracks_per_sequence)
+    next_id = [1000]
+
+    def new_id() -> int:
+        next_id[0] += 1
+        return next_id[0]
+
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=compresslevel) as f:
+        w = f.write
+        w('<?xml version="1.0" encoding="UTF-8"?>\n<PremiereData Version="3">\n')
+        w('<Project ObjectID="1"><Name>synthetic</Name></Project>\n')
+        idx = 0
+        for s in range(n_sequences):
+            timebase = _TIMEBASES[s % len(_TIMEBASES)]
+            tracks = per_track[s * tracks_per_sequence:(s + 1) * tracks_per_sequence]
+            if layout == 'nested':
+                w(f'<Sequence ObjectUID="seq-{s}"><Name>Sequence {s:02d}</Name>'
+                  f'<Rate><Timebase>{timebase}</Timebase></Rate><Media><Video>\n')
+                for n_clips in tracks:
+                    w('<Track>\n')
+                    for _ in range(n_clips):
+                        _write_clip(w, rnd, idx, None)
+                        idx += 1
+                    w('</Track>\n')
+                w('</Video><Audio><Track><ClipItem><Name>audio.wav</Name><Start>0</Start><End>10</End></ClipItem>'
+                  '</Track></Audio></Media></Sequence>\n')
+                continue
+            group_id = new_id()
+            settings_id = new_id()
+            track_uids = [f'track-{s}-{t}' for t in range(len(tracks))]
+            w(f'<Sequence ObjectUID="seq-{s}"><Name>Sequence {s:02d}</Name>'
+              f'<TrackGroups><TrackGroup ObjectRef="{group_id}"/></TrackGroups>'
+              f'<Settings ObjectRef="{settings_id}"/></Sequence>\n')
+            w(f'<SequenceSettings ObjectID="{settings_id}"><Rate><Timebase>{timebase}</Timebase></Rate></SequenceSettings>\n')
+            w(f'<VideoTrackGroup ObjectID="{group_id}"><Tracks>')
+            w(''.join(f'<Track ObjectURef="{uid}"/>' for uid in track_uids))
+            w('</Tracks></VideoTrackGroup>\n')
+            for uid, n_clips in zip(track_uids, tracks):
+                clip_ids = [new_id() for _ in range(n_clips)]
+                w(f'<VideoClipTrack ObjectUID="{uid}"><Items>')
+                w(''.join(f'<Item ObjectRef="{cid}"/>' for cid in clip_ids))
+                w('</Items></VideoClipTrack>\n')
+                for cid in clip_ids:
+                    _write_clip(w, rnd, idx, cid)
+                    idx += 1
+        w('</PremiereData>\n')
+    return {
+        'path': path,
+        'instances': n_instances,
+        'sequences': n_sequences,
+        'tracks_per_sequence': tracks_per_sequence,
+        'layout': layout,
+        'seed': seed,
+    }
+
+
+def _write_clip(w, rnd: random.Random, idx: int, object_id: Optional[int]):
+    start = rnd.randint(0, 500000)
+    end = start + rnd.randint(1, 750)
+    name = escape(_instance_name(rnd, idx))
+    attr = f' ObjectID="{object_id}"' if object_id is not None else ''
+    # Xen kẽ Start/End và InPoint/OutPoint như project thật
+    if idx % 2:
+        timing = f'<Start>{start}</Start><End>{end}</End>'
+    else:
+        timing = f'<InPoint>{start}</InPoint><OutPoint>{end}</OutPoint>'
+    w(f'<ClipItem{attr}><Name>Graphic</Name>{timing}'
+      f'<File><PathUrl>file://localhost/media/clip_{idx % 500}.mp4</PathUrl></File>'
+      f'<Filter><VideoFilterComponent><Component><InstanceName>{name}</InstanceName>'
+      f'<Params><Param>0.5</Param></Params></Component></VideoFilterComponent></Filter></ClipItem>\n')
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    opts = {'--sequences': 2, '--tracks': 3, '--layout': 'nested', '--seed': 0}
+    for key in list(opts):
+        if key in args:
+            i = args.index(key)
+            opts[key] = args[i + 1] if i + 1 < len(args) else opts[key]
+            del args[i:i + 2]
+    if len(args) < 2:
+        print('Usage: python -m core.downloadTool.prproj_synth <out.prproj> <n_instances> '
+              '[--sequences N] [--tracks N] [--layout nested|refs] [--seed N]')
+        sys.exit(1)
+    info = generate_prproj(
+        args[0], int(args[1]),
+        n_sequences=int(opts['--sequences']),
+        tracks_per_sequence=int(opts['--tracks']),
+        layout=str(opts['--layout']),
+        seed=int(opts['--seed']),
+    )
+    print(f"[prproj_synth] Wrote {info['instances']} instances ({info['layout']}) -> {info['path']}")
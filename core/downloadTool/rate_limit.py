@@ -0,0 +1,199 @@
+"""rate_limit.py
+Giới hạn tốc độ request theo host, dùng chung cho mọi thread / driver / session khi lấy link.
+
+Thay cho các sleep cố định (1s giữa 2 keyword, nghỉ sau scroll...): mỗi host có 1 token bucket
+(`rate` request / giây, tối đa `burst` token dồn lại). Collector gọi acquire(host) trước mỗi
+request tới host (mở trang kết quả, scroll kích hoạt continuation, request HTTP) rồi
+report(...) kết quả để tốc độ tự điều chỉnh (AIMD):
+  - thành công, latency bình thường  -> rate += INCREASE_STEP (tới max_rate)
+  - latency cao (> SLOW_FACTOR x trung bình trượt, tối thiểu SLOW_LATENCY) hoặc lỗi -> rate x DECREASE_FACTOR
+  - bị chặn (captcha / trang consent / HTTP 429) -> rate x BLOCK_FACTOR và tạm dừng host
+    COOLDOWN giây (nhân đôi nếu bị chặn liên tiếp, tối đa MAX_COOLDOWN)
+Lỗi = mở trang / kết nối thất bại; trang hợp lệ không có kết quả không phải lỗi. Scroll chỉ
+acquire (chờ lượt), không report: thời gian chờ kết quả mới không phải latency của host.
+
+detect_block(driver) / detect_block_http(resp) nhận diện trang chặn.
+"""
+from __future__ import annotations
+
+import threading
+from time import monotonic, sleep
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = 1.0  # req/s, tương đương sleep(1.0) cũ giữa 2 keyword
+MIN_RATE = 0.1
+MAX_RATE = 5.0
+DEFAULT_BURST = 2.0
+INCREASE_STEP = 0.1
+DECREASE_FACTOR = 0.7
+BLOCK_FACTOR = 0.5
+SLOW_FACTOR = 2.0
+SLOW_LATENCY = 3.0
+LATENCY_ALPHA = 0.2
+COOLDOWN = 30.0
+MAX_COOLDOWN = 300.0
+
+_BLOCK_URL_MARKERS = ('google.com/sorry', 'consent.youtube.com', 'consent.google.com', '/recaptcha/')
+_BLOCK_TEXT_MARKERS = ('unusual traffic', 'not a robot', 'g-recaptcha', 'before you continue to')
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower() or url
+
+
+class _Bucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = monotonic()
+        self.latency: Optional[float] = None
+        self.blocked_until = 0.0
+        self.blocks = 0  # số lần bị chặn liên tiếp
+        self.stats = {'requests': 0, 'waited_seconds': 0.0, 'slow': 0, 'errors': 0, 'blocked': 0}
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """Token bucket theo host, tốc độ tự điều chỉnh (xem docstring module). An toàn đa luồng."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST,
+                 min_rate: float = MIN_RATE, max_rate: float = MAX_RATE):
+        self.initial_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def _bucket(self, host: str) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(self.initial_rate, self.burst)
+        return bucket
+
+    def acquire(self, host: str) -> float:
+        """Chờ tới lượt gửi 1 request tới host. Trả về số giây đã chờ."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                bucket = self._bucket(host)
+                now = monotonic()
+                if now < bucket.blocked_until:
+                    wait = bucket.blocked_until - now
+                else:
+                    bucket.refill(now)
+                    if bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        bucket.stats['requests'] += 1
+                        bucket.stats['waited_seconds'] += waited
+                        return waited
+                    wait = (1 - bucket.tokens) / bucket.rate
+            sleep(wait)
+            waited += wait
+
+    def report(self, host: str, latency: Optional[float] = None, ok: bool = True, blocked: bool = False):
+        """Phản hồi kết quả request để tăng / giảm rate của host."""
+        with self._lock:
+            bucket = self._bucket(host)
+            now = monotonic()
+            bucket.refill(now)
+            if blocked:
+                bucket.blocks += 1
+                bucket.stats['blocked'] += 1
+                bucket.rate = max(self.min_rate, bucket.rate * BLOCK_FACTOR)
+                cooldown = min(MAX_COOLDOWN, COOLDOWN * (2 ** (bucket.blocks - 1)))
+                bucket.blocked_until = now + cooldown
+                bucket.tokens = 0
+                print(f"[rate_limit] {host}: blocked (captcha / consent) -> pause {cooldown:.0f}s, "
+                      f"rate {bucket.rate:.2f}/s")
+                return
+            if not ok:
+                bucket.stats['errors'] += 1
+                bucket.rate = max(self.min_rate, bucket.rate * DECREASE_FACTOR)
+                return
+            bucket.blocks = 0
+            if latency is not None:
+                slow = bucket.latency is not None and latency > max(SLOW_LATENCY, SLOW_FACTOR * bucket.latency)
+                bucket.latency = latency if bucket.latency is None else (
+                    (1 - LATENCY_ALPHA) * bucket.latency + LATENCY_ALPHA * latency
+                )
+                if slow:
+                    bucket.stats['slow'] += 1
+                    bucket.rate = max(self.min_rate, bucket.rate * DECREASE_FACTOR)
+                    return
+            bucket.rate = min(self.max_rate, bucket.rate + INCREASE_STEP)
+
+    def rate(self, host: str) -> float:
+        with self._lock:
+            return self._bucket(host).rate
+
+    def stats(self) -> Dict[str, Dict]:
+        """{host: {rate, latency, requests, waited_seconds, slow, errors, blocked}}."""
+        with self._lock:
+            out = {}
+            for host, bucket in self._buckets.items():
+                st = dict(bucket.stats)
+                st['rate'] = round(bucket.rate, 3)
+                st['latency'] = round(bucket.latency, 3) if bucket.latency is not None else None
+                st['waited_seconds'] = round(st['waited_seconds'], 3)
+                out[host] = st
+            return out
+
+
+def detect_block(driver) -> Optional[str]:
+    """'captcha' / 'consent' nếu trang hiện tại là trang chặn, None nếu bình thường hoặc không đọc được."""
+    try:
+        url = (driver.current_url or '').lower()
+    except Exception:
+        return None
+    if 'consent.' in url:
+        return 'consent'
+    if any(m in url for m in _BLOCK_URL_MARKERS):
+        return 'captcha'
+    try:
+        text = (driver.execute_script(
+            "return (document.title || '') + ' ' + ((document.body && document.body.innerText) || '').slice(0, 2000);"
+        ) or '').lower()
+    except Exception:
+        return None
+    if 'before you continue to' in text:
+        return 'consent'
+    if any(m in text for m in _BLOCK_TEXT_MARKERS):
+        return 'captcha'
+    return None
+
+
+def detect_block_http(resp) -> Optional[str]:
+    """Như detect_block cho requests.Response (429 / chuyển hướng consent / trang sorry)."""
+    url = (getattr(resp, 'url', '') or '').lower()
+    if 'consent.' in url:
+        return 'consent'
+    if getattr(resp, 'status_code', 200) == 429 or any(m in url for m in _BLOCK_URL_MARKERS):
+        return 'captcha'
+    return None
+
+
+_default: Optional[RateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def default_limiter() -> RateLimiter:
+    """RateLimiter dùng chung trong process (mọi driver / session / thread)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RateLimiter()
+        return _default
+
+
+def set_default_limiter(limiter: Optional[RateLimiter]) -> Optional[RateLimiter]:
+    """Thay RateLimiter dùng chung (vd. benchmark replay), None = tạo lại mặc định. Trả về limiter cũ."""
+    global _default
+    with _default_lock:
+        old, _default = _default, limiter
+        return old
@@ -0,0 +1,625 @@
+"""replay.py
+Ghi / phát lại trang kết quả YouTube + Google Images để test và benchmark get_link không cần mạng.
+
+Fixture: `data/replay/<tên>/` gồm index.json (meta + danh sách response) và bodies/<hash>.bin.
+  - record: với mỗi keyword, mở trang kết quả (video: cùng URL collector dựng, gồm bộ lọc thời
+    lượng; ảnh: image_search_url), scroll như collector rồi lưu mọi response Document / XHR /
+    Fetch / Script / Stylesheet đọc được qua performance log + CDP Network.getResponseBody
+    (via='browser', cần Chrome), hoặc response mà yt_http nhận được (via='http', không cần Chrome).
+  - ReplayServer: HTTP server cục bộ trả lại các response đã lưu, với độ trễ (latency, giây /
+    request) và băng thông (bytes / giây) cấu hình được. install() đặt AUTOTOOL_YOUTUBE_BASE_URL /
+    AUTOTOOL_GOOGLE_BASE_URL nên Chrome của init_driver (qua URL collector dựng) và yt_http đều
+    đọc từ server. URL tuyệt đối tới host đã ghi trong HTML / JS / JSON được đổi thành
+    `<server>/_h/<host>/...`.
+  - bench: chạy get_links_main_video / get_links_main_image trên fixture, báo keyword / phút
+    (kết quả JSON ở data/bench/replay_<timestamp>.json, kèm tóm tắt scrape_metrics).
+
+Khoá response: method + path + query đã sắp xếp (bỏ tham số thay đổi mỗi lần như key / ei) +
+token continuation trong body POST /youtubei/v1/search. GET không khớp chính xác -> khớp theo
+path (asset có tham số cache-busting). Request không có trong fixture -> 404 (đếm vào misses).
+
+Giới hạn: phát lại bằng Chrome phụ thuộc script của trang chạy được từ origin cục bộ
+(backend 'devtools' / 'http' và collector ảnh 'dom' chỉ cần dữ liệu nhúng trong HTML / JSON).
+bench không kiểm tra dung lượng ảnh (HEAD tới host ảnh thật): mọi ảnh qua bộ lọc được coi là đủ
+dung lượng, nên counters rejected_size luôn 0 và số link ảnh có thể cao hơn khi chạy thật.
+
+    python -m core.downloadTool.replay record <tên> <list_name.txt> [--via browser|http]
+        [--kind video|image|both] [--min M] [--max M] [--scrolls N] [--headless]
+    python -m core.downloadTool.replay serve <tên> [--port P] [--latency-ms MS] [--kbps KB]
+    python -m core.downloadTool.replay bench <tên> [--kind video|image|both] [--backend browser|devtools|http]
+        [--image-backend dom|keyboard] [--workers N] [--latency-ms MS] [--kbps KB] [--rate R]
+        [--headful] [--out file.json]
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+try:
+    from ..project_data import DATA_DIR  # type: ignore
+    from . import get_link  # type: ignore
+    from . import yt_http  # type: ignore
+    from .image_results import GOOGLE_BASE_URL_ENV, image_search_url, set_default_validator  # type: ignore
+    from .rate_limit import RateLimiter, default_limiter, host_of, set_default_limiter  # type: ignore
+    from .scrape_metrics import load_records, metrics_dir_for, summarize, format_summary  # type: ignore
+    from .yt_results import search_url  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.project_data import DATA_DIR  # type: ignore
+    from core.downloadTool import get_link  # type: ignore
+    from core.downloadTool import yt_http  # type: ignore
+    from core.downloadTool.image_results import GOOGLE_BASE_URL_ENV, image_search_url, set_default_validator  # type: ignore
+    from core.downloadTool.rate_limit import RateLimiter, default_limiter, host_of, set_default_limiter  # type: ignore
+    from core.downloadTool.scrape_metrics import load_records, metrics_dir_for, summarize, format_summary  # type: ignore
+    from core.downloadTool.yt_results import search_url  # type: ignore
+
+REPLAY_DIRNAME = 'replay'
+INDEX_FILENAME = 'index.json'
+# Tham số query thay đổi theo phiên / lần tải, bỏ khỏi khoá
+VOLATILE_PARAMS = {'key', 'prettyPrint', '_', 'rt', 'ei', 'ved', 'sei', 'sa', 'biw', 'bih', 'dpr', 'cver', 'cpn'}
+RECORD_TYPES = ('Document', 'XHR', 'Fetch', 'Script', 'Stylesheet')
+RECORD_SCROLLS = 6  # = num_scroll của collector
+_TEXT_TYPES = ('text/', 'javascript', 'json', 'xml')
+_CHUNK = 16 * 1024
+
+
+def replay_dir(name: str) -> str:
+    return os.path.join(DATA_DIR, REPLAY_DIRNAME, name)
+
+
+def _continuation(body) -> Optional[str]:
+    if not body:
+        return None
+    try:
+        data = json.loads(body.decode('utf-8') if isinstance(body, bytes) else body)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return data.get('continuation') if isinstance(data, dict) else None
+
+
+def request_key(method: str, url: str, body=None) -> str:
+    """'<METHOD> <path>?<query sắp xếp>[#<continuation>]' (không gồm host)."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    key = f"{method.upper()} {parts.path or '/'}"
+    if query:
+        key += '?' + urlencode(query)
+    token = _continuation(body)
+    if token:
+        key += '#' + token
+    return key
+
+
+def _path_key(key: str) -> str:
+    return key.split('?', 1)[0].split('#', 1)[0]
+
+
+class FixtureStore:
+    """Các response đã ghi của 1 fixture (index.json + bodies/). An toàn đa luồng."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.meta: Dict = {}
+        self.entries: Dict[str, Dict] = {}  # '<host> <key>' -> {host, key, status, content_type, file}
+        try:
+            with open(os.path.join(path, INDEX_FILENAME), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.meta = data.get('meta') or {}
+            for entry in data.get('entries') or []:
+                self.entries[f"{entry['host']} {entry['key']}"] = entry
+        except (OSError, ValueError):
+            pass
+        self._build_lookup()
+
+    def _build_lookup(self):
+        self._by_key: Dict[str, Dict] = {}
+        self._by_path: Dict[str, Dict] = {}
+        for entry in self.entries.values():
+            self._by_key.setdefault(entry['key'], entry)
+            if entry['key'].startswith('GET '):
+                self._by_path.setdefault(f"{entry['host']} {_path_key(entry['key'])}", entry)
+                self._by_path.setdefault(_path_key(entry['key']), entry)
+
+    @property
+    def hosts(self) -> List[str]:
+        return sorted({e['host'] for e in self.entries.values()})
+
+    def add(self, method: str, url: str, body, status: int, content_type: str, content: bytes) -> bool:
+        """Lưu 1 response (response đã có cùng khoá được giữ nguyên). True nếu là response mới."""
+        host = host_of(url)
+        key = request_key(method, url, body)
+        full = f"{host} {key}"
+        with self._lock:
+            if full in self.entries:
+                return False
+            name = hashlib.sha1(full.encode('utf-8')).hexdigest()[:20] + '.bin'
+            os.makedirs(os.path.join(self.path, 'bodies'), exist_ok=True)
+            with open(os.path.join(self.path, 'bodies', name), 'wb') as f:
+                f.write(content or b'')
+            self.entries[full] = {'host': host, 'key': key, 'status': int(status or 200),
+                                  'content_type': content_type or 'application/octet-stream', 'file': name}
+            return True
+
+    def lookup(self, method: str, url: str, body=None, host: Optional[str] = None) -> Optional[Dict]:
+        key = request_key(method, url, body)
+        if host:
+            entry = self.entries.get(f"{host} {key}")
+            if entry is None and method.upper() == 'GET':
+                entry = self._by_path.get(f"{host} {_path_key(key)}")
+            if entry is not None:
+                return entry
+        entry = self._by_key.get(key)
+        if entry is None and method.upper() == 'GET':
+            entry = self._by_path.get(_path_key(key))
+        return entry
+
+    def read(self, entry: Dict) -> bytes:
+        with open(os.path.join(self.path, 'bodies', entry['file']), 'rb') as f:
+            return f.read()
+
+    def save(self):
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            tmp = os.path.join(self.path, INDEX_FILENAME + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'meta': self.meta, 'entries': sorted(self.entries.values(), key=lambda e: (e['host'], e['key']))},
+                          f, ensure_ascii=False, indent=1)
+            os.replace(tmp, os.path.join(self.path, INDEX_FILENAME))
+            self._build_lookup()
+
+    def response_hook(self, resp, *args, **kwargs):
+        """Hook 'response' của requests.Session: lưu mọi response mà session nhận."""
+        req = resp.request
+        if 300 <= resp.status_code < 400:  # chuyển hướng: chỉ lưu response cuối
+            return resp
+        self.add(req.method, req.url, req.body, resp.status_code, resp.headers.get('Content-Type', ''), resp.content)
+        return resp
+
+
+# ---------------------------------------------------------------- record
+
+def _record_browser_responses(driver, store: FixtureStore) -> int:
+    """Lưu response đã tải xong trong performance log (đọc body qua CDP). Trả về số response mới."""
+    try:
+        entries = driver.get_log('performance')
+    except Exception as e:
+        raise RuntimeError(f"performance log unavailable: {e}")
+    requests_: Dict[str, Dict] = {}
+    responses: Dict[str, Dict] = {}
+    finished: List[str] = []
+    for entry in entries:
+        try:
+            msg = json.loads(entry['message'])['message']
+        except Exception:
+            continue
+        params = msg.get('params') or {}
+        request_id = params.get('requestId')
+        method = msg.get('method')
+        if method == 'Network.requestWillBeSent':
+            requests_[request_id] = params.get('request') or {}
+        elif method == 'Network.responseReceived' and params.get('type') in RECORD_TYPES:
+            responses[request_id] = params.get('response') or {}
+        elif method == 'Network.loadingFinished':
+            finished.append(request_id)
+    added = 0
+    for request_id in finished:
+        response = responses.get(request_id)
+        request = requests_.get(request_id)
+        if response is None or request is None:
+            continue
+        try:
+            body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            continue
+        text = body.get('body') or ''
+        content = base64.b64decode(text) if body.get('base64Encoded') else text.encode('utf-8')
+        headers = {k.lower(): v for k, v in (response.get('headers') or {}).items()}
+        content_type = headers.get('content-type') or response.get('mimeType') or ''
+        if store.add(request.get('method') or 'GET', response.get('url') or request.get('url') or '',
+                     request.get('postData'), response.get('status') or 200, content_type, content):
+            added += 1
+    return added
+
+
+def _scroll_and_wait(driver, host: str, count_js: str, scrolls: int):
+    limiter = default_limiter()
+    for _ in range(scrolls):
+        before = get_link._result_count(driver, count_js)
+        limiter.acquire(host)
+        try:
+            driver.execute_script('window.scrollBy(0, document.documentElement.scrollHeight);')
+        except Exception:
+            return
+        if not get_link._wait_for_more_results(driver, before, count_js=count_js):
+            return
+
+
+def record_browser(keywords: List[str], store: FixtureStore, kinds: Iterable[str] = ('video', 'image'),
+                   min_minutes: Optional[int] = None, max_minutes: Optional[int] = None,
+                   scrolls: int = RECORD_SCROLLS, headless: bool = False) -> int:
+    """Ghi bằng Chrome (init_driver, performance log). Trả về số response đã lưu."""
+    driver = get_link.init_driver(headless=headless, track_bytes=True)
+    limiter = default_limiter()
+    total = 0
+    try:
+        for kind in kinds:
+            for keyword in keywords:
+                if kind == 'video':
+                    url, count_js = search_url(keyword, min_minutes, max_minutes, base=yt_http.base_url()), get_link._VIDEO_COUNT_JS
+                else:
+                    url, count_js = image_search_url(keyword), get_link._IMAGE_COUNT_JS
+                host = host_of(url)
+                limiter.acquire(host)
+                print(f"[replay] Record {kind}: {url}")
+                driver.get(url)
+                get_link._wait_for_more_results(driver, 0, timeout=20, count_js=count_js)
+                _scroll_and_wait(driver, host, count_js, scrolls)
+                added = _record_browser_responses(driver, store)
+                total += added
+                print(f"[replay]   {added} responses")
+    finally:
+        get_link.close_driver(driver)
+    return total
+
+
+def record_http(keywords: List[str], store: FixtureStore, kinds: Iterable[str] = ('video', 'image'),
+                min_minutes: Optional[int] = None, max_minutes: Optional[int] = None,
+                pages: int = yt_http.MAX_PAGES) -> int:
+    """Ghi bằng yt_http (không cần Chrome): trang đầu + continuation, trang tìm ảnh (HTML)."""
+    before = len(store.entries)
+    session = yt_http.new_session()
+    session.hooks['response'].append(store.response_hook)
+    try:
+        for kind in kinds:
+            for keyword in keywords:
+                print(f"[replay] Record {kind} (http): '{keyword}'")
+                try:
+                    if kind == 'video':
+                        _, token, ytcfg = yt_http.search_page(session, keyword, min_minutes=min_minutes, max_minutes=max_minutes)
+                        for _ in range(pages - 1):
+                            if not token:
+                                break
+                            _, token = yt_http.continuation_page(session, token, ytcfg)
+                    else:
+                        url = image_search_url(keyword)
+                        default_limiter().acquire(host_of(url))
+                        session.get(url, timeout=yt_http.REQUEST_TIMEOUT)
+                except Exception as e:
+                    print(f"[replay] WARN: '{keyword}' ({kind}): {e}")
+    finally:
+        session.close()
+    return len(store.entries) - before
+
+
+def record(name: str, keywords: List[str], via: str = 'browser', kinds: Iterable[str] = ('video', 'image'),
+           min_minutes: Optional[int] = None, max_minutes: Optional[int] = None,
+           scrolls: int = RECORD_SCROLLS, headless: bool = False) -> FixtureStore:
+    """Ghi fixture data/replay/<name>/ cho danh sách keyword (ghi thêm nếu fixture đã có)."""
+    kinds = list(kinds)
+    store = FixtureStore(replay_dir(name))
+    if via == 'browser':
+        added = record_browser(keywords, store, kinds, min_minutes, max_minutes, scrolls, headless)
+    elif via == 'http':
+        added = record_http(keywords, store, kinds, min_minutes, max_minutes, pages=scrolls + 1)
+    else:
+        raise ValueError(f"unknown record mode: {via}")
+    old_keywords = store.meta.get('keywords') or []
+    store.meta.update({
+        'keywords': old_keywords + [k for k in keywords if k not in old_keywords],
+        'kinds': sorted(set(store.meta.get('kinds') or []) | set(kinds)),
+        'min_minutes': min_minutes,
+        'max_minutes': max_minutes,
+        'via': via,
+        'recorded': time.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+    store.save()
+    print(f"[replay] {added} new responses ({len(store.entries)} total) -> {store.path}")
+    return store
+
+
+# ---------------------------------------------------------------- replay
+
+class ReplayServer:
+    """HTTP server cục bộ phát lại FixtureStore (latency giây / request, bandwidth bytes / giây)."""
+
+    def __init__(self, store: FixtureStore, latency: float = 0.0, bandwidth: Optional[float] = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.store = store
+        self.latency = max(0.0, latency)
+        self.bandwidth = bandwidth if bandwidth and bandwidth > 0 else None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+        self.missed: List[str] = []
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self._saved_env: Dict[str, Optional[str]] = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _rewrite(self, content: bytes, content_type: str) -> bytes:
+        """URL tuyệt đối tới host đã ghi -> <server>/_h/<host> (HTML / JS / JSON)."""
+        if not any(t in content_type for t in _TEXT_TYPES):
+            return content
+        for host in self.store.hosts:
+            target = f"{self.url}/_h/{host}".encode('ascii')
+            content = content.replace(f"https://{host}".encode('ascii'), target)
+            content = content.replace(f"https:\\/\\/{host}".encode('ascii'), target.replace(b'/', b'\\/'))
+        return content
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, fmt, *args):  # tắt log mỗi request
+                pass
+
+            def _serve(self, send_body: bool = True):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else None
+                path, host = self.path, None
+                if path.startswith('/_h/'):
+                    host, _, rest = path[4:].partition('/')
+                    path = '/' + rest
+                entry = server.store.lookup('GET' if self.command == 'HEAD' else self.command, path, body, host)
+                if server.latency:
+                    time.sleep(server.latency)
+                if entry is None:
+                    with server._lock:
+                        server.stats['misses'] += 1
+                        if len(server.missed) < 50:
+                            server.missed.append(f"{self.command} {self.path[:200]}")
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                content = server._rewrite(server.store.read(entry), entry['content_type'])
+                self.send_response(entry['status'])
+                self.send_header('Content-Type', entry['content_type'])
+                self.send_header('Content-Length', str(len(content)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                with server._lock:
+                    server.stats['hits'] += 1
+                    server.stats['bytes'] += len(content) if send_body else 0
+                if send_body:
+                    server._write(self.wfile, content)
+
+            def do_GET(self):
+                self._serve()
+
+            def do_POST(self):
+                self._serve()
+
+            def do_HEAD(self):
+                self._serve(send_body=False)
+
+        return Handler
+
+    def _write(self, wfile, content: bytes):
+        """Ghi body theo khối 16 KB, nghỉ để không vượt bandwidth."""
+        if self.bandwidth is None:
+            wfile.write(content)
+            return
+        start = time.monotonic()
+        for pos in range(0, len(content), _CHUNK):
+            chunk = content[pos:pos + _CHUNK]
+            wfile.write(chunk)
+            ahead = (pos + len(chunk)) / self.bandwidth - (time.monotonic() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        print(f"[replay] Serving {len(self.store.entries)} responses at {self.url} "
+              f"(latency {self.latency * 1000:.0f} ms, "
+              f"{'unlimited' if self.bandwidth is None else f'{self.bandwidth / 1024:.0f} KB/s'})")
+        return self
+
+    def install(self):
+        """Trỏ collector (get_link / yt_http) về server qua biến môi trường base URL."""
+        for env in (yt_http.BASE_URL_ENV, GOOGLE_BASE_URL_ENV):
+            self._saved_env.setdefault(env, os.environ.get(env))
+            os.environ[env] = self.url
+
+    def uninstall(self):
+        for env, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(env, None)
+            else:
+                os.environ[env] = value
+        self._saved_env = {}
+
+    def stop(self):
+        self.uninstall()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'ReplayServer':
+        self.start()
+        self.install()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ---------------------------------------------------------------- bench
+
+class _NoHeadValidator:
+    """Thay SizeValidator khi bench: không gửi HEAD ra mạng, giữ nguyên mọi URL."""
+
+    def keep_valid(self, urls: List[str]) -> List[str]:
+        return list(urls)
+
+
+def run_benchmark(name: str, kinds: Iterable[str] = ('video', 'image'), backend: str = 'http',
+                  image_backend: str = 'dom', workers: int = 1, latency: float = 0.0,
+                  bandwidth: Optional[float] = None, rate: Optional[float] = None,
+                  headless: bool = True, max_per_keyword: int = 2, images_per_keyword: int = 10) -> Dict:
+    """Chạy get_links_main_video / get_links_main_image trên fixture đã ghi, trả về keyword / phút.
+
+    Không dùng cache / journal / registry, không HEAD ảnh (_NoHeadValidator); rate: tốc độ ban đầu
+    của RateLimiter (None = mặc định DEFAULT_RATE, vẫn tự điều chỉnh như khi chạy thật).
+    """
+    store = FixtureStore(replay_dir(name))
+    keywords = store.meta.get('keywords') or []
+    if not keywords:
+        raise ValueError(f"no recorded keywords in {store.path}")
+    workdir = tempfile.mkdtemp(prefix='replay_bench_')
+    project_dir = os.path.join(workdir, name)
+    os.makedirs(project_dir)
+    keywords_file = os.path.join(project_dir, 'list_name.txt')
+    with open(keywords_file, 'w', encoding='utf-8') as f:
+        f.write(''.join(f"{i} {k}\n" for i, k in enumerate(keywords, 1)))
+    old_limiter = set_default_limiter(RateLimiter(rate=rate) if rate else RateLimiter())
+    old_validator = set_default_validator(_NoHeadValidator())
+    results: Dict = {
+        'fixture': name,
+        'keywords': len(keywords),
+        'backend': backend,
+        'image_backend': image_backend,
+        'workers': workers,
+        'latency_ms': round(latency * 1000),
+        'bandwidth_kbps': round(bandwidth / 1024) if bandwidth else None,
+        'rate': rate,
+        'python': sys.version.split()[0],
+        'runs': {},
+    }
+    try:
+        with ReplayServer(store, latency=latency, bandwidth=bandwidth) as server:
+            for kind in kinds:
+                output_txt = os.path.join(project_dir, 'dl_links.txt' if kind == 'video' else 'dl_links_image.txt')
+                before = dict(server.stats)
+                t0 = time.monotonic()
+                common = dict(headless=headless, workers=workers, resume=False, registry=None)
+                if kind == 'video':
+                    get_link.get_links_main_video(
+                        keywords_file, output_txt, max_per_keyword=max_per_keyword,
+                        min_minutes=store.meta.get('min_minutes'), max_minutes=store.meta.get('max_minutes'),
+                        backend=backend, **common,
+                    )
+                else:
+                    get_link.get_links_main_image(
+                        keywords_file, output_txt, images_per_keyword=images_per_keyword,
+                        backend=image_backend, **common,
+                    )
+                elapsed = time.monotonic() - t0
+                groups = get_link.read_link_groups(output_txt)
+                results['runs'][kind] = {
+                    'seconds': round(elapsed, 3),
+                    'keywords_per_minute': round(len(keywords) * 60.0 / elapsed, 2) if elapsed else None,
+                    'links': sum(len(v) for v in groups.values()),
+                    'requests': server.stats['hits'] - before['hits'],
+                    'misses': server.stats['misses'] - before['misses'],
+                    'bytes': server.stats['bytes'] - before['bytes'],
+                }
+            results['missed'] = server.missed[:20]
+        records = load_records([metrics_dir_for(keywords_file)])
+        for kind in results['runs']:
+            results['runs'][kind]['metrics'] = summarize(records, top=5, kind=kind)
+    finally:
+        set_default_limiter(old_limiter)
+        set_default_validator(old_validator)
+        shutil.rmtree(workdir, ignore_errors=True)
+    for kind, run in results['runs'].items():
+        print(f"[replay] {kind}: {results['keywords']} keywords in {run['seconds']:.1f}s -> "
+              f"{run['keywords_per_minute']} keywords/min ({run['links']} links, {run['requests']} requests, "
+              f"{run['misses']} misses)")
+        print(format_summary(run['metrics']))
+    return results
+
+
+def save_results(data: Dict, out_path: Optional[str] = None) -> str:
+    if not out_path:
+        bench_dir = os.path.join(DATA_DIR, 'bench')
+        os.makedirs(bench_dir, exist_ok=True)
+        out_path = os.path.join(bench_dir, f"replay_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print(f"[replay] Saved results -> {out_path}")
+    return out_path
+
+
+def _pop_opt(args: List[str], key: str, default=None):
+    if key in args:
+        i = args.index(key)
+        value = args[i + 1] if i + 1 < len(args) else default
+        del args[i:i + 2]
+        return value
+    return default
+
+
+def _pop_flag(args: List[str], key: str) -> bool:
+    if key in args:
+        args.remove(key)
+        return True
+    return False
+
+
+def _kinds(value: str) -> List[str]:
+    return ['video', 'image'] if value == 'both' else [value]
+
+
+def _int_or_none(value) -> Optional[int]:
+    return int(value) if value not in (None, '') else None
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    command = args.pop(0) if args else ''
+    headless = _pop_flag(args, '--headless')
+    headful = _pop_flag(args, '--headful')  # bench mặc định headless như run_benchmark
+    latency = float(_pop_opt(args, '--latency-ms', 0)) / 1000.0
+    kbps = float(_pop_opt(args, '--kbps', 0))
+    bandwidth = kbps * 1024 if kbps > 0 else None
+    if command == 'record' and len(args) >= 2:
+        via = _pop_opt(args, '--via', 'browser')
+        kinds = _kinds(_pop_opt(args, '--kind', 'both'))
+        min_minutes = _int_or_none(_pop_opt(args, '--min'))
+        max_minutes = _int_or_none(_pop_opt(args, '--max'))
+        scrolls = int(_pop_opt(args, '--scrolls', RECORD_SCROLLS))
+        record(args[0], get_link.read_keywords_from_file(args[1]), via=via, kinds=kinds,
+               min_minutes=min_minutes, max_minutes=max_minutes, scrolls=scrolls, headless=headless)
+    elif command == 'serve' and args:
+        port = int(_pop_opt(args, '--port', 8765))
+        server = ReplayServer(FixtureStore(replay_dir(args[0])), latency=latency, bandwidth=bandwidth, port=port).start()
+        print(f"[replay] set {yt_http.BASE_URL_ENV}={server.url} {GOOGLE_BASE_URL_ENV}={server.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+    elif command == 'bench' and args:
+        kinds = _kinds(_pop_opt(args, '--kind', 'both'))
+        backend = _pop_opt(args, '--backend', 'http')
+        image_backend = _pop_opt(args, '--image-backend', 'dom')
+        workers = int(_pop_opt(args, '--workers', 1))
+        rate = _pop_opt(args, '--rate')
+        out = _pop_opt(args, '--out')
+        data = run_benchmark(args[0], kinds=kinds, backend=backend, image_backend=image_backend, workers=workers,
+                             latency=latency, bandwidth=bandwidth, rate=float(rate) if rate else None,
+                             headless=not headful)
+        save_results(data, out)
+    else:
+        print(__doc__)
+        sys.exit(1)
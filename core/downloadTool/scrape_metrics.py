@@ -0,0 +1,220 @@
+"""scrape_metrics.py
+Số đo từng keyword khi lấy link (JSONL) + lệnh tóm tắt.
+
+Collector (get_link.get_dl_link_video / _devtools / get_dl_link_image / _dom, yt_http) ghi vào
+dict `stats` của keyword:
+  phases:         giây theo pha - rate_wait (chờ lượt rate_limit), navigate, first_result, scroll,
+                  extract, filter, head (HEAD ảnh)
+  scroll_seconds: [giây chờ của từng lần scroll]
+  counters:       candidates (kết quả đã xét), rejected_duration, duplicates, skipped (registry),
+                  rejected_static / rejected_size (ảnh), accepted
+get_link._scrape_keywords đóng gói thành 1 bản ghi / keyword (make_record) và gửi cho
+MetricsSink: `data/<project>/metrics/links_<thời điểm chạy>.jsonl` (1 file / lần chạy).
+Keyword trúng cache không có bản ghi (không scrape).
+
+Tóm tắt (p50 / p90 / p99 theo tổng thời gian và từng pha, keyword chậm nhất):
+    python -m core.downloadTool.scrape_metrics <thư mục metrics | file.jsonl>... [--top N] [--kind video|image]
+"""
+from __future__ import annotations
+
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from time import monotonic
+from typing import Dict, Iterable, List, Optional
+
+METRICS_DIRNAME = 'metrics'
+PHASES = ('rate_wait', 'navigate', 'first_result', 'scroll', 'extract', 'filter', 'head')
+
+
+def add_phase(stats: Optional[Dict], name: str, started: float) -> float:
+    """Cộng thời gian từ `started` (monotonic) vào stats['phases'][name]. Trả về monotonic() hiện tại."""
+    now = monotonic()
+    if stats is not None:
+        phases = stats.setdefault('phases', {})
+        phases[name] = phases.get(name, 0.0) + (now - started)
+    return now
+
+
+def metrics_dir_for(output_txt: str) -> str:
+    """data/<project>/metrics cạnh file link của project."""
+    return os.path.join(os.path.dirname(os.path.abspath(output_txt)), METRICS_DIRNAME)
+
+
+def make_record(keyword: str, kind: str, backend: str, seconds: float, stats: Dict,
+                links: Optional[List[str]], error: Optional[str] = None) -> Dict:
+    """Bản ghi JSONL cho 1 keyword."""
+    record = {
+        'ts': round(time.time(), 3),
+        'keyword': keyword,
+        'kind': kind,
+        'backend': backend,
+        'seconds': round(seconds, 3),
+        'links': len(links or []),
+        'phases': {k: round(v, 3) for k, v in (stats.get('phases') or {}).items()},
+        'scroll_seconds': [round(v, 3) for v in stats.get('scroll_seconds') or []],
+        'counters': dict(stats.get('counters') or {}),
+    }
+    for key in ('bytes', 'duration_filter', 'accept_ratio', 'stagnant_stop'):
+        if stats.get(key) is not None:
+            record[key] = stats[key]
+    if error:
+        record['error'] = error
+    return record
+
+
+class MetricsSink:
+    """Ghi bản ghi keyword vào 1 file JSONL (mở khi có bản ghi đầu tiên, an toàn đa luồng)."""
+
+    def __init__(self, directory: str, prefix: str = 'links'):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+        self._lock = threading.Lock()
+        self._fh = None
+        self.count = 0
+
+    def record(self, record: Dict):
+        with self._lock:
+            try:
+                if self._fh is None:
+                    os.makedirs(self.directory, exist_ok=True)
+                    self._fh = open(self.path, 'a', encoding='utf-8')
+                self._fh.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self._fh.flush()
+                self.count += 1
+            except OSError as e:
+                print(f"[scrape_metrics] WARN: cannot write metrics ({e})")
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+        if self.count:
+            print(f"[scrape_metrics] {self.count} keyword records -> {self.path}")
+
+
+def load_records(paths: Iterable[str]) -> List[Dict]:
+    """Đọc bản ghi từ file .jsonl hoặc mọi *.jsonl trong thư mục (bỏ dòng hỏng)."""
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.jsonl'))))
+        else:
+            files.append(path)
+    records = []
+    for path in files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict) and 'keyword' in entry:
+                        records.append(entry)
+        except OSError as e:
+            print(f"[scrape_metrics] Cannot read {path}: {e}")
+    return records
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Percentile nội suy tuyến tính (p trong 0..100), None nếu rỗng."""
+    if not values:
+        return None
+    data = sorted(values)
+    k = (len(data) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (k - lo)
+
+
+def _dist(values: List[float]) -> Dict:
+    return {
+        'n': len(values),
+        'p50': percentile(values, 50),
+        'p90': percentile(values, 90),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else None,
+    }
+
+
+def summarize(records: List[Dict], top: int = 10, kind: Optional[str] = None) -> Dict:
+    """Phân bố thời gian (tổng / từng pha), tổng counters, keyword chậm nhất."""
+    if kind:
+        records = [r for r in records if r.get('kind') == kind]
+    phase_values: Dict[str, List[float]] = {}
+    counters: Dict[str, int] = {}
+    for r in records:
+        for name, value in (r.get('phases') or {}).items():
+            phase_values.setdefault(name, []).append(float(value))
+        for name, value in (r.get('counters') or {}).items():
+            if isinstance(value, (int, float)):
+                counters[name] = counters.get(name, 0) + value
+    slowest = sorted(records, key=lambda r: r.get('seconds') or 0, reverse=True)[:top]
+    total_seconds = sum(r.get('seconds') or 0 for r in records)
+    return {
+        'keywords': len(records),
+        'errors': sum(1 for r in records if r.get('error')),
+        'total_seconds': round(total_seconds, 3),
+        'keywords_per_minute': round(len(records) * 60.0 / total_seconds, 2) if total_seconds else None,
+        'seconds': _dist([float(r.get('seconds') or 0) for r in records]),
+        'phases': {name: _dist(values) for name, values in phase_values.items()},
+        'counters': counters,
+        'slowest': [
+            {'keyword': r.get('keyword'), 'kind': r.get('kind'), 'seconds': r.get('seconds'),
+             'links': r.get('links'), 'phases': r.get('phases')}
+            for r in slowest
+        ],
+    }
+
+
+def _fmt(v) -> str:
+    return '-' if v is None else f"{v:.2f}"
+
+
+def format_summary(summary: Dict) -> str:
+    lines = [
+        f"Keywords: {summary['keywords']} (errors {summary['errors']}), "
+        f"scrape time {summary['total_seconds']:.1f}s, {summary['keywords_per_minute'] or '-'} keywords/min (per worker)",
+        f"{'':<14}{'n':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}",
+    ]
+    rows = [('total', summary['seconds'])]
+    rows += [(name, summary['phases'][name]) for name in PHASES if name in summary['phases']]
+    rows += [(name, d) for name, d in sorted(summary['phases'].items()) if name not in PHASES]
+    for name, d in rows:
+        lines.append(f"{name:<14}{d['n']:>6}{_fmt(d['p50']):>9}{_fmt(d['p90']):>9}{_fmt(d['p99']):>9}{_fmt(d['max']):>9}")
+    if summary['counters']:
+        lines.append('Counters: ' + ', '.join(f"{k}={v}" for k, v in sorted(summary['counters'].items())))
+    if summary['slowest']:
+        lines.append('Slowest keywords:')
+        for r in summary['slowest']:
+            phases = ', '.join(f"{k} {v:.1f}s" for k, v in sorted((r.get('phases') or {}).items(), key=lambda kv: -kv[1])[:3])
+            lines.append(f"  {_fmt(r['seconds']):>7}s  [{r['kind']}] {r['keyword']} -> {r['links']} links ({phases})")
+    return '\n'.join(lines)
+
+
+def _pop_opt(args: List[str], key: str, default=None):
+    if key in args:
+        i = args.index(key)
+        value = args[i + 1] if i + 1 < len(args) else default
+        del args[i:i + 2]
+        return value
+    return default
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    top = int(_pop_opt(args, '--top', 10))
+    kind = _pop_opt(args, '--kind')
+    if not args:
+        print('Usage: python -m core.downloadTool.scrape_metrics <metrics dir | file.jsonl>... [--top N] [--kind video|image]')
+        sys.exit(1)
+    records = load_records(args)
+    if not records:
+        print('[scrape_metrics] No records found.')
+        sys.exit(1)
+    print(format_summary(summarize(records, top=top, kind=kind)))
@@ -0,0 +1,100 @@
+"""yt_devtools.py
+Đọc kết quả tìm kiếm YouTube từ dữ liệu JSON mà chính trang Chrome nhận được (backend 'devtools').
+
+Thay cho việc đọc node `ytd-video-renderer` đã render:
+  - Trang đầu: `window.ytInitialData` (1 lần execute_script, không query từng phần tử).
+  - Trang sau: scroll chỉ để trang tự gọi continuation `/youtubei/v1/search`; response JSON
+    được lấy qua performance log (Network.responseReceived / loadingFinished) +
+    CDP `Network.getResponseBody`.
+videoId + thời lượng (lengthText) parse bằng yt_http.parse_results nên không phụ thuộc markup
+badge thời lượng; lọc dùng chung yt_results.filter_results.
+
+Cần driver bật performance log (get_link.init_driver(track_bytes=True)).
+"""
+from __future__ import annotations
+
+import base64
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .yt_http import parse_results  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.downloadTool.yt_http import parse_results  # type: ignore
+
+SEARCH_API_PATH = '/youtubei/v1/search'
+_INITIAL_DATA_JS = "return window.ytInitialData ? JSON.stringify(window.ytInitialData) : null;"
+
+
+def initial_results(driver) -> Optional[Tuple[List[Dict], Optional[str]]]:
+    """(items, continuation token) từ ytInitialData của trang hiện tại, None nếu chưa có."""
+    try:
+        raw = driver.execute_script(_INITIAL_DATA_JS)
+    except Exception:
+        return None
+    if not raw:
+        return None
+    try:
+        return parse_results(json.loads(raw))
+    except ValueError:
+        return None
+
+
+class NetworkLog:
+    """Đọc performance log: cộng byte đã tải và giữ requestId các response search API đã xong.
+
+    get_log('performance') xoá log sau mỗi lần đọc nên mọi đọc log trong 1 keyword đi qua đây
+    (bytes thay cho get_link.page_bytes).
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.bytes = 0
+        self._search_ids = set()
+        self._finished: List[str] = []
+
+    def drain(self) -> bool:
+        """Đọc log mới. False nếu driver không có performance log."""
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            return False
+        for entry in entries:
+            try:
+                msg = json.loads(entry['message'])['message']
+            except Exception:
+                continue
+            method = msg.get('method')
+            params = msg.get('params') or {}
+            if method == 'Network.responseReceived':
+                url = (params.get('response') or {}).get('url') or ''
+                if SEARCH_API_PATH in url:
+                    self._search_ids.add(params.get('requestId'))
+            elif method == 'Network.loadingFinished':
+                self.bytes += int(params.get('encodedDataLength') or 0)
+                request_id = params.get('requestId')
+                if request_id in self._search_ids:
+                    self._search_ids.discard(request_id)
+                    self._finished.append(request_id)
+        return True
+
+    def search_responses(self) -> List[Dict]:
+        """JSON các response search API đã tải xong từ lần gọi trước (theo thứ tự)."""
+        self.drain()
+        out = []
+        finished, self._finished = self._finished, []
+        for request_id in finished:
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                text = body.get('body') or ''
+                if body.get('base64Encoded'):
+                    text = base64.b64decode(text).decode('utf-8', 'replace')
+                out.append(json.loads(text))
+            except Exception as e:
+                print(f"[yt_devtools] Cannot read search response {request_id}: {e}")
+        return out
@@ -0,0 +1,297 @@
+"""yt_http.py
+Backend lấy link video YouTube không cần trình duyệt (HTTP thuần).
+
+- Tải trang kết quả tìm kiếm bằng requests.Session (connection pool, keep-alive).
+- Đọc JSON nhúng `ytInitialData` để lấy videoId + thời lượng (lengthText) của từng
+  videoRenderer, thay cho việc render trang trong Chrome.
+- Thay vì scroll: gọi endpoint continuation `/youtubei/v1/search` với token
+  (continuationItemRenderer) và cấu hình INNERTUBE lấy từ `ytcfg.set({...})` của trang đầu.
+- Lọc min/max thời lượng, bỏ trùng và giới hạn max_results dùng chung yt_results.filter_results
+  nên cho cùng kết quả như get_link.get_dl_link_video.
+- Nhịp request do rate_limit quyết định (token bucket theo host, dùng chung với backend browser).
+
+Base URL cấu hình được (tham số base_url hoặc biến môi trường AUTOTOOL_YOUTUBE_BASE_URL) để
+chạy với server fixture cục bộ phục vụ các trang kết quả đã lưu.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+except ImportError:  # requests là tuỳ chọn với backend browser
+    requests = None
+    HTTPAdapter = None
+
+try:
+    from .yt_results import YOUTUBE_BASE_URL, FALLBACK_VIDEO_LINK, filter_results, search_params  # type: ignore
+    from .rate_limit import default_limiter, detect_block_http, host_of  # type: ignore
+    from .scrape_metrics import add_phase  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.downloadTool.yt_results import YOUTUBE_BASE_URL, FALLBACK_VIDEO_LINK, filter_results, search_params  # type: ignore
+    from core.downloadTool.rate_limit import default_limiter, detect_block_http, host_of  # type: ignore
+    from core.downloadTool.scrape_metrics import add_phase  # type: ignore
+
+BASE_URL_ENV = 'AUTOTOOL_YOUTUBE_BASE_URL'
+# Trang đầu + 6 continuation, tương đương num_scroll=6 của backend browser
+MAX_PAGES = 7
+REQUEST_TIMEOUT = 15
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36'
+    ),
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+# Bỏ qua trang đồng ý cookie (EU)
+_CONSENT_COOKIES = {'CONSENT': 'YES+cb', 'SOCS': 'CAI'}
+_INITIAL_DATA_MARKERS = ('var ytInitialData = ', 'window["ytInitialData"] = ', 'ytInitialData = ')
+_YTCFG_RE = re.compile(r'ytcfg\.set\(\s*(\{)')
+
+
+def base_url(override: Optional[str] = None) -> str:
+    return (override or os.environ.get(BASE_URL_ENV) or YOUTUBE_BASE_URL).rstrip('/')
+
+
+def new_session(pool_size: int = 8):
+    """Session có connection pool + header/cookie mặc định."""
+    if requests is None:
+        raise RuntimeError("requests is not installed (required for backend='http')")
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    for name, value in _CONSENT_COOKIES.items():
+        session.cookies.set(name, value)
+    return session
+
+
+def _send(session, method: str, url: str, limiter=None, **kwargs):
+    """Request qua rate_limit của host: chờ lượt, báo latency / lỗi kết nối / trang chặn (429, consent).
+
+    Mã lỗi HTTP khác (404, 5xx...) không tính là bị chặn nên không làm chậm host.
+    """
+    limiter = limiter or default_limiter()
+    host = host_of(url)
+    limiter.acquire(host)
+    t0 = monotonic()
+    try:
+        resp = getattr(session, method)(url, **kwargs)
+    except Exception:
+        limiter.report(host, ok=False)
+        raise
+    blocked = detect_block_http(resp)
+    if blocked:
+        print(f"[yt_http] WARNING: {blocked} response from {host} -> slow down.")
+    limiter.report(host, latency=monotonic() - t0, blocked=bool(blocked))
+    return resp
+
+
+def _decode_object_at(text: str, start: int) -> Optional[Dict]:
+    try:
+        obj, _ = json.JSONDecoder().raw_decode(text, start)
+    except ValueError:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def extract_initial_data(html: str) -> Optional[Dict]:
+    """JSON `ytInitialData` nhúng trong trang kết quả."""
+    for marker in _INITIAL_DATA_MARKERS:
+        pos = html.find(marker)
+        if pos >= 0:
+            brace = html.find('{', pos + len(marker))
+            if brace >= 0:
+                data = _decode_object_at(html, brace)
+                if data is not None:
+                    return data
+    return None
+
+
+def extract_ytcfg(html: str) -> Dict:
+    """Gộp các `ytcfg.set({...})` (INNERTUBE_API_KEY, INNERTUBE_CONTEXT, ...)."""
+    cfg: Dict = {}
+    for m in _YTCFG_RE.finditer(html):
+        obj = _decode_object_at(html, m.start(1))
+        if obj:
+            cfg.update(obj)
+    return cfg
+
+
+def _text_of(node) -> str:
+    if not isinstance(node, dict):
+        return ''
+    if 'simpleText' in node:
+        return str(node['simpleText'])
+    return ''.join(str(r.get('text', '')) for r in node.get('runs', []) if isinstance(r, dict))
+
+
+def _video_item(renderer: Dict) -> Optional[Dict]:
+    video_id = renderer.get('videoId')
+    if not video_id:
+        return None
+    length = renderer.get('lengthText') or {}
+    aria = ((length.get('accessibility') or {}).get('accessibilityData') or {}).get('label', '')
+    return {
+        'href': f"/watch?v={video_id}",
+        'video_id': video_id,
+        'duration_text': _text_of(length),
+        'aria_duration': aria,
+    }
+
+
+def parse_results(data) -> Tuple[List[Dict], Optional[str]]:
+    """(items theo thứ tự xuất hiện, continuation token) từ ytInitialData hoặc response continuation."""
+    items: List[Dict] = []
+    token = None
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            vr = node.get('videoRenderer')
+            if isinstance(vr, dict):
+                item = _video_item(vr)
+                if item:
+                    items.append(item)
+                continue
+            cir = node.get('continuationItemRenderer')
+            if isinstance(cir, dict):
+                cmd = (cir.get('continuationEndpoint') or {}).get('continuationCommand') or {}
+                if cmd.get('token'):
+                    token = cmd['token']
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return items, token
+
+
+def search_page(
+    session,
+    keyword: str,
+    url_base: Optional[str] = None,
+    timeout: float = REQUEST_TIMEOUT,
+    min_minutes: Optional[int] = None,
+    max_minutes: Optional[int] = None,
+    limiter=None,
+):
+    """Trang kết quả đầu tiên: (items, continuation token, ytcfg).
+
+    min/max phút -> bộ lọc thời lượng của YouTube (yt_results.search_params) khi khớp 1 nhóm;
+    continuation token giữ nguyên bộ lọc cho các trang sau.
+    limiter: rate_limit.RateLimiter (mặc định default_limiter()), như continuation_page.
+    """
+    resp = _send(
+        session,
+        'get',
+        f"{base_url(url_base)}/results",
+        limiter,
+        params=search_params(keyword, min_minutes, max_minutes),
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    html = resp.text
+    data = extract_initial_data(html)
+    if data is None:
+        raise ValueError("ytInitialData not found in results page")
+    items, token = parse_results(data)
+    return items, token, extract_ytcfg(html)
+
+
+def continuation_page(session, token: str, ytcfg: Dict, url_base: Optional[str] = None, timeout: float = REQUEST_TIMEOUT, limiter=None):
+    """Trang tiếp theo qua continuation token: (items, token kế tiếp)."""
+    context = ytcfg.get('INNERTUBE_CONTEXT') or {
+        'client': {
+            'clientName': 'WEB',
+            'clientVersion': ytcfg.get('INNERTUBE_CLIENT_VERSION') or '2.20240101.00.00',
+            'hl': 'en',
+        }
+    }
+    params = {'prettyPrint': 'false'}
+    if ytcfg.get('INNERTUBE_API_KEY'):
+        params['key'] = ytcfg['INNERTUBE_API_KEY']
+    resp = _send(
+        session,
+        'post',
+        f"{base_url(url_base)}/youtubei/v1/search",
+        limiter,
+        params=params,
+        json={'context': context, 'continuation': token},
+        timeout=timeout,
+    )
+    resp.raise_for_status()
+    return parse_results(resp.json())
+
+
+def get_dl_link_video_http(
+    keyword: str,
+    max_results: int,
+    max_minutes: Optional[int] = None,
+    min_minutes: Optional[int] = None,
+    max_pages: int = MAX_PAGES,
+    session=None,
+    url_base: Optional[str] = None,
+    skip=None,
+    limiter=None,
+    stats: Optional[Dict] = None,
+) -> List[str]:
+    """Giống get_link.get_dl_link_video nhưng qua HTTP (không cần driver). skip: như filter_results.
+
+    Mọi request đi qua rate_limit (limiter, mặc định default_limiter()) nên không cần nghỉ cố định.
+    stats (dict, tuỳ chọn): phases (navigate = trang đầu gồm parse, scroll = continuation),
+    scroll_seconds, counters, examined / accepted (scrape_metrics).
+    """
+    stats = stats if stats is not None else {}
+    own_session = session is None
+    session = session or new_session()
+    want = max_results
+    links: List[str] = []
+    processed_ids = set()
+    max_seconds = max_minutes * 60 if max_minutes else None
+    min_seconds = min_minutes * 60 if min_minutes else None
+    pages = 0
+    examined = 0
+    scroll_seconds: List[float] = []
+    counters: Dict = {}
+    try:
+        print(f"[yt_http] Search: '{keyword}'")
+        t_step = monotonic()
+        items, token, ytcfg = search_page(session, keyword, url_base, min_minutes=min_minutes, max_minutes=max_minutes, limiter=limiter)
+        add_phase(stats, 'navigate', t_step)
+        while True:
+            pages += 1
+            t_step = monotonic()
+            examined += filter_results(items, links, processed_ids, want, min_seconds, max_seconds, skip, counters)
+            add_phase(stats, 'filter', t_step)
+            if len(links) >= want or not token or pages >= max_pages:
+                break
+            t_step = monotonic()
+            try:
+                items, token = continuation_page(session, token, ytcfg, url_base, limiter=limiter)
+            except Exception as e:
+                print(f"[yt_http] Continuation error (stop paging): {e}")
+                break
+            finally:
+                scroll_seconds.append(add_phase(stats, 'scroll', t_step) - t_step)
+    finally:
+        if own_session:
+            session.close()
+    if len(links) < want:
+        print(f"[yt_http] Reached page limit ({pages}/{max_pages}) with only {len(links)}/{want} links.")
+    print(f"[yt_http] Keyword '{keyword}' -> {len(links)} links (filtered, accepted {len(links)}/{examined}, {pages} pages)")
+    stats.update({'scroll_seconds': scroll_seconds, 'scrolls': pages - 1 if pages else 0, 'counters': counters,
+                  'examined': examined, 'accepted': len(links)})
+    if not links:
+        # fallback 1 link mặc định để tránh rỗng hoàn toàn (giống backend browser)
+        links.append(FALLBACK_VIDEO_LINK)
+    return links
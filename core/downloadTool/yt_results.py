@@ -0,0 +1,179 @@
+"""yt_results.py
+Xử lý kết quả tìm kiếm YouTube dùng chung cho backend Selenium (get_link) và HTTP (yt_http).
+
+Mỗi kết quả là dict {href, video_id, duration_text, aria_duration}; filter_results áp dụng
+cùng quy tắc cho cả hai backend: bỏ trùng link / video id, lọc min/max thời lượng (bỏ
+kết quả không đọc được thời lượng khi có lọc), dừng khi đủ max_results.
+
+search_url thêm bộ lọc thời lượng sẵn có của YouTube (tham số `sp`: dưới 4 phút, 4-20 phút,
+trên 20 phút) khi khoảng min/max nằm gọn trong 1 nhóm, để trang đầu đã gần như toàn kết quả
+hợp lệ; filter_results vẫn kiểm tra chính xác min/max sau đó.
+
+Module không phụ thuộc selenium / requests.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from urllib.parse import quote_plus, unquote
+
+YOUTUBE_BASE_URL = 'https://www.youtube.com'
+# Link mặc định khi keyword không có kết quả nào (tránh nhóm rỗng hoàn toàn)
+FALLBACK_VIDEO_LINK = 'https://www.youtube.com/watch?v=WqQUvfsavO4'
+# Bộ lọc thời lượng của trang tìm kiếm YouTube (giá trị `sp` đã URL-encode)
+SP_UNDER_4_MIN = 'EgIYAQ%3D%3D'
+SP_4_TO_20_MIN = 'EgIYAw%3D%3D'
+SP_OVER_20_MIN = 'EgIYAg%3D%3D'
+
+
+def duration_filter_param(min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> Optional[str]:
+    """Giá trị `sp` (URL-encoded) nếu [min, max] nằm trọn trong 1 nhóm thời lượng của YouTube, ngược lại None.
+
+    Nhóm: < 4 phút, 4-20 phút, > 20 phút (2 nhóm ngoài là khoảng mở, nhóm giữa gồm cả 4:00 và
+    20:00). filter_results lọc [min, max] gồm cả 2 đầu, nên max=4 / min=20 không dùng nhóm ngoài
+    (sẽ mất video dài đúng 4:00 / 20:00). Khoảng trải qua nhiều nhóm (vd. chỉ max=20) không lọc
+    phía server để không mất kết quả hợp lệ.
+    """
+    lo = min_minutes or 0
+    hi = max_minutes if max_minutes else None
+    if hi is not None and hi < 4:
+        return SP_UNDER_4_MIN
+    if lo >= 4 and hi is not None and hi <= 20:
+        return SP_4_TO_20_MIN
+    if lo > 20:
+        return SP_OVER_20_MIN
+    return None
+
+
+def search_params(keyword: str, min_minutes: Optional[int] = None, max_minutes: Optional[int] = None) -> Dict[str, str]:
+    """Query của trang /results (giá trị chưa encode, cho requests)."""
+    params = {'search_query': keyword}
+    sp = duration_filter_param(min_minutes, max_minutes)
+    if sp:
+        params['sp'] = unquote(sp)
+    return params
+
+
+def search_url(keyword: str, min_minutes: Optional[int] = None, max_minutes: Optional[int] = None, base: str = YOUTUBE_BASE_URL) -> str:
+    url = f"{base}/results?search_query={quote_plus(keyword)}"
+    sp = duration_filter_param(min_minutes, max_minutes)
+    if sp:
+        url += f"&sp={sp}"
+    return url
+
+
+def clean_href(href: str) -> str:
+    if not href:
+        return ''
+    if href.startswith('/watch'):  # relative path case
+        href = YOUTUBE_BASE_URL + href
+    # remove typical noise params
+    cut_tokens = ['&pp=ygU', '&start_radio=1', '&list=']
+    for token in cut_tokens:
+        if token in href:
+            href = href.split(token)[0]
+    return href
+
+
+def parse_duration_to_seconds(txt: str) -> Optional[int]:
+    if not txt:
+        return None
+    t = txt.strip().upper()
+    if any(b in t for b in ['LIVE', 'TRỰC TIẾP', 'PREMIERE', 'UPCOMING']):
+        return None
+    parts = t.split(':')
+    if not all(p.isdigit() for p in parts):
+        return None
+    if len(parts) == 2:
+        m, s = parts
+        return int(m)*60 + int(s)
+    if len(parts) == 3:
+        h, m, s = parts
+        return int(h)*3600 + int(m)*60 + int(s)
+    return None
+
+
+def parse_aria_duration(label: str) -> Optional[int]:
+    """Parse aria-label like '1 hour, 56 minutes, 30 seconds' -> seconds."""
+    if not label:
+        return None
+    text = label.lower()
+    # quick reject for live-like labels
+    if any(k in text for k in ['live', 'premiere', 'upcoming']):
+        return None
+    h = m = s = 0
+    mh = re.search(r'(\d+)\s*hour', text)
+    mm = re.search(r'(\d+)\s*minute', text)
+    ms = re.search(r'(\d+)\s*second', text)
+    if mh:
+        h = int(mh.group(1))
+    if mm:
+        m = int(mm.group(1))
+    if ms:
+        s = int(ms.group(1))
+    total = h*3600 + m*60 + s
+    return total if total > 0 else None
+
+
+def item_duration_seconds(item: Dict) -> Optional[int]:
+    dur = parse_duration_to_seconds(item.get('duration_text') or '')
+    if dur is None:
+        dur = parse_aria_duration(item.get('aria_duration') or '')
+    return dur
+
+
+def filter_results(
+    items: Iterable[Dict],
+    links: List[str],
+    processed_ids: Set[str],
+    want: int,
+    min_seconds: Optional[int] = None,
+    max_seconds: Optional[int] = None,
+    skip: Optional[Callable[[str], bool]] = None,
+    counters: Optional[Dict] = None,
+) -> int:
+    """Thêm vào `links` các kết quả hợp lệ trong `items` cho tới khi đủ `want` (sửa tại chỗ).
+
+    skip(href) -> True: bỏ kết quả đã dùng ở project khác (link_registry.LinkRegistry.skipper),
+    chỉ gọi cho kết quả đã qua lọc thời lượng.
+    counters (dict, tuỳ chọn) được cộng dồn: candidates, duplicates, rejected_duration, skipped,
+    accepted (scrape_metrics).
+    Trả về số kết quả đã xét (để tính tỉ lệ nhận = số link thêm / số đã xét).
+    """
+    counters = counters if counters is not None else {}
+    for key in ('candidates', 'duplicates', 'rejected_duration', 'skipped', 'accepted'):
+        counters.setdefault(key, 0)
+    examined = 0
+    for item in items:
+        if len(links) >= want:
+            break
+        examined += 1
+        counters['candidates'] += 1
+        href = clean_href(item.get('href') or '')
+        if not href:
+            continue
+        if href in links:
+            counters['duplicates'] += 1
+            continue
+        # video id to avoid re-processing
+        vid_id = item.get('video_id')
+        if not vid_id and 'watch?v=' in href:
+            vid_id = href.split('watch?v=')[-1].split('&')[0]
+        if vid_id and vid_id in processed_ids:
+            counters['duplicates'] += 1
+            continue
+        if vid_id:
+            processed_ids.add(vid_id)
+        if max_seconds is not None or min_seconds is not None:
+            dur_seconds = item_duration_seconds(item)
+            if (dur_seconds is None
+                    or (max_seconds is not None and dur_seconds > max_seconds)
+                    or (min_seconds is not None and dur_seconds < min_seconds)):
+                counters['rejected_duration'] += 1
+                continue
+        if skip is not None and skip(href):
+            counters['skipped'] += 1
+            continue
+        links.append(href)
+        counters['accepted'] += 1
+    return examined
@@ -12,6 +12,22 @@ def copy_paste(path):
     send_keys('^v')
 
 
+def export_timeline_native(project_path, data_folder):
+    """Xuất timeline_export.csv/.json từ file .prproj bằng Python (timeline_export) vào data_folder
+    trước khi mở Premiere. True nếu đã có CSV -> ghi timeline_source=python vào path.txt để
+    runAll.jsx bỏ qua getTimeline.jsx; False -> runAll.jsx chạy getTimeline.jsx như cũ."""
+    try:
+        try:
+            from .timeline_export import export_timeline  # type: ignore
+        except ImportError:
+            from core.premierCore.timeline_export import export_timeline  # type: ignore
+        res = export_timeline(project_path, out_dir=data_folder)
+    except Exception as e:
+        print(f"[control] Native timeline export failed ({e}) -> fallback getTimeline.jsx")
+        return False
+    return bool(res.get('csv'))
+
+
 #hàm này thực hiện mở vscode và chạy file runAll.jsx tự động
 def run_premier_script(premier_path, project_path, idx):
     os.system('taskkill /IM "Adobe Premiere Pro.exe" /F')
@@ -288,6 +288,16 @@ function runGetTimelineExport(cfg, projectName) {
         log('Cảnh báo: cfg không hợp lệ để kiểm tra/thiết lập data_folder trong path.txt');
     }
 
+    // Python (control.export_timeline_native) đã xuất CSV từ .prproj -> không cần getTimeline.jsx
+    if (cfg && cfg['timeline_source'] === 'python') {
+        var nativeCsv = normalizePath(joinPath(joinPath(DATA_DIR, projectName), 'timeline_export.csv'));
+        if (fileExists(nativeCsv)) {
+            $.writeln('[runAll] Using timeline exported by Python: ' + nativeCsv);
+            return true;
+        }
+        log('timeline_source=python nhưng thiếu ' + nativeCsv + ' -> chạy getTimeline.jsx');
+    }
+
     // Run getTimeline.jsx to export timeline to data/timeline_export.csv
 
     var p = joinPath(joinPath(ROOT_DIR, 'core'), 'premierCore');
@@ -0,0 +1,356 @@
+"""timeline_export.py
+Xuất timeline (clip start/end) trực tiếp từ file .prproj, không cần mở Premiere.
+
+Tương đương phần export của `getTimeline.jsx` (runQuickTimelineTest) nhưng đọc XML đã gzip
+của project bằng parser streaming trong `core.downloadTool.get_name_list`, nên chạy được
+trên Linux và mất dưới 1 giây với project thông thường.
+
+File ghi vào `data/<project>/` (xem core.project_data):
+  - timeline_export.csv / timeline_export.json
+      Cùng layout với getTimeline.jsx cho 1 track: Sequence được chọn (mặc định Sequence
+      đầu tiên) và video track trên cùng có clip (như findFirstNonEmptyVideoTrackIndex).
+        CSV : indexInTrack,name,startSeconds,endSeconds,durationSeconds,mediaPath,textContent
+        JSON: {"trackIndex": n, "clips": [...]}
+  - timeline_export_all.csv / timeline_export_all.json
+      Mọi Sequence và mọi video track; CSV thêm cột sequenceIndex,sequenceName,trackIndex ở đầu.
+
+Cấu trúc XML được hỗ trợ giống get_name_list: Sequence > ... > Video > Track > ClipItem lồng
+trực tiếp, hoặc nối qua ObjectRef/ObjectURef (Sequence -> VideoTrackGroup -> VideoClipTrack ->
+ClipItem). Timing lấy như get_name_list (Start/End hoặc InPoint/OutPoint theo frame, đổi ra
+giây bằng Rate/Timebase của Sequence chứa track).
+
+CLI:
+    python -m core.premierCore.timeline_export <file.prproj> [project_name] [--sequence NAME|INDEX]
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Union
+
+try:
+    from ..downloadTool.get_name_list import (  # type: ignore
+        _iter_prproj_events, _start_end_from_texts, _parse_timebase, _object_key, _ref_key,
+        _DEFAULT_TIMEBASE, _TIMING_TAGS,
+    )
+    from ..project_data import project_subdir, project_slug_from_path  # type: ignore
+except ImportError:
+    ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    from core.downloadTool.get_name_list import (  # type: ignore
+        _iter_prproj_events, _start_end_from_texts, _parse_timebase, _object_key, _ref_key,
+        _DEFAULT_TIMEBASE, _TIMING_TAGS,
+    )
+    from core.project_data import project_subdir, project_slug_from_path  # type: ignore
+
+CSV_HEADER = 'indexInTrack,name,startSeconds,endSeconds,durationSeconds,mediaPath,textContent'
+_MEDIA_PATH_TAGS = ('PathUrl', 'pathurl', 'ActualMediaFilePath', 'FilePath')
+_VIDEO_TAGS = ('Video', 'VideoTrackGroup')
+_AUDIO_TAGS = ('Audio', 'AudioTrackGroup', 'AudioClipTrack')
+_TRACK_TAGS = ('VideoClipTrack',)
+_CLIP_TAGS = ('ClipItem',)
+
+
+class _TimelineCollector:
+    """Gom Sequence -> video Track -> ClipItem trong một lượt duyệt streaming.
+
+    Track/ClipItem lồng trực tiếp được gán ngay theo stack tổ tiên. Với layout dùng
+    ObjectRef/ObjectURef (Sequence -> TrackGroup -> Track -> ClipItem nằm rời nhau),
+    cùng index object như get_name_list._InstanceCollector được dựng trong lúc duyệt
+    và việc gán được làm sau khi duyệt xong.
+    """
+
+    def __init__(self):
+        self.sequences: List[Dict] = []
+        self._tracks: List[Dict] = []
+        self._clips: List[Dict] = []
+        # [(tag, ctx, owner_object, track_ctx, seq_ctx, in_video)] các phần tử đang mở
+        self._stack = []
+        self._by_obj: Dict = {}      # object key -> ctx Sequence/Track
+        self._obj_parent: Dict = {}  # object -> object lồng trực tiếp bên ngoài
+        self._ref_owner: Dict = {}   # object được tham chiếu -> object chứa ObjectRef
+        self._ref_order: Dict = {}   # object được tham chiếu -> thứ tự xuất hiện tham chiếu
+        self._obj_timebase: Dict = {}  # object cài đặt (ngoài Sequence) -> text Timebase
+        self._order = 0
+
+    def _next_order(self) -> int:
+        self._order += 1
+        return self._order
+
+    def start(self, elem):
+        if self._stack:
+            _, _, parent_obj, track, seq, in_video = self._stack[-1]
+        else:
+            parent_obj = track = seq = None
+            in_video = None
+        tag = elem.tag
+        attrib = elem.attrib
+        obj = _object_key(attrib) if attrib else None
+        ref = _ref_key(attrib) if attrib else None
+        ctx = None
+        if tag in _VIDEO_TAGS:
+            in_video = True
+        elif tag in _AUDIO_TAGS:
+            in_video = False
+        if tag == 'Sequence' and ref is None:
+            ctx = {'name': '', 'timebase_text': None, 'timebase_found': False, 'obj': obj}
+            self.sequences.append(ctx)
+            seq, track = ctx, None
+        elif ref is None and (tag in _TRACK_TAGS or (tag == 'Track' and in_video)):
+            ctx = {'seq': seq, 'obj': obj, 'order': self._next_order(), 'clips': []}
+            self._tracks.append(ctx)
+            track = ctx
+        elif tag in _CLIP_TAGS and ref is None:
+            ctx = {'timing': {}, 'name': '', 'mediaPath': '', 'textContent': '',
+                   'track': track, 'obj': obj, 'owner': parent_obj}
+            self._clips.append(ctx)
+        if obj is not None:
+            if parent_obj is not None:
+                self._obj_parent.setdefault(obj, parent_obj)
+            if ctx is not None and tag not in _CLIP_TAGS:
+                self._by_obj[obj] = ctx
+            owner = obj
+        else:
+            owner = parent_obj
+        if ref is not None and owner is not None and ref != owner:
+            self._ref_owner.setdefault(ref, owner)
+            self._ref_order.setdefault(ref, self._next_order())
+        self._stack.append((tag, ctx, owner, track, seq, in_video))
+
+    def end(self, elem):
+        tag = self._stack.pop()[0]
+        parent_tag, parent_ctx = self._stack[-1][:2] if self._stack else (None, None)
+        text = elem.text
+        if tag == 'Name' and parent_ctx is not None and ('name' in parent_ctx):
+            if not parent_ctx['name'] and text:
+                parent_ctx['name'] = text.strip()
+        elif tag in _TIMING_TAGS and parent_ctx is not None and 'timing' in parent_ctx:
+            parent_ctx['timing'].setdefault(tag, text)
+        elif tag == 'Timebase' and parent_tag == 'Rate':
+            _, _, owner, _, seq, _ = self._stack[-1]
+            if seq is not None:
+                if not seq['timebase_found']:
+                    seq['timebase_found'] = True
+                    seq['timebase_text'] = text
+            elif owner is not None:
+                # object cài đặt được Sequence tham chiếu qua ObjectRef
+                self._obj_timebase.setdefault(owner, text)
+        elif tag in _MEDIA_PATH_TAGS and text:
+            clip = self._nearest_clip()
+            if clip is not None and not clip['mediaPath']:
+                clip['mediaPath'] = text.strip()
+        elif tag == 'InstanceName' and text and parent_tag == 'Component':
+            clip = self._nearest_clip()
+            if clip is not None and not clip['textContent'] and len(self._stack) >= 2 \
+                    and self._stack[-2][0] == 'VideoFilterComponent':
+                clip['textContent'] = text.strip()
+        # Giải phóng subtree đã xử lý xong (giống get_name_list streaming)
+        elem.clear()
+
+    def _nearest_clip(self):
+        for frame in reversed(self._stack):
+            ctx = frame[1]
+            if ctx is not None and 'timing' in ctx:
+                return ctx
+        return None
+
+    def _resolve(self, node, want: str):
+        """Ctx Track/Sequence gần nhất chứa object `node` qua chuỗi ObjectRef/lồng nhau."""
+        seen = set()
+        while node is not None and node not in seen:
+            seen.add(node)
+            ctx = self._by_obj.get(node)
+            if ctx is not None:
+                is_seq = 'timebase_text' in ctx
+                if want == 'seq' and is_seq:
+                    return ctx
+                if want == 'track' and not is_seq:
+                    return ctx
+                if want == 'seq' and not is_seq and ctx['seq'] is not None:
+                    return ctx['seq']
+            node = self._ref_owner.get(node) or self._obj_parent.get(node)
+        return None
+
+    def _track_order(self, track: Dict) -> int:
+        # Track được tham chiếu: thứ tự tham chiếu trong TrackGroup; lồng trực tiếp: thứ tự tài liệu
+        if track['obj'] is not None and track['obj'] in self._ref_order:
+            return self._ref_order[track['obj']]
+        return track['order']
+
+    def result(self) -> List[Dict]:
+        for obj, text in self._obj_timebase.items():
+            seq = self._resolve(obj, 'seq')
+            if seq is not None and not seq['timebase_found']:
+                seq['timebase_found'] = True
+                seq['timebase_text'] = text
+        for track in self._tracks:
+            if track['seq'] is None and track['obj'] is not None:
+                track['seq'] = self._resolve(self._ref_owner.get(track['obj']) or self._obj_parent.get(track['obj']), 'seq')
+        for clip in self._clips:
+            track = clip['track']
+            if track is None:
+                node = clip['obj'] if clip['obj'] is not None else clip['owner']
+                track = self._resolve(node, 'track')
+            if track is not None:
+                track['clips'].append(clip)
+        out = []
+        for s_idx, seq in enumerate(self.sequences):
+            timebase = _parse_timebase(seq['timebase_text']) or _DEFAULT_TIMEBASE
+            seq_tracks = sorted((t for t in self._tracks if t['seq'] is seq), key=self._track_order)
+            tracks = []
+            for t_idx, track in enumerate(seq_tracks):
+                clips = []
+                for clip in track['clips']:
+                    start, end = _start_end_from_texts(clip['timing'])
+                    if start is None or end is None or end < start:
+                        continue
+                    start_s = round(start / timebase, 4)
+                    end_s = round(end / timebase, 4)
+                    clips.append({
+                        'indexInTrack': None,
+                        'name': clip['name'],
+                        'startSeconds': start_s,
+                        'endSeconds': end_s,
+                        'durationSeconds': round(end_s - start_s, 4),
+                        'mediaPath': clip['mediaPath'],
+                        'textContent': clip['textContent'],
+                    })
+                # Sắp xếp theo startSeconds như getTrackClipRanges rồi mới đánh indexInTrack
+                clips.sort(key=lambda c: c['startSeconds'])
+                for c_idx, clip in enumerate(clips):
+                    clip['indexInTrack'] = c_idx
+                tracks.append({'trackIndex': t_idx, 'clips': clips})
+            out.append({'index': s_idx, 'name': seq['name'], 'timebase': timebase, 'tracks': tracks})
+        return out
+
+
+def read_timeline(project_path: str) -> List[Dict]:
+    """Đọc mọi Sequence/video track/clip từ file .prproj.
+
+    Trả về [{index, name, timebase, tracks: [{trackIndex, clips: [...]}]}]; mỗi clip có
+    cùng khoá với getTimeline.jsx (indexInTrack, name, startSeconds, ...).
+    """
+    collector = _TimelineCollector()
+    for event, elem in _iter_prproj_events(project_path):
+        if event == 'start':
+            collector.start(elem)
+        else:
+            collector.end(elem)
+    return collector.result()
+
+
+def _num(v) -> str:
+    # In số giống JS (5 thay vì 5.0)
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _csv_field(v) -> str:
+    # Quy tắc escape giống getTimeline.jsx
+    s = (v or '').replace('"', '""')
+    if ',' in s:
+        s = '"' + s + '"'
+    return s
+
+
+def _csv_row(clip: Dict) -> str:
+    return ','.join([
+        str(clip['indexInTrack']),
+        _csv_field(clip['name']),
+        _num(clip['startSeconds']),
+        _num(clip['endSeconds']),
+        _num(clip['durationSeconds']),
+        _csv_field(clip['mediaPath']),
+        _csv_field(clip['textContent']),
+    ])
+
+
+def _write_text(path: str, content: str):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def _pick_sequence(sequences: List[Dict], sequence: Union[str, int, None]) -> Optional[Dict]:
+    if not sequences:
+        return None
+    if sequence is None:
+        return sequences[0]
+    if isinstance(sequence, int) or (isinstance(sequence, str) and sequence.isdigit()):
+        idx = int(sequence)
+        return sequences[idx] if 0 <= idx < len(sequences) else None
+    for seq in sequences:
+        if seq['name'] == sequence:
+            return seq
+    return None
+
+
+def _topmost_non_empty_track(seq: Dict) -> Optional[Dict]:
+    # Giống findFirstNonEmptyVideoTrackIndex: duyệt từ track trên cùng xuống
+    for track in reversed(seq['tracks']):
+        if track['clips']:
+            return track
+    return None
+
+
+def export_timeline(
+    project_path: str,
+    project_name: Optional[str] = None,
+    sequence: Union[str, int, None] = None,
+    out_dir: Optional[str] = None,
+) -> Dict:
+    """Xuất timeline_export.* (1 track) và timeline_export_all.* (mọi track) cho project.
+
+    project_name: slug thư mục trong data/ (mặc định theo tên file .prproj).
+    sequence: tên hoặc index Sequence dùng cho timeline_export.* (mặc định Sequence đầu tiên).
+    Trả về dict đường dẫn các file đã ghi và số clip.
+    """
+    sequences = read_timeline(project_path)
+    if out_dir is None:
+        out_dir = project_subdir(project_name or project_slug_from_path(project_path))
+    os.makedirs(out_dir, exist_ok=True)
+    result = {'sequences': len(sequences), 'clips': 0}
+
+    seq = _pick_sequence(sequences, sequence)
+    track = _topmost_non_empty_track(seq) if seq is not None else None
+    if track is None:
+        print(f"[timeline_export] WARN: no non-empty video track found in {project_path}")
+    else:
+        csv_path = os.path.join(out_dir, 'timeline_export.csv')
+        json_path = os.path.join(out_dir, 'timeline_export.json')
+        _write_text(csv_path, '\n'.join([CSV_HEADER] + [_csv_row(c) for c in track['clips']]))
+        _write_text(json_path, json.dumps({'trackIndex': track['trackIndex'], 'clips': track['clips']},
+                                          ensure_ascii=False, indent=2))
+        result.update(csv=csv_path, json=json_path, trackIndex=track['trackIndex'], clips=len(track['clips']))
+        print(f"[timeline_export] Track #{track['trackIndex']} of '{seq['name']}': {len(track['clips'])} clips -> {csv_path}")
+
+    all_csv = os.path.join(out_dir, 'timeline_export_all.csv')
+    all_json = os.path.join(out_dir, 'timeline_export_all.json')
+    lines = ['sequenceIndex,sequenceName,trackIndex,' + CSV_HEADER]
+    for s in sequences:
+        prefix = f"{s['index']},{_csv_field(s['name'])},"
+        for t in s['tracks']:
+            for c in t['clips']:
+                lines.append(prefix + f"{t['trackIndex']}," + _csv_row(c))
+    _write_text(all_csv, '\n'.join(lines))
+    _write_text(all_json, json.dumps({'sequences': sequences}, ensure_ascii=False, indent=2))
+    result.update(all_csv=all_csv, all_json=all_json)
+    return result
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    seq_arg = None
+    if '--sequence' in args:
+        i = args.index('--sequence')
+        seq_arg = args[i + 1] if i + 1 < len(args) else None
+        del args[i:i + 2]
+    if not args:
+        print('Usage: python -m core.premierCore.timeline_export <file.prproj> [project_name] [--sequence NAME|INDEX]')
+        sys.exit(1)
+    res = export_timeline(args[0], args[1] if len(args) > 1 else None, sequence=seq_arg)
+    print(json.dumps(res, ensure_ascii=False, indent=2))
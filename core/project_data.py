@@ -16,11 +16,17 @@ __all__ = [
     'write_current_project_marker',
     'read_current_project_marker',
     'project_subdir',
+    'project_slug_from_path',
 ]
 
 def _sanitize(name: str) -> str:
     return ''.join(ch if ch.isalnum() or ch in ('-', '_') else '_' for ch in name)
 
+def project_slug_from_path(project_path: str) -> str:
+    """Slug của project theo tên file .prproj (giống AutoToolGUI._derive_project_slug)."""
+    stem, _ = os.path.splitext(os.path.basename(project_path))
+    return _sanitize(stem)
+
 def project_subdir(project_name: str) -> str:
     os.makedirs(DATA_DIR, exist_ok=True)
     safe = _sanitize(project_name)